@@ -0,0 +1,211 @@
+import csv
+import os
+
+import numpy as np
+
+from model_inputs import INPUT_CACHE_DIR
+from pl_engine import NGV_BUSINESS_NAMES
+from rav_engine import RAV_SEGMENT_NAMES
+
+# --- Configuration & Constants ---
+# Asset register layout: one row per asset or project, then one capex column per forecast year (native currency, m)
+REGISTER_COLUMNS = ["Asset ID", "Segment", "Asset Type", "Commissioning Year", "Useful Life (Years)", "Opening NBV"]
+REGISTER_CSV = "asset_register.csv"
+REGISTER_CACHE_VERSION = 1
+REGISTER_ARRAYS = ["asset_id", "segment", "segment_names", "asset_type", "asset_type_names", "commissioning_idx", "life", "opening_nbv", "capex", "years"]
+
+# Line items of the asset roll-forward (per asset, and per group after roll-up)
+ASSET_LINE_ITEMS = ["Opening NBV", "Capex", "Depreciation", "Closing NBV"]
+
+
+# --- Input Loading ---
+def _codes(labels):
+    """Category labels -> (int codes, sorted unique names)."""
+    names, codes = np.unique(np.asarray(labels), return_inverse=True)
+    return codes, [str(name) for name in names]
+
+
+def read_asset_register(csv_filename=REGISTER_CSV):
+    """
+    Reads an asset register CSV (REGISTER_COLUMNS followed by FY capex columns) into columnar arrays:
+    'asset_id', 'segment'/'asset_type' integer codes with their 'segment_names'/'asset_type_names',
+    'commissioning_idx' (forecast-year index the asset enters service; negative if already in service),
+    'life', 'opening_nbv' (assets,) and 'capex' (assets x years). The year columns are converted in one pass.
+    """
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        if header[:len(REGISTER_COLUMNS)] != REGISTER_COLUMNS:
+            raise ValueError(f"{csv_filename} must start with the columns {REGISTER_COLUMNS}")
+        years = [h for h in header[len(REGISTER_COLUMNS):] if h.startswith("FY")]
+        rows = [row for row in reader if row and any(row)]
+    if not rows:
+        raise ValueError(f"{csv_filename} has no assets")
+    n_cols = len(REGISTER_COLUMNS) + len(years)
+    if any(len(row) < n_cols for row in rows):
+        raise ValueError(f"{csv_filename} has rows with fewer than {n_cols} columns")
+
+    fields = np.array([row[:n_cols] for row in rows])
+    numbers = fields[:, 3:]
+    numbers[numbers == ""] = "0"
+    try:
+        numbers = numbers.astype(float)
+    except ValueError: # Thousands separators: only then pay for the string clean-up
+        numbers = np.char.replace(numbers, ",", "").astype(float)
+    segment, segment_names = _codes(fields[:, 1])
+    asset_type, asset_type_names = _codes(fields[:, 2])
+    first_year = int(years[0][2:])
+    return {
+        "file": csv_filename,
+        "years": years,
+        "asset_id": fields[:, 0],
+        "segment": segment,
+        "segment_names": segment_names,
+        "asset_type": asset_type,
+        "asset_type_names": asset_type_names,
+        "commissioning_idx": numbers[:, 0].astype(int) - first_year,
+        "life": numbers[:, 1],
+        "opening_nbv": numbers[:, 2],
+        "capex": numbers[:, 3:],
+    }
+
+
+def load_asset_register(csv_filename=REGISTER_CSV, cache_dir=None):
+    """
+    Same arrays as read_asset_register, served from <data dir>/.model_cache/<file>.npz while the CSV's mtime and size
+    are unchanged (parsing tens of thousands of rows dominates the roll-up otherwise). Cache I/O problems fall back
+    to parsing.
+    """
+    path = os.path.abspath(csv_filename)
+    stat = os.stat(path)
+    stamp = np.array([REGISTER_CACHE_VERSION, stat.st_mtime_ns, stat.st_size], dtype=np.int64)
+    csv_dir, base = os.path.split(path)
+    cache_path = os.path.join(cache_dir or os.path.join(csv_dir, INPUT_CACHE_DIR), base + ".npz")
+    try:
+        with np.load(cache_path) as cached:
+            if np.array_equal(cached["stamp"], stamp):
+                register = {key: cached[key] for key in REGISTER_ARRAYS}
+                for key in ("segment_names", "asset_type_names", "years"):
+                    register[key] = [str(v) for v in register[key]]
+                return dict(register, file=csv_filename)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    register = read_asset_register(csv_filename)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = cache_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, stamp=stamp, **{key: np.asarray(register[key]) for key in REGISTER_ARRAYS})
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        pass # Read-only data directory: run uncached
+    return register
+
+
+# --- Calculation ---
+def roll_forward_assets(register):
+    """
+    Rolls every asset's net book value forward: Opening NBV -> Capex -> Depreciation -> Closing NBV.
+    Capex before commissioning is held as assets under construction. From commissioning to the end of its life an
+    asset is depreciated straight-line over its remaining life, i.e. (opening NBV + the year's capex) / years left,
+    so it is fully written down at the end of its life. Runs year by year across all assets at once.
+    Returns a dict keyed by ASSET_LINE_ITEMS of (assets x years) arrays.
+    """
+    capex = np.ascontiguousarray(register["capex"].T) # Year-major
+    n_years, n_assets = capex.shape
+    commissioning = register["commissioning_idx"]
+    end_of_life = commissioning + np.maximum(register["life"], 1.0)
+
+    opening = np.empty((n_years, n_assets))
+    depreciation = np.zeros((n_years, n_assets))
+    balance = register["opening_nbv"].astype(float)
+    for y in range(n_years):
+        opening[y] = balance
+        in_service = (commissioning <= y) & (y < end_of_life)
+        years_left = np.maximum(end_of_life - y, 1.0)
+        depreciation[y] = np.where(in_service, (balance + capex[y]) / years_left, 0.0)
+        balance = balance + capex[y] - depreciation[y]
+
+    return {
+        "Opening NBV": opening.T,
+        "Capex": capex.T,
+        "Depreciation": -depreciation.T,
+        "Closing NBV": opening.T + capex.T - depreciation.T,
+    }
+
+
+def group_sum(values, codes, n_groups):
+    """Sums the rows of values (items x ...) by integer group code with one sort and one reduceat. Returns (groups x ...)."""
+    order = np.argsort(codes, kind="stable")
+    present, first = np.unique(codes[order], return_index=True)
+    totals = np.zeros((n_groups,) + values.shape[1:])
+    totals[present] = np.add.reduceat(values[order], first, axis=0)
+    return totals
+
+
+def roll_up(register, assets=None, by="segment"):
+    """
+    Aggregates the asset roll-forward to 'segment' or 'asset_type' rows.
+    Returns a dict with 'names', the register's 'years' and ASSET_LINE_ITEMS arrays of (groups x years).
+    """
+    if assets is None:
+        assets = roll_forward_assets(register)
+    codes, names = register[by], register[f"{by}_names"]
+    rolled = {"names": list(names), "years": list(register["years"])}
+    for item in ASSET_LINE_ITEMS:
+        rolled[item] = group_sum(assets[item], codes, len(names))
+    return rolled
+
+
+def register_capex_inputs(base, rolled):
+    """
+    Replaces the capex (and opening RAV) of the RAV segments named in a by-segment roll-up, and the 'ngv_capex' of
+    the NGV businesses it names (pl_engine.NGV_BUSINESS_NAMES, e.g. the interconnectors), so the scenario and RAV
+    engines run on the register. Segments without assets keep their assumption CSV values; a segment that is neither
+    raises ValueError. Years are matched by label: the register must have a capex column for every year of
+    base['years'], and the opening RAV is the NBV at the start of the first of them. Returns a new inputs dict.
+    """
+    unknown = [name for name in rolled["names"] if name not in RAV_SEGMENT_NAMES and name not in NGV_BUSINESS_NAMES]
+    if unknown:
+        raise ValueError(f"Register segments {unknown} are neither RAV segments {RAV_SEGMENT_NAMES} "
+                         f"nor NGV businesses {NGV_BUSINESS_NAMES}")
+    ngv_names = [name for name in rolled["names"] if name in NGV_BUSINESS_NAMES]
+    if ngv_names and "ngv_capex" not in base:
+        raise ValueError(f"The register has NGV businesses {ngv_names} but the inputs have no 'ngv_capex' "
+                         "(use scenario_engine.load_model_inputs)")
+    missing = [year for year in base["years"] if year not in rolled["years"]]
+    if missing:
+        raise ValueError(f"The register's years {rolled['years'][0]}..{rolled['years'][-1]} don't cover the inputs' "
+                         f"{base['years'][0]}..{base['years'][-1]}; missing {', '.join(missing)}")
+    columns = [rolled["years"].index(year) for year in base["years"]]
+    inputs = dict(base)
+    opening_key = "opening_rav" if "opening_rav" in base else "opening"
+    inputs["capex"], inputs[opening_key] = base["capex"].copy(), base[opening_key].copy()
+    if ngv_names:
+        inputs["ngv_capex"] = base["ngv_capex"].copy()
+    for g, name in enumerate(rolled["names"]):
+        if name in RAV_SEGMENT_NAMES:
+            s = RAV_SEGMENT_NAMES.index(name)
+            inputs["capex"][s] = rolled["Capex"][g, columns]
+            inputs[opening_key][s] = rolled["Opening NBV"][g, columns[0]]
+        else:
+            inputs["ngv_capex"][NGV_BUSINESS_NAMES.index(name)] = rolled["Capex"][g, columns]
+    return inputs
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    register_csv = sys.argv[1] if len(sys.argv) > 1 else REGISTER_CSV
+    if not os.path.exists(register_csv):
+        sys.exit(f"{register_csv} not found (layout: {', '.join(REGISTER_COLUMNS)}, FY2025, ...)")
+    start = time.perf_counter()
+    asset_reg = load_asset_register(register_csv)
+    loaded = time.perf_counter()
+    by_segment = roll_up(asset_reg)
+    done = time.perf_counter()
+    print(f"{len(asset_reg['asset_id']):,} assets: loaded in {(loaded - start) * 1000:.0f} ms, rolled forward and up in {(done - loaded) * 1000:.0f} ms")
+    for g, name in enumerate(by_segment["names"]):
+        print(f"  {name}: NBV {by_segment['Opening NBV'][g, 0]:,.0f} -> {by_segment['Closing NBV'][g, -1]:,.0f}, "
+              f"capex {by_segment['Capex'][g].sum():,.0f}, depreciation {-by_segment['Depreciation'][g].sum():,.0f}")
@@ -0,0 +1,186 @@
+import json
+import multiprocessing
+import os
+import time
+import traceback
+from multiprocessing.connection import wait
+
+from generate_full_national_grid_model import build_workbook, csv_files_info
+from input_validation import format_failures, has_errors, validate_packs
+from model_inputs import load_model_csv
+from xlsx_cached_values import write_cached_values
+
+# --- Configuration & Constants ---
+DEFAULT_OUTPUT_NAME = "NationalGrid_Full_Model_Generated.xlsx"
+DEFAULT_JOB_TIMEOUT = 600.0 # Seconds per workbook
+POLL_INTERVAL = 0.5 # Seconds between deadline checks while jobs are running
+
+
+# --- Manifest ---
+def load_batch_manifest(path):
+    """
+    Reads a batch manifest: {"jobs": [{"name": ..., "inputs": <input dir>, "output": <xlsx path>, "sheets": [...]}, ...]}.
+    'output' defaults to <inputs>/NationalGrid_Full_Model_Generated.xlsx and 'sheets' to all sheets. Relative paths are
+    resolved against the manifest's directory. Returns the list of jobs with absolute paths.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    jobs, seen_outputs = [], set()
+    for idx, entry in enumerate(manifest["jobs"]):
+        input_dir = os.path.join(base_dir, entry["inputs"])
+        output = os.path.join(base_dir, entry["output"]) if entry.get("output") else os.path.join(input_dir, DEFAULT_OUTPUT_NAME)
+        if output in seen_outputs:
+            raise ValueError(f"Job {idx} writes {output}, which another job already writes")
+        seen_outputs.add(output)
+        jobs.append({"name": entry.get("name") or os.path.basename(os.path.normpath(input_dir)), "inputs": input_dir,
+                     "output": output, "sheets": entry.get("sheets")})
+    return jobs
+
+
+def warm_input_cache(jobs):
+    """
+    Parses every job's input CSVs once in the parent, so workers load the cached arrays instead of re-parsing.
+    Returns {input dir: error message} for directories whose inputs are missing or unreadable.
+    """
+    failures = {}
+    for input_dir in sorted({job["inputs"] for job in jobs}):
+        for fname in [info[1] for info in csv_files_info]:
+            try:
+                load_model_csv(os.path.join(input_dir, fname))
+            except (OSError, ValueError) as e:
+                failures[input_dir] = f"{fname}: {e}"
+                break
+    return failures
+
+
+# --- Worker ---
+def _run_job(job, streaming, cache_values, conn):
+    """Worker process entry point: build one workbook, save it atomically and report back over conn."""
+    start = time.perf_counter()
+    try:
+        wb = build_workbook(job["sheets"], data_dir=job["inputs"], streaming=streaming)
+        os.makedirs(os.path.dirname(job["output"]), exist_ok=True)
+        partial = job["output"] + ".partial"
+        wb.save(partial)
+        if cache_values:
+            write_cached_values(partial)
+        os.replace(partial, job["output"])
+        conn.send({"status": "ok", "sheets": len(wb.sheetnames), "seconds": time.perf_counter() - start})
+    except Exception:
+        conn.send({"status": "error", "error": traceback.format_exc(), "seconds": time.perf_counter() - start})
+    finally:
+        conn.close()
+
+
+# --- Driver ---
+def run_batch(jobs, workers=None, timeout=DEFAULT_JOB_TIMEOUT, streaming=False, on_progress=None, validation="warn", cache_values=True):
+    """
+    Builds every job's workbook in up to `workers` parallel processes (default: all cores). Each job gets its own
+    process so a job exceeding `timeout` seconds can be terminated without affecting the rest.
+    `on_progress(result, done, total)` is called as each job finishes. Returns one result dict per job, in job order,
+    with 'status' ('ok', 'error' or 'timeout'), 'seconds' and 'error' (traceback or message) where applicable.
+    Every input directory is first checked with input_validation in one batched pass; results carry the failure
+    counts as 'validation_errors' / 'validation_warnings'. validation="strict" fails jobs whose inputs have errors
+    without building them, "off" skips the checks. Workbooks are saved with their formula results cached unless
+    cache_values is False.
+    """
+    workers = max(1, workers or os.cpu_count() or 1)
+    input_failures = warm_input_cache(jobs)
+    input_dirs = sorted({job["inputs"] for job in jobs} - set(input_failures))
+    validation_reports = dict(zip(input_dirs, validate_packs(input_dirs))) if validation != "off" else {}
+    if validation == "strict":
+        for input_dir, failures in validation_reports.items():
+            if has_errors(failures):
+                summary = format_failures(failures, limit=1).splitlines()
+                input_failures[input_dir] = f"{summary[0]}; first: {' '.join(summary[1].split())}"
+    # Forked workers inherit the imported generator and the warmed in-process table memo
+    ctx = multiprocessing.get_context("fork" if "fork" in multiprocessing.get_all_start_methods() else "spawn")
+    results = [None] * len(jobs)
+    pending = [idx for idx, job in enumerate(jobs) if job["inputs"] not in input_failures]
+    running = {} # Job index -> (process, parent conn, deadline)
+    done = 0
+
+    def finish(idx, result):
+        nonlocal done
+        failures = validation_reports.get(jobs[idx]["inputs"], [])
+        n_errors = sum(f["severity"] == "error" for f in failures)
+        result.update(name=jobs[idx]["name"], output=jobs[idx]["output"], validation_errors=n_errors, validation_warnings=len(failures) - n_errors)
+        results[idx] = result
+        done += 1
+        if on_progress:
+            on_progress(result, done, len(jobs))
+
+    for idx, job in enumerate(jobs):
+        if job["inputs"] in input_failures:
+            finish(idx, {"status": "error", "error": f"Input error: {input_failures[job['inputs']]}", "seconds": None})
+    while pending or running:
+        while pending and len(running) < workers:
+            idx = pending.pop(0)
+            parent_conn, child_conn = ctx.Pipe(duplex=False)
+            proc = ctx.Process(target=_run_job, args=(jobs[idx], streaming, cache_values, child_conn), daemon=True)
+            proc.start()
+            child_conn.close()
+            running[idx] = (proc, parent_conn, time.monotonic() + timeout)
+
+        # A worker blocks in conn.send until its result is read, so results are received before joining the process;
+        # a worker that exits without sending leaves its conn at EOF
+        ready = set(wait([handle for proc, conn, _ in running.values() for handle in (conn, proc.sentinel)], timeout=POLL_INTERVAL))
+        for idx, (proc, conn, _) in list(running.items()):
+            if conn not in ready and proc.sentinel not in ready:
+                continue
+            try:
+                result = conn.recv()
+            except EOFError:
+                result = None
+            proc.join()
+            conn.close()
+            del running[idx]
+            finish(idx, result or {"status": "error", "error": f"Worker exited with code {proc.exitcode}", "seconds": None})
+
+        now = time.monotonic()
+        for idx, (proc, conn, deadline) in list(running.items()):
+            if now > deadline:
+                proc.terminate()
+                proc.join()
+                conn.close()
+                del running[idx]
+                partial = jobs[idx]["output"] + ".partial"
+                if os.path.exists(partial):
+                    os.remove(partial)
+                finish(idx, {"status": "timeout", "error": f"Exceeded {timeout:g}s", "seconds": timeout})
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+
+    parser = argparse.ArgumentParser(description="Build one full-model workbook per input directory listed in a batch manifest.")
+    parser.add_argument("manifest", help="JSON manifest of jobs (see load_batch_manifest)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_JOB_TIMEOUT, help="seconds per workbook")
+    parser.add_argument("--streaming", action="store_true", help="use the streaming write-only backend")
+    parser.add_argument("--validation", choices=["warn", "strict", "off"], default="warn",
+                        help="input checks before building: 'strict' skips jobs whose inputs fail")
+    parser.add_argument("--no-cached-values", action="store_true", help="save formulas without their computed values")
+    parser.add_argument("--report", help="write per-job results to this JSON file")
+    args = parser.parse_args()
+
+    batch_jobs = load_batch_manifest(args.manifest)
+    start = time.perf_counter()
+    def report_progress(result, n_done, total):
+        print(f"[{n_done}/{total}] {result['name']}: {result['status']}" + (f" ({result['seconds']:.1f}s)" if result["seconds"] else "")
+              + (f", inputs: {result['validation_errors']} validation errors, {result['validation_warnings']} warnings"
+                 if result["validation_errors"] or result["validation_warnings"] else ""))
+    batch_results = run_batch(batch_jobs, workers=args.workers, timeout=args.timeout, streaming=args.streaming, on_progress=report_progress,
+                              validation=args.validation, cache_values=not args.no_cached_values)
+
+    failed = [r for r in batch_results if r["status"] != "ok"]
+    print(f"{len(batch_results) - len(failed)}/{len(batch_results)} workbooks built in {time.perf_counter() - start:.1f}s")
+    for r in failed:
+        print(f"  {r['name']} ({r['status']}): {r['error'].strip().splitlines()[-1]}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(batch_results, f, indent=1)
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,394 @@
+import csv
+import json
+import os
+import platform
+import runpy
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+import numpy as np
+
+# --- Configuration & Constants ---
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+GENERATOR_SCRIPTS = ["generate_national_grid_model.py", "generate_full_national_grid_model.py"]
+ENGINE_SCENARIO_COUNTS = [1, 1000, 100000]
+SYNTHETIC_LINE_ITEM_FACTOR = 10
+SYNTHETIC_HORIZON_YEARS = 50
+SYNTHETIC_ASSET_COUNTS = [1000, 50000] # Asset register rows
+BENCHMARK_SEED = 20240601
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_MAX_SLOWDOWN = 1.5 # --baseline flags benchmarks slower than this ratio
+
+# Sample forecast formulas for the template compiler (FY2025 forms, as written in the generators)
+SAMPLE_FORMULAS = [
+    "='Assumptions_UK_Reg'!C3",
+    "=-B3*INDEX(Assumptions_UK_Reg!$C$4:$R$4,1,MATCH(B$1,Assumptions_UK_Reg!$C$1:$R$1,0))",
+    "=B3*INDEX(Assumptions_Macro!$C$3:$R$3,1,MATCH(B$1,Assumptions_Macro!$C$1:$R$1,0))",
+    "=SUM(B3:B7)",
+    "='Hist_RAV_RateBase'!G8+'Forecast_PL_Segment'!B33-B12",
+]
+
+
+# --- Measurement ---
+def measure(name, fn, repeat=3, setup=None, items=None, unit="items", **params):
+    """
+    Times fn() `repeat` times (after an untimed warm-up) and records the peak traced memory of one extra run.
+    `setup()` (untimed) builds fn's argument fresh for each run when given. `items` sets the throughput numerator.
+    """
+    def run_once():
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        return time.perf_counter() - start
+
+    run_once() # Warm-up: imports, caches, first-touch allocations
+    timings = [run_once() for _ in range(repeat)]
+    arg = setup() if setup else None
+    tracemalloc.start()
+    try:
+        fn(arg) if setup else fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    median = statistics.median(timings)
+    result = {
+        "name": name,
+        "params": params,
+        "repeat": repeat,
+        "seconds_median": median,
+        "seconds_min": min(timings),
+        "seconds_max": max(timings),
+        "peak_memory_mb": peak / 1e6,
+    }
+    if items:
+        result["throughput"] = {"value": items / median if median > 0 else None, "unit": f"{unit}/s"}
+    print(f"  {name:<55} {median * 1000:10.2f} ms  {peak / 1e6:8.1f} MB" + (f"  {items / median:12,.0f} {unit}/s" if items and median > 0 else ""))
+    return result
+
+
+@contextmanager
+def working_copy(data_dir=REPO_DIR):
+    """Runs the block in a scratch directory holding copies of the input CSVs, so generated files stay out of the repo."""
+    scratch = tempfile.mkdtemp(prefix="ng_bench_")
+    cwd = os.getcwd()
+    try:
+        for fname in os.listdir(data_dir):
+            if fname.endswith(".csv"):
+                shutil.copy(os.path.join(data_dir, fname), scratch)
+        os.chdir(scratch)
+        yield scratch
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+# --- Synthetic Inputs ---
+def write_synthetic_inputs(source_dir, target_dir, line_item_factor=SYNTHETIC_LINE_ITEM_FACTOR, horizon_years=SYNTHETIC_HORIZON_YEARS):
+    """
+    Writes scaled copies of the input CSVs: every data row repeated `line_item_factor` times (suffixed ' #k') and the
+    forecast files extended to `horizon_years` columns by carrying the last year forward. Returns the file names.
+    """
+    from model_inputs import read_model_csv
+
+    written = []
+    for fname in sorted(f for f in os.listdir(source_dir) if f.endswith(".csv")):
+        table = read_model_csv(os.path.join(source_dir, fname))
+        header = table["header"]
+        years = table["years"]
+        first_year_col = header.index(years[0])
+        if years[0] == "FY2025": # Forecast inputs: extend the horizon
+            first = int(years[0][2:])
+            out_years = [f"FY{first + i}" for i in range(horizon_years)]
+        else:
+            out_years = years
+        values = table["values"]
+        extra = len(out_years) - len(years)
+        if extra > 0:
+            values = np.concatenate([values, np.repeat(values[:, -1:], extra, axis=1)], axis=1)
+
+        sections = {s["row"]: s["label"] for s in table["sections"]}
+        rows_by_section = {}
+        for row, row_values in zip(table["rows"], values):
+            rows_by_section.setdefault(row["section"], []).append((row, row_values))
+        with open(os.path.join(target_dir, fname), 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(header[:first_year_col] + out_years + ["Notes"])
+            blank = [""] * (len(out_years) + first_year_col)
+            for section in [None] + [sections[r] for r in sorted(sections)]:
+                if section is not None:
+                    writer.writerow([section] + blank)
+                for copy_idx in range(line_item_factor):
+                    for row, row_values in rows_by_section.get(section, []):
+                        label = row["item"] if copy_idx == 0 else f"{row['item']} #{copy_idx}"
+                        lead = [row["unit"] or ""] if first_year_col == 2 else []
+                        writer.writerow([label] + lead + ["" if np.isnan(v) else repr(float(v)) for v in row_values] + [row["notes"]])
+        written.append(fname)
+    return written
+
+
+def write_synthetic_asset_register(path, n_assets, seed=BENCHMARK_SEED):
+    """Writes an asset register CSV (asset_register.REGISTER_COLUMNS + FY2025..FY2040 capex) with n_assets random rows."""
+    from asset_register import REGISTER_COLUMNS
+    from rav_engine import RAV_SEGMENT_NAMES
+
+    rng = np.random.default_rng(seed)
+    years = [f"FY{2025 + i}" for i in range(16)]
+    segments = rng.choice(RAV_SEGMENT_NAMES, n_assets)
+    asset_types = rng.choice(["Cables", "Substations", "Towers", "Transformers", "IT & Telecoms"], n_assets)
+    commissioning = rng.integers(1990, 2036, n_assets)
+    life = rng.choice([20, 40, 45, 55], n_assets)
+    opening = np.where(commissioning < 2025, rng.uniform(0.5, 20.0, n_assets), 0.0)
+    capex = rng.uniform(0.0, 2.0, (n_assets, len(years))) * (rng.random((n_assets, len(years))) < 0.3)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(REGISTER_COLUMNS + years)
+        for a in range(n_assets):
+            writer.writerow([f"A{a:06d}", segments[a], asset_types[a], commissioning[a], life[a], f"{opening[a]:.3f}"] + [f"{v:.3f}" for v in capex[a]])
+
+
+# --- Benchmark Groups ---
+def bench_inputs(results, data_dir, label, repeat):
+    from model_inputs import load_model_csv, read_model_csv
+
+    print(f"[inputs: {label}]")
+    for fname in sorted(f for f in os.listdir(data_dir) if f.endswith(".csv")):
+        path = os.path.join(data_dir, fname)
+        n_rows = len(read_model_csv(path)["rows"])
+        results.append(measure(f"read_model_csv {fname}", lambda: read_model_csv(path), repeat, items=n_rows, unit="rows", inputs=label))
+        load_model_csv(path) # Populate the parsed-input cache
+        def cached_load(_=None, path=path):
+            from model_inputs import _memory_cache
+            _memory_cache.pop(os.path.abspath(path), None) # Measure the on-disk cache, not the in-process memo
+            return load_model_csv(path)
+        results.append(measure(f"load_model_csv (cached) {fname}", cached_load, repeat, items=n_rows, unit="rows", inputs=label))
+
+
+def bench_load_csv_to_sheet(results, generator_globals, data_dir, label, repeat):
+    import openpyxl
+
+    print(f"[load_csv_to_sheet: {label}]")
+    load_csv_to_sheet = generator_globals["load_csv_to_sheet"]
+    for sheet_name, fname, _, is_assum, header_offset in generator_globals["csv_files_info"]:
+        path = os.path.join(data_dir, fname)
+        def new_sheet():
+            return openpyxl.Workbook().active
+        results.append(measure(f"load_csv_to_sheet {fname}", lambda ws: load_csv_to_sheet(ws, path, is_assumptions_sheet=is_assum, header_row_offset=header_offset),
+                               repeat, setup=new_sheet, inputs=label))
+
+
+def bench_formula_templates(results, repeat, n_years=16):
+    from formula_templates import FormulaTemplate
+
+    print(f"[formula templates: {n_years} years]")
+    n = 200
+    formulas = [f + f"+0*{k}" for k in range(n) for f in SAMPLE_FORMULAS] # Distinct strings, so nothing is served from the cache
+    results.append(measure("FormulaTemplate compile", lambda: [FormulaTemplate(f) for f in formulas], repeat, items=len(formulas), unit="formulas", years=n_years))
+    templates = [FormulaTemplate(f) for f in formulas]
+    results.append(measure("FormulaTemplate render_years", lambda: [t.render_years(n_years) for t in templates], repeat,
+                           items=len(formulas) * n_years, unit="cells", years=n_years))
+
+
+def bench_generator(results, script, repeat):
+    """Full script run (incl. save) in a scratch dir, then build-only and save-only timings for each backend."""
+    import openpyxl
+    from streaming_workbook import StreamingWorkbook
+    from xlsx_cached_values import write_cached_values
+
+    print(f"[generator: {script}]")
+    script_path = os.path.join(REPO_DIR, script)
+    with working_copy() as scratch:
+        sys.path.insert(0, REPO_DIR)
+        start = time.perf_counter()
+        generator_globals = runpy.run_path(script_path, run_name="__main__")
+        results.append({"name": f"{script} full run", "params": {}, "repeat": 1, "seconds_median": time.perf_counter() - start})
+        print(f"  {script + ' full run':<55} {results[-1]['seconds_median'] * 1000:10.2f} ms")
+
+        build_sheet = generator_globals["build_sheet"]
+        sheet_names = [spec[0] for spec in generator_globals["sheet_specs"]]
+        def new_workbook():
+            wb = openpyxl.Workbook()
+            wb.remove(wb.active)
+            return wb
+        def build(wb):
+            for name in sheet_names:
+                build_sheet(wb, name)
+            return wb
+        results.append(measure(f"{script} build (openpyxl)", build, repeat, setup=new_workbook, items=len(sheet_names), unit="sheets"))
+        results.append(measure(f"{script} wb.save (openpyxl)", lambda wb: wb.save(os.path.join(scratch, "bench.xlsx")), repeat,
+                               setup=lambda: build(new_workbook())))
+        results.append(measure(f"{script} build+save (streaming)", lambda wb: build(wb).save(os.path.join(scratch, "bench_stream.xlsx")), repeat,
+                               setup=StreamingWorkbook, items=len(sheet_names), unit="sheets"))
+        results.append(measure(f"{script} write_cached_values", lambda: write_cached_values(os.path.join(scratch, "bench.xlsx")), repeat))
+        output_path = os.path.join(scratch, generator_globals.get("output_filename", ""))
+        if os.path.isfile(output_path):
+            bench_xlsx_reader(results, output_path, script, repeat)
+        sys.path.remove(REPO_DIR)
+    return generator_globals
+
+
+def bench_xlsx_reader(results, path, script, repeat):
+    """Reading a generated workbook's input sheets back: the streaming zip/XML reader against openpyxl."""
+    import openpyxl
+    from xlsx_reader import read_workbook_tables
+
+    n_sheets = len(read_workbook_tables(path))
+    if not n_sheets:
+        return
+    results.append(measure(f"{script} read_workbook_tables", lambda: read_workbook_tables(path), repeat, items=n_sheets, unit="sheets"))
+    results.append(measure(f"{script} openpyxl.load_workbook", lambda: openpyxl.load_workbook(path, data_only=True), repeat))
+
+
+def bench_engines(results, repeat, scenario_counts=ENGINE_SCENARIO_COUNTS):
+    from credit_engine import credit_metrics, screen_thresholds
+    from debt_engine import solve_debt_schedule
+    from model_inputs import load_input_tables
+    from rav_engine import roll_forward_rav
+    from scenario_engine import SCENARIO_INPUT_CSVS, load_model_inputs, run_scenarios
+    from statements_engine import build_statements, check_statements, load_opening_balance_sheet
+
+    print("[engines]")
+    tables = load_input_tables(REPO_DIR, SCENARIO_INPUT_CSVS)
+    base = load_model_inputs(REPO_DIR, tables=tables)
+    opening_bs = load_opening_balance_sheet(tables)
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    n_years = base["capex"].shape[-1]
+    for n in scenario_counts:
+        runs = repeat if n < 100000 else 1
+        overrides = {
+            "uk_cpih": base["uk_cpih"] + rng.normal(0.0, 0.01, (n, 1)),
+            "allowed_wacc": base["allowed_wacc"] + rng.normal(0.0, 0.005, (n, 1, 1)),
+            "capex": base["capex"] * rng.uniform(0.8, 1.2, (n, 1, 1)),
+        }
+        results.append(measure("run_scenarios", lambda: run_scenarios(overrides, base=base), runs, items=n, unit="scenarios", scenarios=n, years=n_years))
+        scenario_results = run_scenarios(overrides, base=base)
+        results.append(measure("build_statements + check_statements", lambda: check_statements(build_statements(scenario_results, base, opening_bs)),
+                               runs, items=n, unit="scenarios", scenarios=n, years=n_years))
+        results.append(measure("credit_metrics + screen_thresholds", lambda: screen_thresholds(credit_metrics(scenario_results["group"])),
+                               runs, items=n, unit="scenarios", scenarios=n, years=n_years))
+        capex = np.broadcast_to(overrides["capex"], (n,) + base["capex"].shape)
+        results.append(measure("roll_forward_rav", lambda: roll_forward_rav(base["opening_rav"], capex, base["depn_rate"], 0.02), runs,
+                               items=n, unit="scenarios", scenarios=n, years=n_years))
+        cfo = rng.normal(4000.0, 500.0, (n, n_years))
+        results.append(measure("solve_debt_schedule", lambda: solve_debt_schedule(40000.0, cfo, 5000.0, 0.05, payout_ratio=0.6, profit_before_interest=2500.0,
+                                                                                  tax_rate=0.25, existing_debt=40000.0, existing_rate=0.03),
+                               runs, items=n, unit="scenarios", scenarios=n, years=n_years))
+
+
+def bench_synthetic_engines(results, repeat, line_item_factor=SYNTHETIC_LINE_ITEM_FACTOR, horizon_years=SYNTHETIC_HORIZON_YEARS, n_scenarios=1000):
+    """Engines on synthetic arrays with line_item_factor x the segments and a horizon_years forecast."""
+    from debt_engine import solve_debt_schedule
+    from rav_engine import RAV_SEGMENTS, roll_forward_rav
+
+    print(f"[engines: {line_item_factor}x line items, {horizon_years}-year horizon]")
+    rng = np.random.default_rng(BENCHMARK_SEED)
+    n_seg = len(RAV_SEGMENTS) * line_item_factor
+    opening = rng.uniform(5000.0, 25000.0, n_seg)
+    capex = rng.uniform(500.0, 2500.0, (n_scenarios, n_seg, horizon_years))
+    results.append(measure("roll_forward_rav (synthetic)", lambda: roll_forward_rav(opening, capex, 0.025, 0.02), repeat,
+                           items=n_scenarios, unit="scenarios", scenarios=n_scenarios, segments=n_seg, years=horizon_years))
+    cfo = rng.normal(4000.0, 500.0, (n_scenarios, horizon_years))
+    results.append(measure("solve_debt_schedule (synthetic)", lambda: solve_debt_schedule(40000.0, cfo, 5000.0, 0.05, payout_ratio=0.6,
+                                                                                          profit_before_interest=2500.0, tax_rate=0.25),
+                           repeat, items=n_scenarios, unit="scenarios", scenarios=n_scenarios, years=horizon_years))
+
+
+def bench_asset_register(results, repeat, asset_counts=SYNTHETIC_ASSET_COUNTS):
+    from asset_register import load_asset_register, read_asset_register, roll_forward_assets, roll_up
+
+    print("[asset register]")
+    with working_copy() as scratch:
+        for n in asset_counts:
+            path = os.path.join(scratch, f"asset_register_{n}.csv")
+            write_synthetic_asset_register(path, n)
+            results.append(measure("read_asset_register", lambda: read_asset_register(path), repeat, items=n, unit="assets", assets=n))
+            results.append(measure("load_asset_register (cached)", lambda: load_asset_register(path), repeat, items=n, unit="assets", assets=n))
+            register = load_asset_register(path)
+            results.append(measure("roll_forward_assets", lambda: roll_forward_assets(register), repeat, items=n, unit="assets", assets=n))
+            assets = roll_forward_assets(register)
+            results.append(measure("roll_up", lambda: roll_up(register, assets), repeat, items=n, unit="assets", assets=n))
+
+
+# --- Driver ---
+def environment_info():
+    import openpyxl
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "openpyxl": openpyxl.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": BENCHMARK_SEED,
+    }
+
+
+def run_benchmarks(repeat=3, quick=False):
+    """Runs every benchmark group and returns the JSON-ready report."""
+    results = []
+    scenario_counts = ENGINE_SCENARIO_COUNTS[:2] if quick else ENGINE_SCENARIO_COUNTS
+
+    bench_inputs(results, REPO_DIR, "repo", repeat)
+    bench_formula_templates(results, repeat)
+    generator_globals = None
+    for script in GENERATOR_SCRIPTS:
+        generator_globals = bench_generator(results, script, repeat)
+    bench_load_csv_to_sheet(results, generator_globals, REPO_DIR, "repo", repeat) # generator_globals from the full generator
+    bench_engines(results, repeat, scenario_counts)
+    bench_asset_register(results, repeat, SYNTHETIC_ASSET_COUNTS[:1] if quick else SYNTHETIC_ASSET_COUNTS)
+
+    if not quick:
+        with working_copy() as scratch:
+            synthetic_dir = os.path.join(scratch, "synthetic")
+            os.makedirs(synthetic_dir)
+            write_synthetic_inputs(REPO_DIR, synthetic_dir)
+            label = f"synthetic {SYNTHETIC_LINE_ITEM_FACTOR}x items, {SYNTHETIC_HORIZON_YEARS} years"
+            bench_inputs(results, synthetic_dir, label, repeat)
+            bench_load_csv_to_sheet(results, generator_globals, synthetic_dir, label, repeat)
+        bench_formula_templates(results, repeat, n_years=SYNTHETIC_HORIZON_YEARS)
+        bench_synthetic_engines(results, repeat)
+
+    return {"environment": environment_info(), "quick": quick, "results": results}
+
+
+def compare_to_baseline(report, baseline, max_slowdown=DEFAULT_MAX_SLOWDOWN):
+    """Returns (name, params, baseline seconds, current seconds, ratio) for benchmarks slower than max_slowdown x baseline."""
+    key = lambda r: (r["name"], json.dumps(r["params"], sort_keys=True))
+    previous = {key(r): r["seconds_median"] for r in baseline["results"]}
+    regressions = []
+    for r in report["results"]:
+        before = previous.get(key(r))
+        if before and r["seconds_median"] / before > max_slowdown:
+            regressions.append((r["name"], r["params"], before, r["seconds_median"], r["seconds_median"] / before))
+    return regressions
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmarks for workbook generation and the calculation engines.")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="JSON results file")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--quick", action="store_true", help="skip the 100k-scenario and synthetic-scale runs")
+    parser.add_argument("--baseline", help="earlier results JSON; exit with status 1 on regressions")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN)
+    args = parser.parse_args()
+
+    sys.path.insert(0, REPO_DIR)
+    report = run_benchmarks(repeat=args.repeat, quick=args.quick)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=1)
+    print(f"Wrote {len(report['results'])} results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare_to_baseline(report, json.load(f), args.max_slowdown)
+        for name, params, before, after, ratio in regressions:
+            print(f"  REGRESSION {name} {params}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms ({ratio:.2f}x)")
+        sys.exit(1 if regressions else 0)
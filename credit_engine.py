@@ -0,0 +1,150 @@
+import numpy as np
+
+from goal_seek import CREDIT_CONSTRAINTS
+from scenario_engine import load_model_inputs, run_scenarios
+from time_axis import phase_model_inputs
+
+# --- Metric Definitions ---
+# (Metric Key, Label, Unit); each metric is a (scenarios x years) array on an annual basis
+CREDIT_METRICS = [
+    ("ffo_net_debt", "FFO / Net Debt", "%"),
+    ("net_debt_ebitda", "Net Debt / EBITDA", "x"),
+    ("rcf_net_debt", "RCF / Net Debt", "%"),   # Retained cash flow: FFO less dividends
+    ("interest_cover", "FFO Interest Cover", "x"), # (FFO + interest) / interest
+]
+CREDIT_METRIC_KEYS = [metric[0] for metric in CREDIT_METRICS]
+
+# Rating thresholds: (Threshold Set, Metric Key, Bound, Threshold). A 'min' metric breaches below its threshold and a
+# 'max' metric above it. The "Illustrative" sets are placeholder levels for a Baa1 / BBB+ style rating, not published
+# agency thresholds; the last set is the model's own credit constraints (goal_seek.CREDIT_CONSTRAINTS). Pass a
+# replacement list to screen_thresholds to test the levels that apply.
+RATING_THRESHOLDS = [
+    ("Illustrative Baa1", "rcf_net_debt", "min", 0.07),
+    ("Illustrative Baa1", "interest_cover", "min", 3.0),
+    ("Illustrative BBB+", "ffo_net_debt", "min", 0.09),
+    ("Illustrative BBB+", "net_debt_ebitda", "max", 9.0),
+] + [("Model constraints", *constraint) for constraint in CREDIT_CONSTRAINTS]
+THRESHOLD_BOUNDS = ("min", "max")
+
+
+# --- Calculation ---
+def credit_metrics(group, periods_per_year=1):
+    """
+    CREDIT_METRICS from run_scenarios group outputs (£m), keyed by metric. Sub-annual flows are annualised at the
+    period's run rate. A net cash position (net debt <= 0) or no interest charge gives +inf for FFO and RCF / Net
+    Debt and cover, so they never breach; net debt on zero or negative EBITDA gives +inf Net Debt / EBITDA, which does.
+    """
+    net_debt, interest = group["net_debt"], group["interest"]
+    ffo = group["ffo"] * periods_per_year
+    rcf = ffo - group["dividends"] * periods_per_year
+    ebitda = group["ebitda"] * periods_per_year
+    has_debt = net_debt > 0.0
+    has_interest = interest > 0.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            "ffo_net_debt": np.where(has_debt, ffo / net_debt, np.inf),
+            "net_debt_ebitda": np.where(ebitda > 0.0, net_debt / ebitda, np.where(has_debt, np.inf, 0.0)),
+            "rcf_net_debt": np.where(has_debt, rcf / net_debt, np.inf),
+            "interest_cover": np.where(has_interest, (group["ffo"] + interest) / interest, np.inf),
+        }
+
+
+def screen_thresholds(metrics, thresholds=RATING_THRESHOLDS):
+    """
+    Screens every scenario and year against every threshold at once, on a stacked (thresholds x scenarios x years)
+    array. Headroom is in the metric's units, >= 0 where the threshold is met (e.g. 0.012 = 1.2pp of FFO / Net Debt
+    above a 'min' threshold); a NaN metric counts as a breach. Returns a dict with 'thresholds', 'headroom',
+    'breach', 'first_breach_year' ((thresholds x scenarios) year index, -1 if never breached), 'min_headroom' (over
+    the years), and the same per threshold set under 'sets', 'set_breach', 'set_first_breach_year' and
+    'set_min_headroom' (a set breaches when any of its thresholds does).
+    """
+    unknown = sorted({row[1] for row in thresholds} - set(metrics))
+    if unknown:
+        raise ValueError(f"Thresholds on unknown metrics {unknown}; available: {sorted(metrics)}")
+    bad_bounds = sorted({row[2] for row in thresholds} - set(THRESHOLD_BOUNDS))
+    if bad_bounds:
+        raise ValueError(f"Unknown threshold bounds {bad_bounds}; use one of {THRESHOLD_BOUNDS}")
+
+    values = np.stack([metrics[key] for _, key, _, _ in thresholds])
+    levels = np.array([level for *_, level in thresholds])
+    signs = np.array([1.0 if bound == "min" else -1.0 for _, _, bound, _ in thresholds])
+    shape = (len(thresholds),) + (1,) * (values.ndim - 1)
+    with np.errstate(invalid='ignore'):
+        headroom = signs.reshape(shape) * (values - levels.reshape(shape)) # inf - inf only if a threshold is infinite
+    breach = ~(headroom >= 0.0)
+
+    sets = list(dict.fromkeys(row[0] for row in thresholds))
+    membership = np.array([[row[0] == name for row in thresholds] for name in sets])
+    set_breach = np.stack([breach[member].any(axis=0) for member in membership])
+    set_headroom = np.stack([headroom[member].min(axis=0) for member in membership])
+    return {
+        "thresholds": list(thresholds),
+        "headroom": headroom,
+        "breach": breach,
+        "first_breach_year": _first_true(breach),
+        "min_headroom": headroom.min(axis=-1),
+        "sets": sets,
+        "set_breach": set_breach,
+        "set_first_breach_year": _first_true(set_breach),
+        "set_min_headroom": set_headroom.min(axis=-1),
+    }
+
+
+def _first_true(mask):
+    """Index of the first True along the last axis, -1 where there is none."""
+    return np.where(mask.any(axis=-1), mask.argmax(axis=-1), -1)
+
+
+def run_credit_screen(base=None, data_dir=".", time_axis=None, thresholds=RATING_THRESHOLDS):
+    """
+    Base-case credit metrics and threshold screen, as written to the workbook's Credit_Metrics sheet. `time_axis`
+    phases freshly loaded inputs onto its periods. Returns a dict with 'years', 'metrics' ({metric: (years,)}),
+    'thresholds', 'headroom' and 'breach' ((thresholds x years)).
+    """
+    if base is None:
+        base = load_model_inputs(data_dir)
+        if time_axis is not None:
+            base = phase_model_inputs(base, time_axis)
+    results = run_scenarios(base=base)
+    metrics = credit_metrics(results["group"], base.get("periods_per_year", 1))
+    screen = screen_thresholds(metrics, thresholds)
+    return {
+        "years": results["years"],
+        "metrics": {key: values[0] for key, values in metrics.items()},
+        "thresholds": screen["thresholds"],
+        "headroom": screen["headroom"][:, 0],
+        "breach": screen["breach"][:, 0],
+    }
+
+
+def format_screen(screen, years):
+    """One summary line per threshold, e.g. "Illustrative BBB+ ffo_net_debt >= 0.09: 42.0% of scenarios breach, first FY2027 (median); ..."."""
+    lines = []
+    for t, (name, key, bound, level) in enumerate(screen["thresholds"]):
+        first = screen["first_breach_year"][t]
+        breached = first >= 0
+        when = f", first {years[int(np.median(first[breached]))]} (median)" if breached.any() else ""
+        op = ">=" if bound == "min" else "<="
+        lines.append(f"{name} {key} {op} {level:g}: {breached.mean():.1%} of scenarios breach{when}; "
+                     f"min headroom p50 {np.median(screen['min_headroom'][t]):+.3f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    model_base = load_model_inputs()
+    rng = np.random.default_rng(0)
+    scenario_overrides = {
+        "uk_cpih": model_base["uk_cpih"] + rng.normal(0.0, 0.01, (n, 1)),
+        "allowed_wacc": model_base["allowed_wacc"] + rng.normal(0.0, 0.005, (n, 1, 1)),
+        "capex": model_base["capex"] * rng.uniform(0.8, 1.2, (n, 1, 1)),
+    }
+    out = run_scenarios(scenario_overrides, base=model_base)
+    start = time.perf_counter()
+    credit_screen = screen_thresholds(credit_metrics(out["group"]))
+    elapsed = time.perf_counter() - start
+    print(format_screen(credit_screen, out["years"]))
+    print(f"{n:,} scenarios screened against {len(RATING_THRESHOLDS)} thresholds in {elapsed * 1000:.1f} ms")
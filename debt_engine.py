@@ -0,0 +1,82 @@
+import numpy as np
+
+# --- Configuration & Constants ---
+DEBT_SOLVER_TOL = 1e-6 # £m; largest accepted |closing debt - implied closing debt| across all scenarios
+DEBT_SOLVER_MAX_ITER = 25
+
+# Line items of the schedule, matching the rows a Debt_Schedule_Forecast sheet would carry
+DEBT_LINE_ITEMS = ["Opening Net Debt", "Funding Requirement", "Interest", "Tax Shield on Interest", "Dividends", "Closing Net Debt", "Average Net Debt"]
+
+
+# --- Calculation ---
+@np.errstate(invalid='ignore') # inf - inf in a non-finite scenario only makes it NaN
+def solve_debt_schedule(opening_debt, cfo, capex, new_debt_rate, dividends=0.0, payout_ratio=0.0, profit_before_interest=0.0,
+                        tax_rate=0.0, existing_debt=0.0, existing_rate=0.0, tol=DEBT_SOLVER_TOL, max_iter=DEBT_SOLVER_MAX_ITER):
+    """
+    Rolls net debt forward with interest charged on average debt, resolving the interest/cash circularity in Python.
+
+    Each year, closing debt = opening + capex + dividends - cfo + interest x (1 - tax_rate), where
+      interest  = existing_rate x existing_debt + new_debt_rate x (average debt - existing_debt)
+      dividends = dividends + payout_ratio x max(profit_before_interest - interest x (1 - tax_rate), 0)
+    and average debt = (opening + closing) / 2. `cfo` is operating cash flow after pre-interest tax and
+    `profit_before_interest` is the matching post-tax profit, so both exclude interest and its tax shield.
+
+    All flows broadcast to (..., years), e.g. (scenarios x years); `opening_debt`, `existing_debt` and `existing_rate`
+    broadcast to the leading axes. The closing balance is found by Newton iteration on all scenarios at once; the
+    system is piecewise linear (the only kink is the dividend floor), so it settles in two or three steps.
+    Returns a dict keyed by DEBT_LINE_ITEMS plus 'iterations' (per year) and 'max_residual'. A scenario whose inputs
+    make the balance non-finite is left as NaN from that year on and does not hold up the others' convergence.
+    Raises RuntimeError if any finite scenario fails to converge within max_iter.
+    """
+    shape = np.broadcast_shapes(np.shape(cfo), np.shape(capex), np.shape(new_debt_rate), np.shape(dividends), np.shape(payout_ratio),
+                                np.shape(profit_before_interest), np.shape(tax_rate), np.shape(opening_debt) + (1,),
+                                np.shape(existing_debt) + (1,), np.shape(existing_rate) + (1,))
+    # The roll-forward runs year by year, so iterate over contiguous year-major slices
+    year_major = lambda arr: np.ascontiguousarray(np.moveaxis(np.broadcast_to(arr, shape), -1, 0))
+    cfo_y, capex_y, rate_y, fixed_div_y = year_major(cfo), year_major(capex), year_major(new_debt_rate), year_major(dividends)
+    payout_y, pbi_y, after_tax_y = year_major(payout_ratio), year_major(profit_before_interest), year_major(1.0 - np.asarray(tax_rate))
+    existing = np.broadcast_to(existing_debt, shape[:-1])
+    existing_interest = np.broadcast_to(existing_rate, shape[:-1]) * existing
+
+    n_years = shape[-1]
+    out = {item: np.empty((n_years,) + shape[:-1]) for item in DEBT_LINE_ITEMS}
+    iterations = np.zeros(n_years, dtype=int)
+    max_residual = 0.0
+    balance = np.broadcast_to(opening_debt, shape[:-1]).astype(float)
+    for y in range(n_years):
+        pre_interest_need = capex_y[y] + fixed_div_y[y] - cfo_y[y]
+        # Start from interest on opening debt, i.e. the usual one-pass approximation
+        closing = balance + pre_interest_need + after_tax_y[y] * (existing_interest + rate_y[y] * (balance - existing))
+        for it in range(1, max_iter + 1):
+            interest = existing_interest + rate_y[y] * (0.5 * (balance + closing) - existing)
+            net_interest = after_tax_y[y] * interest
+            profit = pbi_y[y] - net_interest
+            dividends_y = fixed_div_y[y] + payout_y[y] * np.maximum(profit, 0.0)
+            residual = closing - (balance + capex_y[y] + dividends_y - cfo_y[y] + net_interest)
+            finite = np.isfinite(residual)
+            worst = float(np.max(np.abs(residual[finite]))) if finite.any() else 0.0
+            if worst <= tol:
+                break
+            # d(implied closing)/d(closing): half the after-tax rate, less the share paid back out as dividends
+            slope = 0.5 * after_tax_y[y] * rate_y[y] * (1.0 - payout_y[y] * (profit > 0.0))
+            closing = closing - residual / (1.0 - slope)
+        else:
+            raise RuntimeError(f"Debt schedule did not converge in year {y} (max residual {worst:.3g} after {max_iter} iterations)")
+        iterations[y] = it
+        max_residual = max(max_residual, worst)
+        if not finite.all():
+            closing, interest, net_interest, dividends_y = (np.where(finite, arr, np.nan) for arr in (closing, interest, net_interest, dividends_y))
+
+        out["Opening Net Debt"][y] = balance
+        out["Funding Requirement"][y] = closing - balance
+        out["Interest"][y] = interest
+        out["Tax Shield on Interest"][y] = interest - net_interest
+        out["Dividends"][y] = dividends_y
+        out["Closing Net Debt"][y] = closing
+        out["Average Net Debt"][y] = 0.5 * (balance + closing)
+        balance = closing
+
+    results = {item: np.moveaxis(arr, 0, -1) for item, arr in out.items()}
+    results["iterations"] = iterations
+    results["max_residual"] = max_residual
+    return results
@@ -0,0 +1,642 @@
+import math
+import re
+from decimal import ROUND_HALF_UP, Decimal
+
+# --- Cell Addressing ---
+CELL_REF_RE = re.compile(r"^\$?([A-Z]{1,3})\$?([0-9]+)$")
+
+
+def column_index(col_letters):
+    """'A' -> 1, 'AB' -> 28 (same as openpyxl's column_index_from_string, without the import)."""
+    idx = 0
+    for ch in col_letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx
+
+
+def column_letter(col_idx):
+    """1 -> 'A', 28 -> 'AB'."""
+    letters = ""
+    while col_idx > 0:
+        col_idx, rem = divmod(col_idx - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def parse_cell_ref(ref):
+    """'$C$4' -> (row, col) = (4, 3)."""
+    match = CELL_REF_RE.match(ref.upper())
+    if not match:
+        raise ValueError(f"Not a cell reference: {ref}")
+    return int(match.group(2)), column_index(match.group(1))
+
+
+def cell_key(sheet, ref):
+    """Key used throughout the engine for a cell: (sheet name, row, col)."""
+    row, col = parse_cell_ref(ref)
+    return (sheet, row, col)
+
+
+def key_to_a1(key):
+    """(sheet, row, col) -> "'Sheet'!B3"."""
+    sheet, row, col = key
+    return f"'{sheet}'!{column_letter(col)}{row}"
+
+
+# --- Excel Errors ---
+class ExcelError:
+    """An Excel error value (#N/A, #VALUE!, ...). Errors propagate through the formulas that use them."""
+    def __init__(self, code):
+        self.code = code
+    def __repr__(self):
+        return self.code
+    def __eq__(self, other):
+        return isinstance(other, ExcelError) and other.code == self.code
+    def __hash__(self):
+        return hash(self.code)
+
+
+ERROR_NA = ExcelError("#N/A")
+ERROR_VALUE = ExcelError("#VALUE!")
+ERROR_REF = ExcelError("#REF!")
+ERROR_NAME = ExcelError("#NAME?")
+ERROR_DIV0 = ExcelError("#DIV/0!")
+ERROR_CIRCULAR = ExcelError("#CIRC!")
+
+
+class _ErrorSignal(Exception):
+    """Raised inside a compiled formula to short-circuit on an error operand."""
+    def __init__(self, error):
+        super().__init__(error.code)
+        self.error = error
+
+
+class FormulaParseError(ValueError):
+    pass
+
+
+# --- Tokeniser ---
+TOKEN_RE = re.compile(r"""
+    (?P<ws>\s+)
+  | (?P<string>"(?:[^"]|"")*")
+  | (?P<sheetref>(?:'(?:[^']|'')+'|[A-Za-z_][\w.]*)!(?:\$?[A-Z]{1,3}\$?[0-9]+(?::\$?[A-Z]{1,3}\$?[0-9]+)?(?![\w(])|[A-Za-z_][\w.]*))
+  | (?P<range>\$?[A-Z]{1,3}\$?[0-9]+:\$?[A-Z]{1,3}\$?[0-9]+(?![\w(]))
+  | (?P<ref>\$?[A-Z]{1,3}\$?[0-9]+(?![\w(]))
+  | (?P<number>(?:[0-9]+\.?[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?)
+  | (?P<func>[A-Za-z_][\w.]*(?=\())
+  | (?P<name>[A-Za-z_][\w.]*)
+  | (?P<op><>|<=|>=|[-+*/^&=<>%(),])
+""", re.VERBOSE)
+
+
+def tokenise(formula):
+    """Splits a formula (with or without the leading '=') into (kind, text) tokens."""
+    text = formula[1:] if formula.startswith("=") else formula
+    tokens, pos = [], 0
+    while pos < len(text):
+        match = TOKEN_RE.match(text, pos)
+        if not match:
+            raise FormulaParseError(f"Unexpected character {text[pos]!r} in {formula!r}")
+        pos = match.end()
+        if match.lastgroup != "ws":
+            tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+# --- Parser (tokens -> AST tuples) ---
+# Binary operator precedence, lowest first (Excel order)
+BINARY_PRECEDENCE = {"=": 1, "<>": 1, "<": 1, ">": 1, "<=": 1, ">=": 1, "&": 2, "+": 3, "-": 3, "*": 4, "/": 4, "^": 5}
+
+
+def _split_sheet(text):
+    sheet, ref = text.rsplit("!", 1)
+    if sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    return sheet, ref
+
+
+def _ref_node(sheet, ref):
+    if ":" in ref:
+        start, end = ref.split(":")
+        r1, c1 = parse_cell_ref(start)
+        r2, c2 = parse_cell_ref(end)
+        return ("range", sheet, min(r1, r2), min(c1, c2), max(r1, r2), max(c1, c2))
+    row, col = parse_cell_ref(ref)
+    return ("ref", (sheet, row, col))
+
+
+class _Parser:
+    def __init__(self, tokens, sheet, formula):
+        self.tokens, self.pos, self.sheet, self.formula = tokens, 0, sheet, formula
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def take(self, text=None):
+        tok = self.peek()
+        if tok[0] is None or (text is not None and tok[1] != text):
+            raise FormulaParseError(f"Expected {text or 'a value'} in {self.formula!r}")
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        node = self.expression(0)
+        if self.pos != len(self.tokens):
+            raise FormulaParseError(f"Unexpected {self.peek()[1]!r} in {self.formula!r}")
+        return node
+
+    def expression(self, min_prec):
+        node = self.unary()
+        while True:
+            kind, text = self.peek()
+            prec = BINARY_PRECEDENCE.get(text) if kind == "op" else None
+            if prec is None or prec < min_prec:
+                return node
+            self.take()
+            rhs = self.expression(prec + 1) # All binary operators are left-associative
+            node = ("binop", text, node, rhs)
+
+    def unary(self):
+        kind, text = self.peek()
+        if kind == "op" and text in ("+", "-"):
+            self.take()
+            operand = self.unary()
+            return ("neg", operand) if text == "-" else operand
+        return self.postfix(self.primary())
+
+    def postfix(self, node):
+        while self.peek() == ("op", "%"):
+            self.take()
+            node = ("pct", node)
+        return node
+
+    def primary(self):
+        kind, text = self.take()
+        if kind == "number":
+            return ("num", float(text))
+        if kind == "string":
+            return ("str", text[1:-1].replace('""', '"'))
+        if kind == "sheetref":
+            sheet, ref = _split_sheet(text)
+            if CELL_REF_RE.match(ref.split(":")[0]):
+                return _ref_node(sheet, ref)
+            return ("name", sheet, ref)
+        if kind in ("ref", "range"):
+            return _ref_node(self.sheet, text)
+        if kind == "name":
+            if text.upper() in ("TRUE", "FALSE"):
+                return ("bool", text.upper() == "TRUE")
+            return ("name", self.sheet, text)
+        if kind == "func":
+            self.take("(")
+            args = []
+            if self.peek() != ("op", ")"):
+                args.append(self.expression(0))
+                while self.peek() == ("op", ","):
+                    self.take()
+                    args.append(self.expression(0))
+            self.take(")")
+            return ("func", text.upper(), args)
+        if (kind, text) == ("op", "("):
+            node = self.expression(0)
+            self.take(")")
+            return node
+        raise FormulaParseError(f"Unexpected {text!r} in {self.formula!r}")
+
+
+def parse_formula(formula, sheet):
+    """Parses a formula string on `sheet` into an AST of nested tuples."""
+    return _Parser(tokenise(formula), sheet, formula).parse()
+
+
+# --- Runtime Helpers used by compiled formulas ---
+def _check(value):
+    if isinstance(value, ExcelError):
+        raise _ErrorSignal(value)
+    return value
+
+
+def _num(value):
+    value = _check(value)
+    if value is None:
+        return 0.0
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise _ErrorSignal(ERROR_VALUE)
+
+
+def _text(value):
+    value = _check(value)
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+def _binop(op, a, b):
+    if op == "+":
+        return _num(a) + _num(b)
+    if op == "-":
+        return _num(a) - _num(b)
+    if op == "*":
+        return _num(a) * _num(b)
+    if op == "/":
+        divisor = _num(b)
+        if divisor == 0:
+            raise _ErrorSignal(ERROR_DIV0)
+        return _num(a) / divisor
+    if op == "^":
+        return _num(a) ** _num(b)
+    if op == "&":
+        return _text(a) + _text(b)
+    a, b = _check(a), _check(b)
+    a = 0.0 if a is None else a
+    b = 0.0 if b is None else b
+    if isinstance(a, str) and isinstance(b, str):
+        a, b = a.lower(), b.lower()
+    elif isinstance(a, str) or isinstance(b, str):
+        return op in ("<>",) # Excel never equates text and numbers
+    return {"=": a == b, "<>": a != b, "<": a < b, ">": a > b, "<=": a <= b, ">=": a >= b}[op]
+
+
+def _flatten(args):
+    for arg in args:
+        if isinstance(arg, list):
+            for row in arg:
+                for value in row:
+                    yield value, True
+        else:
+            yield arg, False
+
+
+def _numbers(args):
+    """Numeric values of SUM-style arguments: text and blanks inside ranges are skipped, errors propagate."""
+    out = []
+    for value, from_range in _flatten(args):
+        _check(value)
+        if from_range:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                out.append(value)
+        elif value is not None:
+            out.append(_num(value))
+    return out
+
+
+def _fn_sum(*args):
+    return sum(_numbers(args))
+
+
+def _fn_min(*args):
+    nums = _numbers(args)
+    return min(nums) if nums else 0.0
+
+
+def _fn_max(*args):
+    nums = _numbers(args)
+    return max(nums) if nums else 0.0
+
+
+def _fn_average(*args):
+    nums = _numbers(args)
+    if not nums:
+        raise _ErrorSignal(ERROR_DIV0)
+    return sum(nums) / len(nums)
+
+
+def _fn_abs(value):
+    return abs(_num(value))
+
+
+def _fn_round(value, digits=0.0):
+    """Rounds half away from zero like Excel (Python's round() rounds half to even), on the shortest decimal repr."""
+    value, digits = _num(value), int(_num(digits))
+    if not math.isfinite(value) or abs(value) >= 1e15: # Past Excel's 15 significant digits there is nothing to round
+        return value
+    rounded = Decimal(repr(abs(value))).quantize(Decimal(1).scaleb(-digits), rounding=ROUND_HALF_UP)
+    return -float(rounded) if value < 0 and rounded else float(rounded)
+
+
+def _as_grid(value):
+    return value if isinstance(value, list) else [[value]]
+
+
+def _fn_index(grid, row_num, col_num=None):
+    grid = _as_grid(grid)
+    row_num = int(_num(row_num))
+    col_num = None if col_num is None else int(_num(col_num))
+    if col_num is None and len(grid) == 1: # INDEX(row_vector, n)
+        row_num, col_num = 1, row_num
+    col_num = col_num or 1
+    if not (1 <= row_num <= len(grid)) or not (1 <= col_num <= len(grid[0])):
+        raise _ErrorSignal(ERROR_REF)
+    return _check(grid[row_num - 1][col_num - 1])
+
+
+def _fn_match(lookup, grid, match_type=1.0):
+    lookup = _check(lookup)
+    values = [v for row in _as_grid(grid) for v in row]
+    match_type = int(_num(match_type))
+    if match_type == 0:
+        needle = lookup.lower() if isinstance(lookup, str) else lookup
+        for pos, value in enumerate(values, start=1):
+            if (value.lower() if isinstance(value, str) else value) == needle and value is not None:
+                return float(pos)
+        raise _ErrorSignal(ERROR_NA)
+    best = None
+    for pos, value in enumerate(values, start=1): # Approximate match over sorted data
+        if value is None or isinstance(value, str) != isinstance(lookup, str):
+            continue
+        if (match_type > 0 and value <= lookup) or (match_type < 0 and value >= lookup):
+            best = pos
+    if best is None:
+        raise _ErrorSignal(ERROR_NA)
+    return float(best)
+
+
+def _truthy(value):
+    value = _check(value)
+    if isinstance(value, str):
+        raise _ErrorSignal(ERROR_VALUE)
+    return bool(value)
+
+
+def _fn_if(cond, if_true, if_false=None):
+    if _truthy(cond()):
+        return if_true()
+    return if_false() if if_false is not None else False
+
+
+def _fn_iferror(value, fallback):
+    try:
+        return _check(value())
+    except _ErrorSignal:
+        return fallback()
+
+
+def _fn_and(*args):
+    return all(_truthy(v) for v, _ in _flatten(args) if v is not None)
+
+
+def _fn_or(*args):
+    return any(_truthy(v) for v, _ in _flatten(args) if v is not None)
+
+
+def _fn_not(value):
+    return not _truthy(value)
+
+
+# Supported worksheet functions: NAME -> (runtime helper, arguments evaluated lazily)
+FUNCTIONS = {
+    "SUM": (_fn_sum, False),
+    "MIN": (_fn_min, False),
+    "MAX": (_fn_max, False),
+    "AVERAGE": (_fn_average, False),
+    "ABS": (_fn_abs, False),
+    "ROUND": (_fn_round, False),
+    "INDEX": (_fn_index, False),
+    "MATCH": (_fn_match, False),
+    "IF": (_fn_if, True),
+    "IFERROR": (_fn_iferror, True),
+    "AND": (_fn_and, False),
+    "OR": (_fn_or, False),
+    "NOT": (_fn_not, False),
+}
+
+_RUNTIME = {
+    "_binop": _binop, "_num": _num, "_ErrorSignal": _ErrorSignal,
+    "ERROR_NAME": ERROR_NAME, **{f"_f_{name}": fn for name, (fn, _) in FUNCTIONS.items()},
+}
+
+
+# --- Compiler (AST -> Python function) ---
+def _codegen(node, slots):
+    """Emits a Python expression for an AST. Cell reads become V[i] against a per-formula slot list."""
+    kind = node[0]
+    if kind == "num":
+        return repr(node[1])
+    if kind == "str":
+        return repr(node[1])
+    if kind == "bool":
+        return repr(node[1])
+    if kind == "ref":
+        slots.append(node[1])
+        return f"V[{len(slots) - 1}]"
+    if kind == "range":
+        _, sheet, r1, c1, r2, c2 = node
+        rows = []
+        for r in range(r1, r2 + 1):
+            cols = []
+            for c in range(c1, c2 + 1):
+                slots.append((sheet, r, c))
+                cols.append(f"V[{len(slots) - 1}]")
+            rows.append("[" + ", ".join(cols) + "]")
+        return "[" + ", ".join(rows) + "]"
+    if kind == "name":
+        return "_raise(ERROR_NAME)"
+    if kind == "neg":
+        return f"(-_num({_codegen(node[1], slots)}))"
+    if kind == "pct":
+        return f"(_num({_codegen(node[1], slots)}) / 100.0)"
+    if kind == "binop":
+        return f"_binop({node[1]!r}, {_codegen(node[2], slots)}, {_codegen(node[3], slots)})"
+    if kind == "func":
+        name, args = node[1], node[2]
+        if name not in FUNCTIONS:
+            return "_raise(ERROR_NAME)"
+        lazy = FUNCTIONS[name][1]
+        arg_code = [_codegen(arg, slots) for arg in args]
+        if lazy:
+            arg_code = [f"(lambda: {code})" for code in arg_code]
+        return f"_f_{name}({', '.join(arg_code)})"
+    raise FormulaParseError(f"Unknown node {kind}")
+
+
+def _raise(error):
+    raise _ErrorSignal(error)
+
+
+_RUNTIME["_raise"] = _raise
+
+
+def compile_formula(formula, sheet):
+    """
+    Compiles a formula into (function, dependency keys). The function takes the list of dependency
+    values (in the same order) and returns the cell value, or an ExcelError.
+    """
+    ast = parse_formula(formula, sheet)
+    slots = []
+    expr = _codegen(ast, slots)
+    body = eval(compile(f"lambda V: {expr}", f"<{sheet}:{formula}>", "eval"), dict(_RUNTIME)) # noqa: S307 - generated from our own AST
+
+    def evaluate(values):
+        try:
+            return body(values)
+        except _ErrorSignal as err:
+            return err.error
+        except ZeroDivisionError:
+            return ERROR_DIV0
+        except (TypeError, ValueError, OverflowError):
+            return ERROR_VALUE
+    return evaluate, slots
+
+
+# --- Workbook Model ---
+def cells_from_workbook(wb):
+    """Reads every non-empty cell of an openpyxl workbook into {(sheet, row, col): value or formula string}."""
+    cells = {}
+    for ws in wb.worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                value = cell.value
+                if value is None:
+                    continue
+                if not isinstance(value, (str, int, float, bool)):
+                    value = getattr(value, "text", None) or str(value) # Array formulas etc.
+                cells[(ws.title, cell.row, cell.column)] = value
+    return cells
+
+
+def load_workbook_cells(path):
+    """Reads the cells (formulas, not cached values) of a saved workbook."""
+    import openpyxl
+    wb = openpyxl.load_workbook(path, data_only=False, read_only=True)
+    try:
+        cells = {}
+        for ws in wb.worksheets:
+            for row in ws.iter_rows():
+                for cell in row:
+                    if getattr(cell, "value", None) is not None:
+                        cells[(ws.title, cell.row, cell.column)] = cell.value
+        return cells
+    finally:
+        wb.close()
+
+
+class FormulaModel:
+    """
+    Dependency graph over a workbook's formula cells. Formulas are compiled once; evaluation plans
+    (topologically ordered formula cells needed for a set of targets) are cached per target set.
+    """
+
+    def __init__(self, cells):
+        self.cells = cells
+        self.formulas = {} # key -> (compiled fn, dependency keys)
+        self.parse_errors = {} # key -> message
+        self._plans = {}
+        for key, value in cells.items():
+            if isinstance(value, str) and value.startswith("=") and len(value) > 1:
+                try:
+                    self.formulas[key] = compile_formula(value, key[0])
+                except (FormulaParseError, ValueError) as err:
+                    self.parse_errors[key] = str(err)
+
+    @classmethod
+    def from_workbook(cls, wb_or_path):
+        """Builds the model from an openpyxl Workbook or a path to an .xlsx file."""
+        if isinstance(wb_or_path, str):
+            return cls(load_workbook_cells(wb_or_path))
+        return cls(cells_from_workbook(wb_or_path))
+
+    def precedents(self, key):
+        """Cells a formula cell reads directly."""
+        return list(self.formulas[key][1]) if key in self.formulas else []
+
+    def plan(self, targets=None):
+        """Returns the formula cells needed for `targets` (default: all formulas) in evaluation order."""
+        plan_key = None if targets is None else tuple(sorted(set(targets)))
+        if plan_key in self._plans:
+            return self._plans[plan_key]
+
+        order, state = [], {} # state: 1 = on the current path, 2 = done
+        cycles = set()
+        roots = list(self.formulas) if targets is None else list(plan_key)
+        for root in roots:
+            if state.get(root) == 2 or root not in self.formulas:
+                continue
+            stack = [(root, iter(self.formulas[root][1]))]
+            state[root] = 1
+            while stack:
+                key, deps = stack[-1]
+                for dep in deps:
+                    if dep not in self.formulas or state.get(dep) == 2:
+                        continue
+                    if state.get(dep) == 1:
+                        cycles.add(dep) # Circular reference: evaluated as #CIRC! rather than looping
+                        continue
+                    state[dep] = 1
+                    stack.append((dep, iter(self.formulas[dep][1])))
+                    break
+                else:
+                    stack.pop()
+                    state[key] = 2
+                    order.append(key)
+
+        plan = (tuple(order), frozenset(cycles))
+        self._plans[plan_key] = plan
+        return plan
+
+    def evaluate(self, targets=None, overrides=None):
+        """
+        Evaluates the formulas needed for `targets` (cell keys; default all) and returns {key: value}
+        for every evaluated formula cell. `overrides` replaces input cell values for this evaluation.
+        """
+        order, cycles = self.plan(targets)
+        values = dict(overrides or {})
+        cells = self.cells
+        for key in order:
+            fn, deps = self.formulas[key]
+            if key in cycles:
+                values[key] = ERROR_CIRCULAR
+                continue
+            args = []
+            for dep in deps:
+                if dep in values:
+                    args.append(values[dep])
+                elif dep in self.parse_errors:
+                    args.append(ERROR_NAME)
+                elif dep in self.formulas: # Not yet evaluated, so part of a circular reference
+                    args.append(ERROR_CIRCULAR)
+                else:
+                    args.append(cells.get(dep))
+            values[key] = fn(args)
+        return {key: values[key] for key in order}
+
+    def value(self, sheet, ref):
+        """Evaluates and returns a single cell, e.g. model.value('RAV_RateBase_Forecast', 'C8')."""
+        key = cell_key(sheet, ref)
+        if key not in self.formulas:
+            return self.cells.get(key)
+        return self.evaluate([key])[key]
+
+    def error_cells(self, results=None):
+        """Formula cells that evaluate to an Excel error (or failed to parse): {key: error code or message}."""
+        results = self.evaluate() if results is None else results
+        errors = {key: val.code for key, val in results.items() if isinstance(val, ExcelError)}
+        errors.update(self.parse_errors)
+        return errors
+
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("Usage: python formula_engine.py Workbook.xlsx [Sheet!A1 ...]")
+        sys.exit(1)
+    model = FormulaModel.from_workbook(sys.argv[1])
+    if len(sys.argv) > 2:
+        for arg in sys.argv[2:]:
+            sheet_name, ref = _split_sheet(arg)
+            print(f"{arg} = {model.value(sheet_name, ref)!r}")
+    else:
+        results = model.evaluate()
+        errors = model.error_cells(results)
+        print(f"{len(results)} formula cells evaluated, {len(errors)} with errors")
+        for key, code in sorted(errors.items())[:50]:
+            print(f"  {key_to_a1(key)}: {code}")
@@ -0,0 +1,104 @@
+from functools import lru_cache
+
+from formula_engine import CELL_REF_RE, TOKEN_RE, FormulaParseError, column_index, column_letter
+
+# --- Configuration & Constants ---
+# How a reference's column moves when a forecast formula is rendered for later years:
+#   "year"     - Assumptions_* links: the column is the year's column on the assumptions sheet
+#   "pinned"   - Hist_* links and $-absolute columns: never moves
+#   "relative" - everything else (same sheet or other forecast sheets): shifts right one column per year
+ASSUMPTIONS_SHEET_PREFIX = "Assumptions_"
+HISTORICAL_SHEET_PREFIX = "Hist_"
+ASSUMPTIONS_FIRST_YEAR_COL = 3 # Column C: assumption CSVs are laid out Assumption, Unit, FY2025, ...
+
+
+# --- Template Compilation ---
+@lru_cache(maxsize=None)
+def _column_letters(first_col_idx, n_cols):
+    """Column letters for n_cols consecutive columns, shared by every template that renders them."""
+    return tuple(column_letter(first_col_idx + i) for i in range(n_cols))
+
+
+def _slot_kind(sheet_prefix):
+    sheet = sheet_prefix.rstrip("!").strip("'")
+    if sheet.startswith(ASSUMPTIONS_SHEET_PREFIX):
+        return "year"
+    if sheet.startswith(HISTORICAL_SHEET_PREFIX):
+        return "pinned"
+    return "relative"
+
+
+def _endpoint(ref):
+    """'$C$4' -> (is_absolute_col, col_idx, row_text) where row_text keeps any '$' on the row."""
+    is_abs = ref.startswith("$")
+    ref = ref.lstrip("$")
+    split = next(i for i, ch in enumerate(ref) if not ch.isalpha())
+    return is_abs, column_index(ref[:split]), ref[split:]
+
+
+class FormulaTemplate:
+    """
+    A base formula (written for the first forecast year) split once into literal text and reference slots.
+    render_years() then produces the formula for every year with string joins only.
+    """
+
+    def __init__(self, base_formula, assumptions_first_col=ASSUMPTIONS_FIRST_YEAR_COL):
+        self.base_formula = base_formula
+        self.assumptions_first_col = assumptions_first_col
+        self.parts = [] # Literal strings and (sheet_prefix, kind, endpoints) slots
+        if not isinstance(base_formula, str) or not base_formula.startswith("="):
+            return # Constants and blanks render unchanged
+        text, pos, literal_start = base_formula, 1, 0
+        while pos < len(text):
+            match = TOKEN_RE.match(text, pos)
+            if not match:
+                raise FormulaParseError(f"Unexpected character {text[pos]!r} in {base_formula!r}")
+            kind = match.lastgroup
+            if kind in ("sheetref", "range", "ref"):
+                token = match.group()
+                sheet_prefix, _, refs = token.rpartition("!")
+                sheet_prefix = sheet_prefix + "!" if sheet_prefix else ""
+                if all(CELL_REF_RE.match(ref) for ref in refs.split(":")): # Not a defined name
+                    self.parts.append(text[literal_start:match.start()])
+                    self.parts.append((sheet_prefix, _slot_kind(sheet_prefix), [_endpoint(ref) for ref in refs.split(":")]))
+                    literal_start = match.end()
+            pos = match.end()
+        self.parts.append(text[literal_start:])
+
+    def _slot_refs(self, sheet_prefix, kind, endpoint, n_years, first_year_idx):
+        is_abs, col_idx, row_text = endpoint
+        if is_abs or kind == "pinned":
+            return [f"{sheet_prefix}{'$' if is_abs else ''}{column_letter(col_idx)}{row_text}"] * n_years
+        first_col = self.assumptions_first_col if kind == "year" else col_idx
+        return [sheet_prefix + letters + row_text for letters in _column_letters(first_col + first_year_idx, n_years)]
+
+    def render_years(self, n_years, first_year_idx=0):
+        """Formulas for year indices first_year_idx .. first_year_idx + n_years - 1 (0 = the base formula's year)."""
+        if len(self.parts) <= 1:
+            return [self.base_formula] * n_years
+        columns = []
+        for part in self.parts:
+            if isinstance(part, str):
+                columns.append([part] * n_years)
+                continue
+            sheet_prefix, kind, endpoints = part
+            columns.append(self._slot_refs(sheet_prefix, kind, endpoints[0], n_years, first_year_idx))
+            if len(endpoints) == 2: # Range: the second endpoint follows the same rule, without repeating the sheet
+                columns.append([":"] * n_years)
+                columns.append(self._slot_refs("", kind, endpoints[1], n_years, first_year_idx))
+        return ["".join(pieces) for pieces in zip(*columns)]
+
+    def render(self, year_idx):
+        """Formula for a single year index (0 = the base formula's year)."""
+        return self.render_years(1, year_idx)[0]
+
+
+@lru_cache(maxsize=None)
+def compile_formula_template(base_formula, assumptions_first_col=ASSUMPTIONS_FIRST_YEAR_COL):
+    """Compiles (and caches) the template for a base formula; non-formula values give a constant template."""
+    return FormulaTemplate(base_formula, assumptions_first_col)
+
+
+def render_formula_years(base_formula, n_years, assumptions_first_col=ASSUMPTIONS_FIRST_YEAR_COL):
+    """Convenience wrapper: the base formula dragged across n_years forecast columns."""
+    return compile_formula_template(base_formula, assumptions_first_col).render_years(n_years)
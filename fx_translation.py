@@ -0,0 +1,101 @@
+import numpy as np
+
+from model_inputs import FORECAST_YEARS_MODEL, get_row_values
+
+# --- Configuration & Constants ---
+REPORTING_CURRENCY = "GBP"
+
+# Currencies the segments report in: (Unit, Currency, Average Rate Input, Closing Rate Input).
+# Rates are quoted as currency units per £1 (GBP:USD 1.25 = $1.25); the reporting currency has no rate inputs.
+FX_CURRENCIES = [
+    ("£m", "GBP", None, None),
+    ("$m", "USD", "fx_avg", "fx_year_end"),
+]
+FX_UNITS = [ccy[0] for ccy in FX_CURRENCIES]
+
+# Rate links in the assumption CSVs: (Input Key, CSV, Section, Row Ref Item, Expected Macro Item). Each year's
+# "Row Ref" holds the assumptions_macro.csv row number of the rate; the links are resolved once at load and must
+# point at the expected rate row.
+FX_RATE_LINKS = [
+    ("fx_avg", "assumptions_us_reg.csv", None, "FX Avg Rate Ref (Row in Assumptions_Macro)", "GBP:USD Exchange Rate (Average)"),
+    ("fx_year_end", "assumptions_us_reg.csv", None, "FX Year End Rate Ref (Row in Assumptions_Macro)", "GBP:USD Exchange Rate (Year End)"),
+]
+FX_MACRO_CSV = "assumptions_macro.csv"
+
+# Translation bases: P&L and cash flow at the year's average rate, balances (RAV / rate base, balance sheet) at the
+# closing rate
+FX_BASES = ("average", "closing")
+
+
+# --- Input Loading ---
+def load_fx_inputs(tables):
+    """
+    Resolves the FX "Row Ref" links into rate arrays (years,) keyed by FX_RATE_LINKS input keys, with one gather per
+    rate. Raises ValueError if a link points at a row other than its expected rate.
+    """
+    n_years = len(FORECAST_YEARS_MODEL)
+    macro = tables[FX_MACRO_CSV]
+    row_position = {row["row"]: idx for idx, row in enumerate(macro["rows"])}
+    rates = {}
+    for key, csv_name, section, ref_item, expected_item in FX_RATE_LINKS:
+        refs = get_row_values(tables[csv_name], ref_item, section)[:n_years]
+        if np.isnan(refs).any():
+            raise ValueError(f"{csv_name}: '{ref_item}' has blank years")
+        positions = [row_position.get(int(ref)) for ref in refs]
+        wrong = sorted({int(ref) for ref, pos in zip(refs, positions) if pos is None or macro["rows"][pos]["item"] != expected_item})
+        if wrong:
+            raise ValueError(f"{csv_name}: '{ref_item}' points at {FX_MACRO_CSV} rows {wrong}, expected '{expected_item}'")
+        rates[key] = macro["values"][positions, np.arange(n_years)].copy()
+    return rates
+
+
+# --- Translation ---
+def currency_codes(units):
+    """Segment units (e.g. ['£m', '£m', '$m', '$m']) -> indices into FX_CURRENCIES. Unknown units raise ValueError."""
+    unknown = sorted(set(units) - set(FX_UNITS))
+    if unknown:
+        raise ValueError(f"No FX rates for units {unknown}; known: {FX_UNITS}")
+    return np.array([FX_UNITS.index(unit) for unit in units])
+
+
+def fx_rates(inputs, basis):
+    """
+    Rates per currency for one basis: (..., currencies, years), 1.0 for the reporting currency. 'average' uses the
+    average rate inputs and 'closing' the year-end ones; leading scenario axes are kept.
+    """
+    if basis not in FX_BASES:
+        raise ValueError(f"Unknown translation basis '{basis}'; use one of {FX_BASES}")
+    col = 2 if basis == "average" else 3
+    shape = np.broadcast_shapes(*(np.shape(inputs[ccy[col]]) for ccy in FX_CURRENCIES if ccy[col]))
+    return np.stack([np.ones(shape) if ccy[col] is None else np.broadcast_to(inputs[ccy[col]], shape) for ccy in FX_CURRENCIES], axis=-2)
+
+
+def translate(values, units, inputs, basis="average"):
+    """
+    Native-currency segment values (..., segments, years) -> £m at the basis rate, in one gather and one divide.
+    FX stress scenarios broadcast through the rate inputs' leading axes.
+    """
+    rates = fx_rates(inputs, basis)[..., currency_codes(units), :]
+    return values / rates
+
+
+def translation_difference(opening, closing, units, inputs):
+    """
+    FX translation difference on a balance rolled forward in native currency, (..., segments, years) in £m:
+    closing at the closing rate, less opening at the prior closing rate, less the year's movements at the average
+    rate. The first year's opening balance is translated at that year's average rate (no prior closing rate is
+    held), matching the FY2024 US opex translation in scenario_engine. Opening + movements + difference = closing in £m.
+    """
+    average = fx_rates(inputs, "average")
+    closing_rates = fx_rates(inputs, "closing")
+    opening_rates = np.concatenate([average[..., :1], closing_rates[..., :-1]], axis=-1)
+    codes = currency_codes(units)
+    return (closing / closing_rates[..., codes, :] - opening / opening_rates[..., codes, :]
+            - (closing - opening) / average[..., codes, :])
+
+
+if __name__ == "__main__":
+    from model_inputs import load_input_tables
+    fx = load_fx_inputs(load_input_tables(".", [FX_MACRO_CSV, "assumptions_us_reg.csv"]))
+    for key, *_ in FX_RATE_LINKS:
+        print(f"{key}: {', '.join(f'{v:.2f}' for v in fx[key][:6])} ...")
@@ -1,13 +1,32 @@
-```python
+import math
 import openpyxl
-import csv
+import os
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter, column_index_from_string
+from openpyxl.utils import get_column_letter
+
+from credit_engine import CREDIT_METRIC_KEYS, CREDIT_METRICS, RATING_THRESHOLDS, run_credit_screen
+from formula_templates import compile_formula_template
+from input_validation import format_failures, has_errors, validate_inputs
+from model_inputs import load_model_csv
+from regen_manifest import regenerate
+from sensitivity_engine import SENSITIVITY_BUMPS, SENSITIVITY_METRICS, run_sensitivities, tornado_order
+from time_axis import TimeAxis
 
 # --- Configuration & Constants ---
 HISTORICAL_YEARS_DATA = ["FY2020", "FY2021", "FY2022", "FY2023", "FY2024"]
-FORECAST_YEARS_MODEL = [f"FY{2025 + i}" for i in range(16)] # FY2025 to FY2040
-DISPLAY_YEARS = HISTORICAL_YEARS_DATA[-2:] + FORECAST_YEARS_MODEL
+FORECAST_YEARS_MODEL = [f"FY{2025 + i}" for i in range(16)] # FY2025 to FY2040, the assumption CSV columns
+# Forecast sheet columns, e.g. TimeAxis(last_year=2070, frequency="quarterly"); assumptions are phased per period
+TIME_AXIS = TimeAxis()
+FORECAST_PERIODS = TIME_AXIS.labels
+DISPLAY_YEARS = HISTORICAL_YEARS_DATA[-2:] + FORECAST_PERIODS
+# True: stream sheets through the write-only backend (flat memory; any change rebuilds all sheets)
+STREAMING_OUTPUT = False
+# True: write each formula's result (evaluated by formula_engine) as its cached value, so the saved file opens without
+# a recalculation and non-Excel readers see numbers
+CACHE_FORMULA_VALUES = True
+# Historical identity and assumption range checks before building: 'warn' reports failures, 'strict' also refuses
+# to build on errors, 'off' skips them
+VALIDATE_INPUTS = "warn"
 
 # --- Styling Definitions ---
 COLOR_PRIMARY_BLUE = "4F81BD"
@@ -21,6 +40,8 @@ FONT_HEADER = Font(bold=True, color=COLOR_WHITE, name='Calibri', size=11)
 FONT_SUBHEADER = Font(bold=True, color=COLOR_BLACK, name='Calibri', size=11)
 FONT_INPUT = Font(color=COLOR_INPUT_BLUE, name='Calibri', size=10)
 FONT_FORMULA = Font(color=COLOR_BLACK, name='Calibri', size=10)
+FONT_ROW_LABEL = Font(bold=True, name='Calibri', size=10)
+FONT_DEFAULT = Font(name='Calibri', size=10)
 
 FILL_HEADER = PatternFill(start_color=COLOR_PRIMARY_BLUE, end_color=COLOR_PRIMARY_BLUE, fill_type="solid")
 FILL_SUBHEADER = PatternFill(start_color=COLOR_SECONDARY_BLUE, end_color=COLOR_SECONDARY_BLUE, fill_type="solid")
@@ -37,6 +58,7 @@ FORMAT_NUMBER_0DP = '#,##0'
 FORMAT_NUMBER_0DP_NEG_PAREN = '#,##0;(#,##0);0' # Added zero display
 FORMAT_NUMBER_2DP = '#,##0.00'
 FORMAT_MULTIPLIER = '0.00x'
+FORMAT_PERCENT_2DP = '0.00%'
 
 # --- Helper Functions ---
 def setup_sheet_headers(ws, title, years_list, first_data_col_idx=2, row_num=1, notes_col=True, first_col_width=45):
@@ -63,7 +85,7 @@ def setup_sheet_headers(ws, title, years_list, first_data_col_idx=2, row_num=1,
         ws.column_dimensions[get_column_letter(notes_col_idx)].width = 50
 
 def style_row_header(cell, level=1, fill=True):
-    cell.font = FONT_SUBHEADER if level == 1 else Font(bold=True, name='Calibri', size=10)
+    cell.font = FONT_SUBHEADER if level == 1 else FONT_ROW_LABEL
     if level == 1 and fill:
         cell.fill = FILL_SUBHEADER
     cell.alignment = ALIGN_LEFT
@@ -75,57 +97,51 @@ def style_data_cell(cell, is_input=False, number_format=FORMAT_NUMBER_0DP_NEG_PA
     elif is_formula:
         cell.font = FONT_FORMULA
     else:
-        cell.font = Font(name='Calibri', size=10) # Default for text notes
+        cell.font = FONT_DEFAULT # Default for text notes
 
     cell.number_format = number_format
     cell.alignment = ALIGN_RIGHT if not (isinstance(cell.value, str) and not cell.value.startswith("=")) else ALIGN_LEFT
     cell.border = BORDER_THIN_ALL
 
+def set_column_widths(ws, widths_dict):
+    """Sets column widths from a dictionary {col_letter: width}."""
+    for col_letter, width in widths_dict.items():
+        ws.column_dimensions[col_letter].width = width
+
 
 def load_csv_to_sheet(ws, csv_filename, start_row=1, is_assumptions_sheet=False, header_row_offset=0):
+    """Lays out a parsed input table (from the parsed-input cache) on the sheet, keeping the CSV's row numbers."""
     try:
-        with open(csv_filename, 'r', newline='') as f:
-            reader = csv.reader(f)
-            for r_idx, row_content in enumerate(reader):
-                actual_row = start_row + r_idx + header_row_offset
-                for c_idx, value in enumerate(row_content):
-                    cell = ws.cell(row=actual_row, column=c_idx + 1)
-                    # Special handling for section headers in CSVs
-                    is_section_header_csv = all(v == '' for v in row_content[1:]) and row_content[0] != "Assumption" and row_content[0] != "Line Item (£m)" and row_content[0] != "Line Item"
-
-                    if r_idx == 0 and start_row == 1 and header_row_offset == 0: # Main CSV header row
-                        cell.value = value
-                        style_row_header(cell, level=1 if c_idx == 0 else 2, fill=False)
-                        if c_idx > 0 :
-                             cell.fill = FILL_HEADER
-                             cell.font = FONT_HEADER
-                             cell.alignment = ALIGN_CENTER
-                    elif is_section_header_csv:
-                        cell.value = value # Section name in first col
-                        ws.merge_cells(start_row=actual_row, start_column=1, end_row=actual_row, end_column=len(row_content))
-                        cell.font = FONT_HEADER; cell.fill = FILL_HEADER; cell.alignment = ALIGN_CENTER
-                        break # Skip rest of the columns for this merged row
-                    elif c_idx == 0: # First column (row description)
-                        cell.value = value
-                        style_row_header(cell, level=2, fill=False)
-                    else: # Data area
-                        try:
-                            if value is None or value.strip() == "": cell.value = None # Keep blanks
-                            elif '%' in value:
-                                num_val = float(value.strip('%')) / 100
-                                cell.value = num_val
-                                style_data_cell(cell, is_input=is_assumptions_sheet, number_format=FORMAT_PERCENT_1DP, is_formula=value.startswith("="))
-                            elif value.replace(',','').replace('(','-').replace(')','').replace('-','',1).isdigit() or (value.startswith('-') and value[1:].replace(',','').isdigit()): # Check if it's a number, allowing for commas and parentheses negatives
-                                num_val = float(value.replace(',','').replace('(','-').replace(')',''))
-                                cell.value = num_val
-                                style_data_cell(cell, is_input=is_assumptions_sheet, number_format=FORMAT_NUMBER_0DP_NEG_PAREN, is_formula=value.startswith("="))
-                            else: # Text (likely notes or formulas not converted)
-                                cell.value = value
-                                style_data_cell(cell, is_input=is_assumptions_sheet, number_format='General', is_formula=value.startswith("="))
-                        except ValueError: # Keep as text if conversion fails
-                            cell.value = value
-                            style_data_cell(cell, is_input=is_assumptions_sheet, number_format='General', is_formula=value.startswith("="))
-                            cell.alignment = ALIGN_LEFT
+        table = load_model_csv(csv_filename)
+        header = table["header"]
+        n_cols = len(header)
+        first_year_col = header.index(table["years"][0]) + 1 if table["years"] else n_cols + 1
+        notes_col = first_year_col + len(table["years"])
+        row_offset = start_row - 1 + header_row_offset
+
+        for c_idx, value in enumerate(header, start=1): # Main CSV header row
+            cell = ws.cell(row=row_offset + 1, column=c_idx, value=value)
+            style_row_header(cell, level=1 if c_idx == 1 else 2, fill=False)
+            if c_idx > 1:
+                cell.fill = FILL_HEADER; cell.font = FONT_HEADER; cell.alignment = ALIGN_CENTER
+
+        for section in table["sections"]: # Section headers: name in first col, merged across the table
+            actual_row = row_offset + section["row"]
+            cell = ws.cell(row=actual_row, column=1, value=section["label"])
+            ws.merge_cells(start_row=actual_row, start_column=1, end_row=actual_row, end_column=n_cols)
+            cell.font = FONT_HEADER; cell.fill = FILL_HEADER; cell.alignment = ALIGN_CENTER
+
+        for row, row_values in zip(table["rows"], table["values"].tolist()):
+            actual_row = row_offset + row["row"]
+            style_row_header(ws.cell(row=actual_row, column=1, value=row["item"]), level=2, fill=False)
+            number_format = FORMAT_PERCENT_1DP if row["unit"] == "%" else FORMAT_NUMBER_0DP_NEG_PAREN
+            for c_idx, value in enumerate(row_values, start=first_year_col):
+                if value == value: # Blanks are NaN
+                    style_data_cell(ws.cell(row=actual_row, column=c_idx, value=value), is_input=is_assumptions_sheet, number_format=number_format)
+            if row["unit"]:
+                style_data_cell(ws.cell(row=actual_row, column=2, value=row["unit"]), is_input=is_assumptions_sheet, number_format='General')
+            if row["notes"]:
+                style_data_cell(ws.cell(row=actual_row, column=notes_col, value=row["notes"]), is_input=is_assumptions_sheet, number_format='General')
     except FileNotFoundError:
         error_msg = f"Error: {csv_filename} not found. Please create it."
         ws.cell(row=start_row, column=1, value=error_msg)
@@ -136,85 +152,22 @@ def load_csv_to_sheet(ws, csv_filename, start_row=1, is_assumptions_sheet=False,
         print(error_msg)
 
 
-def make_formula_draggable(base_formula, current_year_idx, first_forecast_year_col_idx, sheet_name_for_assumptions_offset=None):
-    """
-    Adjusts column letters in a formula string for dragging.
-    `current_year_idx` is 0 for the first forecast year, 1 for the second, etc.
-    `first_forecast_year_col_idx` is the actual column index (e.g., 4 for 'D').
-    `sheet_name_for_assumptions_offset` is used if assumptions are in different columns than data.
-    """
-    if not isinstance(base_formula, str) or not base_formula.startswith("="):
-        return base_formula
-
-    # Regex to find cell references like A1, $A1, A$1, $A$1, SheetName!A1, etc.
-    # It also captures simple ranges like A1:B2
-    pattern = re.compile(r"(\'?\w+\'?!)?(\$?[A-Z]+)(\$?[0-9]+)(:(\$?[A-Z]+)(\$?[0-9]+))?")
-    
-    def replace_col(match):
-        sheet_prefix, col_abs_rel, row_abs_rel, range_sep, col2_abs_rel, row2_abs_rel = match.groups()
-        
-        original_col_str = col_abs_rel.replace("$", "")
-        original_col_idx = column_index_from_string(original_col_str)
-        
-        # Determine the correct base column index for assumptions (they don't shift with DISPLAY_YEARS history)
-        # Assumptions usually start their forecast data in column C (index 3) in their CSVs/sheets
-        # after "Assumption" and "Unit" columns.
-        # The main data sheets (forecasts) might have historical years first.
-        
-        is_assumption_link = sheet_prefix and "Assumptions_" in sheet_prefix
-        is_historical_link = sheet_prefix and "Hist_" in sheet_prefix
-
-        if is_assumption_link:
-            # Assumptions columns (C, D, E...) correspond to forecast years (FY25, FY26, FY27...)
-            # The first assumption column is C (index 3 in its own sheet).
-            # current_year_idx is 0 for FY25, 1 for FY26...
-            final_col_idx = 3 + current_year_idx # C is 3rd col, D is 4th, etc.
-        elif is_historical_link:
-            # Historical links should generally be absolute or carefully handled, not simply dragged.
-            # For this function, assume they are not meant to be dragged relative to forecast years.
-            final_col_idx = original_col_idx # Keep historical links as they are in the base formula
-        else: # Refers to a cell on the SAME forecast sheet or another forecast sheet
-            final_col_idx = original_col_idx + current_year_idx
-            
-        new_col_str = ("$" if "$" in col_abs_rel else "") + get_column_letter(final_col_idx)
-        
-        # Handle ranges (like A1:B2)
-        if range_sep:
-            original_col2_str = col2_abs_rel.replace("$", "")
-            original_col2_idx = column_index_from_string(original_col2_str)
-            if is_assumption_link:
-                 final_col2_idx = 3 + current_year_idx # Assuming range is within same year's assumption data
-            elif is_historical_link:
-                 final_col2_idx = original_col2_idx
-            else:
-                 final_col2_idx = original_col2_idx + current_year_idx
-            new_col2_str = ("$" if "$" in col2_abs_rel else "") + get_column_letter(final_col2_idx)
-            return f"{sheet_prefix or ''}{new_col_str}{row_abs_rel}{range_sep}{new_col2_str}{row2_abs_rel}"
-        else:
-            return f"{sheet_prefix or ''}{new_col_str}{row_abs_rel}"
-
-    return pattern.sub(replace_col, base_formula)
-
-
-# --- Create Workbook ---
-wb = openpyxl.Workbook()
-wb.remove(wb.active) # Remove default sheet
-
 # --- Load CSV Data into Sheets ---
 csv_files_info = [
-    ("Assumptions_Macro", "assumptions_macro.csv", FORECAST_YEARS_MODEL, True, 1), # SheetName, CSV_File, YearList, IsAssumptions, CSV_Header_Offset
-    ("Assumptions_UK_Reg", "assumptions_uk_reg.csv", FORECAST_YEARS_MODEL, True, 1),
-    ("Assumptions_US_Reg", "assumptions_us_reg.csv", FORECAST_YEARS_MODEL, True, 1),
-    ("Assumptions_NGV", "assumptions_ngv.csv", FORECAST_YEARS_MODEL, True, 1),
+    ("Assumptions_Macro", "assumptions_macro.csv", FORECAST_YEARS_MODEL, True, 0), # SheetName, CSV_File, YearList, IsAssumptions, CSV_Header_Offset
+    ("Assumptions_UK_Reg", "assumptions_uk_reg.csv", FORECAST_YEARS_MODEL, True, 0),
+    ("Assumptions_US_Reg", "assumptions_us_reg.csv", FORECAST_YEARS_MODEL, True, 0),
+    ("Assumptions_NGV", "assumptions_ngv.csv", FORECAST_YEARS_MODEL, True, 0),
     ("Hist_PL_Segment", "hist_pl_segment.csv", HISTORICAL_YEARS_DATA, False, 0),
     ("Hist_BS_Consol", "hist_bs_consol.csv", HISTORICAL_YEARS_DATA, False, 0),
     ("Hist_CF_Consol", "hist_cf_consol.csv", HISTORICAL_YEARS_DATA, False, 0),
     ("Hist_RAV_RateBase", "hist_rav_ratebase.csv", HISTORICAL_YEARS_DATA, False, 0)
 ]
 
-for name, fname, yrs, is_assum, csv_header_offset in csv_files_info:
+def build_csv_sheet(wb, name, fname, yrs, is_assum, csv_header_offset, data_dir="."):
+    """Creates a sheet and loads one input CSV (from data_dir) into it."""
     ws = wb.create_sheet(name)
-    load_csv_to_sheet(ws, fname, start_row=1, is_assumptions_sheet=is_assum, header_row_offset=csv_header_offset)
+    load_csv_to_sheet(ws, os.path.join(data_dir, fname), start_row=1, is_assumptions_sheet=is_assum, header_row_offset=csv_header_offset)
     # General column width setting after loading
     ws.column_dimensions['A'].width = 45
     # Assuming data starts in column B after CSV load (Col A is description)
@@ -223,49 +176,155 @@ for name, fname, yrs, is_assum, csv_header_offset in csv_files_info:
     for i in range(len(yrs)):
         ws.column_dimensions[get_column_letter(data_start_col_csv + i)].width = 12
     ws.column_dimensions[get_column_letter(data_start_col_csv + len(yrs))].width = 50 # Notes column
+    return ws
 
 # --- RAV_RateBase_Forecast Sheet ---
-ws_frav = wb.create_sheet("RAV_RateBase_Forecast")
-setup_sheet_headers(ws_frav, "Forecast RAV & Rate Base", FORECAST_YEARS_MODEL, first_col_width=45)
-# (Detailed structure and FY2025 formulas for RAV/RateBase. Subsequent years use make_formula_draggable)
-# This section needs to be fully built out with the actual formulas and looping logic.
-# For brevity, I'm showing a conceptual structure for one item.
+# (Detailed structure and first-period formulas for RAV/RateBase. Later periods are rendered from formula templates)
+# The first period is column B, one column per TIME_AXIS period. Assumptions are looked up by the period's
+# assumption year (row 10; years past the CSVs hold the last year) and phased by the periods per year ($B$11).
 # A full implementation would iterate through a predefined list of line items and their base formulas.
-frav_row_definitions = {
-    2: ("UK Electricity Transmission (NGET) - RAV", "£m", None, True), # Title row
-    3: ("Opening RAV", "£m", "='Hist_RAV_RateBase'!G7", False), # G7 is FY24 Closing for NGET
-    4: ("Capex Additions (Allowed)", "£m", "='Assumptions_UK_Reg'!C3", False), # C3 is FY25 NGET Capex
-    5: ("Regulatory Depreciation", "£m", "=-C3*INDEX(Assumptions_UK_Reg!$C$4:$R$4,1,MATCH(D$1,Assumptions_UK_Reg!$C$1:$R$1,0))", False), # OpeningRAV(C3) * DepnRate(Assum_UK_Reg row 4)
-    6: ("Inflation Adjustment", "£m", "=C3*INDEX(Assumptions_Macro!$C$3:$R$3,1,MATCH(D$1,Assumptions_Macro!$C$1:$R$1,0))", False), # OpeningRAV(C3) * CPIH(Assum_Macro row 3)
-    7: ("Other Movements", "£m", 0, False),
-    8: ("Closing RAV", "£m", "=SUM(C3:C7)", False),
+FRAV_ASSUMPTION_YEAR_ROW = 10
+FRAV_PERIODS_PER_YEAR_ROW = 11
+frav_row_definitions = { # Row: (Description, Unit, First Period Formula, Is_Header, Later Periods Formula or None to drag the first one)
+    2: ("UK Electricity Transmission (NGET) - RAV", "£m", None, True, None), # Title row
+    3: ("Opening RAV", "£m", "='Hist_RAV_RateBase'!G8", False, "=B8"), # G8 is FY24 Closing for NGET; later periods link to prior Closing
+    4: ("Capex Additions (Allowed)", "£m", "=INDEX(Assumptions_UK_Reg!$C$3:$R$3,1,MATCH(B$10,Assumptions_UK_Reg!$C$1:$R$1,0))/$B$11", False, None), # NGET Capex (Assum_UK_Reg row 3), spread evenly
+    5: ("Regulatory Depreciation", "£m", "=-B3*INDEX(Assumptions_UK_Reg!$C$4:$R$4,1,MATCH(B$10,Assumptions_UK_Reg!$C$1:$R$1,0))/$B$11", False, None), # OpeningRAV(B3) * DepnRate(Assum_UK_Reg row 4) per period
+    6: ("Inflation Adjustment", "£m", "=B3*((1+INDEX(Assumptions_Macro!$C$3:$R$3,1,MATCH(B$10,Assumptions_Macro!$C$1:$R$1,0)))^(1/$B$11)-1)", False, None), # OpeningRAV(B3) * CPIH(Assum_Macro row 3), compounded per period
+    7: ("Other Movements", "£m", 0, False, None),
+    8: ("Closing RAV", "£m", "=SUM(B3:B7)", False, None),
     # ... similar definitions for NGED, US NY ($m), US MA ($m), and their £m conversions ...
 }
-# Example population loop (simplified)
-for r, (desc, unit, base_formula_fy25, is_header) in frav_row_definitions.items():
-    cell_A = ws_frav.cell(row=r, column=1, value=desc)
-    style_row_header(cell_A, level=1 if is_header else 2, fill=is_header)
-    if not is_header:
-        ws_frav.cell(row=r, column=len(FORECAST_YEARS_MODEL)+2, value=unit).border = BORDER_THIN_ALL # Unit in notes
-        # First forecast year (column B, index 2)
-        if base_formula_fy25:
-             ws_frav.cell(row=r, column=2).value = base_formula_fy25
-        style_data_cell(ws_frav.cell(row=r, column=2), is_formula=bool(base_formula_fy25), number_format=FORMAT_NUMBER_0DP_NEG_PAREN)
-        # Other forecast years
-        for year_idx, _ in enumerate(FORECAST_YEARS_MODEL[1:], start=1): # year_idx = 1 for 2nd forecast year
-            target_col = 2 + year_idx
-            if "Opening" in desc: # Opening balance links to previous year's closing
-                # This needs to correctly identify the 'Closing RAV' row for this block
-                closing_row_offset = 5 # e.g. if Closing RAV is 5 rows below Opening
-                ws_frav.cell(row=r, column=target_col).value = f"={get_column_letter(target_col-1)}{r+closing_row_offset}"
-            elif base_formula_fy25 and isinstance(base_formula_fy25, str) and base_formula_fy25.startswith("="):
-                # This needs a more robust make_formula_draggable for complex sheets
-                # For now, just copying for simplicity, assuming it would be adapted
-                ws_frav.cell(row=r, column=target_col).value = base_formula_fy25 # Needs actual dragging logic
-            elif isinstance(base_formula_fy25, (int,float)):
-                 ws_frav.cell(row=r, column=target_col).value = base_formula_fy25
-
-            style_data_cell(ws_frav.cell(row=r, column=target_col), is_formula=True, number_format=FORMAT_NUMBER_0DP_NEG_PAREN)
+
+def build_rav_forecast_sheet(wb):
+    """Creates RAV_RateBase_Forecast from frav_row_definitions, one column per TIME_AXIS period."""
+    ws_frav = wb.create_sheet("RAV_RateBase_Forecast")
+    setup_sheet_headers(ws_frav, "Forecast RAV & Rate Base", FORECAST_PERIODS, first_col_width=45)
+    n_periods = len(FORECAST_PERIODS)
+    for r, (desc, unit, base_formula, is_header, roll_formula) in frav_row_definitions.items():
+        cell_A = ws_frav.cell(row=r, column=1, value=desc)
+        style_row_header(cell_A, level=1 if is_header else 2, fill=is_header)
+        if is_header:
+            continue
+        ws_frav.cell(row=r, column=n_periods+2, value=unit).border = BORDER_THIN_ALL # Unit in notes
+        # Each row's formulas are compiled once and rendered for every period (columns B onwards)
+        if roll_formula: # e.g. Opening balance links to previous period's closing
+            row_values = [base_formula] + compile_formula_template(roll_formula).render_years(n_periods - 1)
+        else:
+            row_values = compile_formula_template(base_formula).render_years(n_periods)
+        for period_idx, value in enumerate(row_values):
+            cell = ws_frav.cell(row=r, column=2 + period_idx, value=value)
+            style_data_cell(cell, is_formula=isinstance(value, str), number_format=FORMAT_NUMBER_0DP_NEG_PAREN)
+
+    # Time axis inputs the formulas above look up
+    style_row_header(ws_frav.cell(row=FRAV_ASSUMPTION_YEAR_ROW, column=1, value="Assumption Year"), level=2)
+    for period_idx, year in enumerate(TIME_AXIS.assumption_years(FORECAST_YEARS_MODEL)):
+        style_data_cell(ws_frav.cell(row=FRAV_ASSUMPTION_YEAR_ROW, column=2 + period_idx, value=year), is_input=True)
+    style_row_header(ws_frav.cell(row=FRAV_PERIODS_PER_YEAR_ROW, column=1, value="Periods per Year"), level=2)
+    style_data_cell(ws_frav.cell(row=FRAV_PERIODS_PER_YEAR_ROW, column=2, value=TIME_AXIS.periods_per_year), is_input=True, number_format=FORMAT_NUMBER_0DP)
+    return ws_frav
+
+
+# --- Sensitivities Sheet ---
+# Values (not formulas) from sensitivity_engine.py: every driver in SENSITIVITY_BUMPS is bumped down and up in one
+# batched scenario run, and the change in each SENSITIVITY_METRICS output is reported for one year, in tornado order.
+sensitivity_sheet_details = ("Sensitivities", "Sensitivity Analysis", "FY2030", "ffo_net_debt") # SheetName, Title, Report Year, Sort Metric
+# The sheet holds engine results; the engine sources are in regen_manifest.GENERATOR_SOURCES, so a change to them rebuilds it
+SENSITIVITY_UNIT_FORMATS = {"£m": FORMAT_NUMBER_0DP_NEG_PAREN, "x": FORMAT_NUMBER_2DP, "%": FORMAT_PERCENT_2DP}
+
+def build_sensitivities_sheet(wb, sheet_name, title, report_year, sort_metric, data_dir="."):
+    """Creates the Sensitivities sheet: base case and down/up changes per driver for report_year."""
+    ws = wb.create_sheet(sheet_name)
+    sens = run_sensitivities(data_dir=data_dir)
+    y = sens["years"].index(report_year)
+    n_cols = 2 + 2 * len(SENSITIVITY_METRICS)
+    set_column_widths(ws, {'A': 32, 'B': 10, **{get_column_letter(c): 13 for c in range(3, n_cols + 1)}})
+
+    for col in range(1, n_cols + 1): # Row 1: title, then one label per metric over its Down/Up pair
+        cell = ws.cell(row=1, column=col)
+        cell.font, cell.fill, cell.alignment, cell.border = FONT_HEADER, FILL_HEADER, ALIGN_CENTER, BORDER_THIN_ALL
+        cell = ws.cell(row=2, column=col)
+        cell.font, cell.fill, cell.alignment, cell.border = FONT_SUBHEADER, FILL_SUBHEADER, ALIGN_CENTER, BORDER_THIN_ALL
+    ws.cell(row=1, column=1, value=f"{title} - {report_year} (change vs base case)").alignment = ALIGN_LEFT
+    ws.cell(row=2, column=1, value="Driver").alignment = ALIGN_LEFT
+    ws.cell(row=2, column=2, value="Bump")
+    ws.cell(row=3, column=1, value="Base case")
+    style_row_header(ws.cell(row=3, column=1), level=2)
+    ws.cell(row=3, column=2).border = BORDER_THIN_ALL
+    for m, (label, key, unit) in enumerate(SENSITIVITY_METRICS):
+        col = 3 + 2 * m
+        ws.cell(row=1, column=col, value=f"{label} ({unit})")
+        ws.merge_cells(start_row=1, start_column=col, end_row=1, end_column=col + 1)
+        ws.cell(row=2, column=col, value="Down")
+        ws.cell(row=2, column=col + 1, value="Up")
+        cell = ws.cell(row=3, column=col, value=float(sens["base"][key][y]))
+        style_data_cell(cell, number_format=SENSITIVITY_UNIT_FORMATS[unit])
+        ws.cell(row=3, column=col + 1).border = BORDER_THIN_ALL
+        ws.merge_cells(start_row=3, start_column=col, end_row=3, end_column=col + 1)
+
+    for r, b in enumerate(tornado_order(sens, sort_metric, report_year), start=4):
+        size, kind = sens["bumps"][b], sens["kinds"][b]
+        style_row_header(ws.cell(row=r, column=1, value=sens["drivers"][b]), level=2)
+        style_data_cell(ws.cell(row=r, column=2, value=f"±{size * 100:.2f}pp" if kind == "add" else f"±{size * 100:.0f}%"))
+        ws.cell(row=r, column=2).alignment = ALIGN_CENTER
+        for m, (_, key, unit) in enumerate(SENSITIVITY_METRICS):
+            for offset, direction in enumerate(("down", "up")):
+                cell = ws.cell(row=r, column=3 + 2 * m + offset, value=float(sens[direction][key][b, y]))
+                style_data_cell(cell, number_format=SENSITIVITY_UNIT_FORMATS[unit])
+
+    note_row = 5 + len(sens["drivers"])
+    ws.cell(row=note_row, column=1, value="Python-calculated values (sensitivity_engine.py); pp bumps are absolute, % bumps relative. Regenerate to refresh.").font = FONT_INPUT
+    return ws
+
+
+# --- Credit_Metrics Sheet ---
+# Values (not formulas) from credit_engine.py for the base case, one column per TIME_AXIS period: the credit metrics,
+# then every RATING_THRESHOLDS entry's headroom (in the metric's units, >= 0 where met) and breach flag. The metric
+# rows are fixed (credit_metric_row), so other sheets can link to them; the historical columns stay blank.
+credit_sheet_details = ("Credit_Metrics", "Credit Metrics", DISPLAY_YEARS) # SheetName, Title, Columns
+CREDIT_METRIC_FIRST_ROW = 3 # Row 2 is the section header
+CREDIT_UNIT_FORMATS = {"%": FORMAT_PERCENT_2DP, "x": FORMAT_MULTIPLIER}
+
+def credit_metric_row(key):
+    """Credit_Metrics row holding credit_engine metric `key`."""
+    return CREDIT_METRIC_FIRST_ROW + CREDIT_METRIC_KEYS.index(key)
+
+def build_credit_metrics_sheet(wb, sheet_name, title, year_list, data_dir="."):
+    """Creates Credit_Metrics: base-case metrics, then threshold headroom and breach flags per period."""
+    ws = wb.create_sheet(sheet_name)
+    credit = run_credit_screen(data_dir=data_dir, time_axis=TIME_AXIS)
+    set_column_widths(ws, {'A': 45, **{get_column_letter(i + 2): 12 for i in range(len(year_list))}, get_column_letter(len(year_list) + 2): 60})
+    setup_sheet_headers(ws, title, year_list, first_col_width=45)
+    columns = [(2 + i, credit["years"].index(year)) for i, year in enumerate(year_list) if year in credit["years"]]
+    metric_info = {key: (label, unit) for key, label, unit in CREDIT_METRICS}
+    threshold_labels = []
+    for name, key, bound, level in credit["thresholds"]:
+        label, unit = metric_info[key]
+        threshold_labels.append(f"{name}: {label} {'>=' if bound == 'min' else '<='} {f'{level:.1%}' if unit == '%' else f'{level:g}x'}")
+
+    sections = [ # (Section Header, [(Row Label, Values per engine period, Number Format)])
+        ("Base Case Credit Metrics", [(f"{label} ({unit})", credit["metrics"][key], CREDIT_UNIT_FORMATS[unit]) for key, label, unit in CREDIT_METRICS]),
+        ("Threshold Headroom (metric units; negative = breach)",
+         [(text, credit["headroom"][t], CREDIT_UNIT_FORMATS[metric_info[row[1]][1]]) for t, (text, row) in enumerate(zip(threshold_labels, credit["thresholds"]))]),
+        ("Threshold Breach", [(text, credit["breach"][t], None) for t, text in enumerate(threshold_labels)]),
+    ]
+    row = CREDIT_METRIC_FIRST_ROW - 1
+    for header, lines in sections:
+        style_row_header(ws.cell(row=row, column=1, value=header), level=1)
+        for r, (label, values, number_format) in enumerate(lines, start=row + 1):
+            style_row_header(ws.cell(row=r, column=1, value=label), level=2)
+            for col, y in columns:
+                if number_format is None:
+                    cell = ws.cell(row=r, column=col, value=bool(values[y]))
+                    style_data_cell(cell, number_format="General")
+                    cell.alignment = ALIGN_CENTER
+                else: # A net cash position or no interest gives an infinite ratio, which a cell can't hold
+                    value = float(values[y])
+                    style_data_cell(ws.cell(row=r, column=col, value=value if math.isfinite(value) else "n/a"), number_format=number_format)
+        row += len(lines) + 2
+
+    ws.cell(row=row, column=1, value="Python-calculated base case (credit_engine.py); thresholds are RATING_THRESHOLDS. Regenerate to refresh.").font = FONT_INPUT
+    return ws
 
 
 # --- Placeholder for other Forecast & Summary Sheets ---
@@ -276,14 +335,14 @@ for r, (desc, unit, base_formula_fy25, is_header) in frav_row_definitions.items(
 
 sheet_placeholder_details_fc = [
     ("Forecast_PL_Segment", "Forecast P&L by Segment (£m)", DISPLAY_YEARS),
-    ("Debt_Schedule_Forecast", "Forecast Debt Schedule (£m)", FORECAST_YEARS_MODEL),
+    ("Debt_Schedule_Forecast", "Forecast Debt Schedule (£m)", FORECAST_PERIODS),
     ("Forecast_CF_Consol", "Forecast Cash Flow (£m)", DISPLAY_YEARS),
     ("Forecast_BS_Consol", "Forecast Balance Sheet (£m)", DISPLAY_YEARS),
-    ("Credit_Metrics", "Credit Metrics", DISPLAY_YEARS),
     ("Cover_Summary", "Model Summary", HISTORICAL_YEARS_DATA[-1:] + [FORECAST_YEARS_MODEL[0], FORECAST_YEARS_MODEL[1], FORECAST_YEARS_MODEL[2], FORECAST_YEARS_MODEL[5], FORECAST_YEARS_MODEL[10], FORECAST_YEARS_MODEL[-1]])
 ]
 
-for sheet_name, header_title, year_list in sheet_placeholder_details_fc:
+def build_placeholder_sheet(wb, sheet_name, header_title, year_list):
+    """Creates a forecast/summary sheet with headers only (plus the balance check row on the BS)."""
     ws = wb.create_sheet(sheet_name)
     is_summary = sheet_name == "Cover_Summary"
     col_widths = {'A': 40}
@@ -307,18 +366,99 @@ for sheet_name, header_title, year_list in sheet_placeholder_details_fc:
             # and must match the actual rows where these totals are calculated in a full model.
             ws.cell(row=50, column=i+2, value=f"={col_l}20-{col_l}45").number_format = FORMAT_NUMBER_0DP 
             style_data_cell(ws.cell(row=50, column=i+2), is_formula=True)
+    return ws
+
+
+# --- Sheet Registry ---
+# Sheets each sheet links to; a rebuild of an upstream sheet also rebuilds everything downstream of it
+SHEET_UPSTREAM = {
+    "RAV_RateBase_Forecast": ["Assumptions_Macro", "Assumptions_UK_Reg", "Assumptions_US_Reg", "Hist_RAV_RateBase"],
+    "Forecast_PL_Segment": ["RAV_RateBase_Forecast", "Assumptions_Macro", "Assumptions_UK_Reg", "Assumptions_US_Reg", "Assumptions_NGV", "Hist_PL_Segment"],
+    "Debt_Schedule_Forecast": ["Forecast_PL_Segment", "Assumptions_Macro", "Hist_BS_Consol"],
+    "Forecast_CF_Consol": ["Forecast_PL_Segment", "Debt_Schedule_Forecast", "Hist_CF_Consol"],
+    "Forecast_BS_Consol": ["Forecast_CF_Consol", "Debt_Schedule_Forecast", "RAV_RateBase_Forecast", "Hist_BS_Consol"],
+    "Credit_Metrics": ["Forecast_PL_Segment", "Forecast_CF_Consol", "Forecast_BS_Consol", "Debt_Schedule_Forecast"],
+    "Cover_Summary": ["Forecast_PL_Segment", "Forecast_CF_Consol", "Forecast_BS_Consol", "Credit_Metrics"],
+}
 
+sheet_specs = ( # (SheetName, Input CSVs, Upstream Sheets, Row Definitions) in build order
+    [(info[0], [info[1]], [], info) for info in csv_files_info]
+    + [("RAV_RateBase_Forecast", [], SHEET_UPSTREAM["RAV_RateBase_Forecast"], (frav_row_definitions, TIME_AXIS.labels, TIME_AXIS.frequency))]
+    + [(sensitivity_sheet_details[0], [info[1] for info in csv_files_info], [], (sensitivity_sheet_details, SENSITIVITY_BUMPS, SENSITIVITY_METRICS))]
+    + [(details[0], [], SHEET_UPSTREAM[details[0]], details) for details in sheet_placeholder_details_fc]
+    + [(credit_sheet_details[0], [info[1] for info in csv_files_info], SHEET_UPSTREAM[credit_sheet_details[0]],
+        (credit_sheet_details, CREDIT_METRICS, RATING_THRESHOLDS, TIME_AXIS.labels, TIME_AXIS.frequency))]
+)
+# Cover_Summary and Sensitivities are the first sheets, the rest follow build order
+sheet_order = ["Cover_Summary", "Sensitivities"] + [spec[0] for spec in sheet_specs if spec[0] not in ("Cover_Summary", "Sensitivities")]
+
+def build_sheet(wb, sheet_name, data_dir="."):
+    """Builds one sheet by name (used for both full and incremental regeneration)."""
+    for info in csv_files_info:
+        if info[0] == sheet_name:
+            return build_csv_sheet(wb, *info, data_dir=data_dir)
+    if sheet_name == "RAV_RateBase_Forecast":
+        return build_rav_forecast_sheet(wb)
+    if sheet_name == sensitivity_sheet_details[0]:
+        return build_sensitivities_sheet(wb, *sensitivity_sheet_details, data_dir=data_dir)
+    if sheet_name == credit_sheet_details[0]:
+        return build_credit_metrics_sheet(wb, *credit_sheet_details, data_dir=data_dir)
+    for details in sheet_placeholder_details_fc:
+        if details[0] == sheet_name:
+            return build_placeholder_sheet(wb, *details)
+    raise KeyError(f"Unknown sheet: {sheet_name}")
+
+
+def sheets_with_upstream(sheet_names):
+    """The requested sheets plus every sheet their formulas link to, in sheet_order."""
+    needed, stack = set(), list(sheet_names)
+    while stack:
+        name = stack.pop()
+        if name not in needed:
+            needed.add(name)
+            stack.extend(SHEET_UPSTREAM.get(name, []))
+    unknown = needed - set(sheet_order)
+    if unknown:
+        raise KeyError(f"Unknown sheets: {sorted(unknown)}")
+    return [name for name in sheet_order if name in needed]
+
+def build_workbook(sheet_names=None, data_dir=".", streaming=False):
+    """
+    Builds a workbook holding only the requested sheets (and the sheets they link to); all sheets if None.
+    Returns the openpyxl Workbook (or StreamingWorkbook) unsaved.
+    """
+    names = sheet_order if sheet_names is None else sheets_with_upstream(sheet_names)
+    if streaming:
+        from streaming_workbook import StreamingWorkbook
+        wb = StreamingWorkbook()
+    else:
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active) # Remove default sheet
+    build_order = [spec[0] for spec in sheet_specs if spec[0] in names]
+    for name in build_order:
+        build_sheet(wb, name, data_dir)
+    if streaming:
+        wb.order_sheets(names)
+        return wb
+    for target_idx, name in enumerate(names): # Same order as sheet_order
+        ws = wb[name]
+        wb.move_sheet(ws, offset=target_idx - wb.index(ws))
+    return wb
 
-# Move Cover_Summary to be the first sheet
-if "Cover_Summary" in wb.sheetnames:
-    summary_sheet = wb["Cover_Summary"]
-    wb.move_sheet(summary_sheet, offset=-len(wb.sheetnames)+1)
 
 # --- Final Save ---
-output_filename = "NationalGrid_Full_Model_Generated.xlsx"
-try:
-    wb.save(output_filename)
-except Exception as e:
-    # Cannot print in this environment, but would log error in a real script
-    pass
-```
+# Only sheets whose input CSVs or row definitions changed (and their dependents) are rewritten;
+# hashes from the last run are kept in NationalGrid_Full_Model_Generated.xlsx.manifest.json
+if __name__ == "__main__":
+    output_filename = "NationalGrid_Full_Model_Generated.xlsx"
+    validation_failures = validate_inputs(".") if VALIDATE_INPUTS != "off" else []
+    if validation_failures:
+        print(format_failures(validation_failures))
+    try:
+        if VALIDATE_INPUTS == "strict" and has_errors(validation_failures):
+            raise ValueError("input validation failed")
+        rebuilt_sheets = regenerate(output_filename, sheet_specs, sheet_order, build_sheet, os.path.abspath(__file__), streaming=STREAMING_OUTPUT,
+                                    cache_values=CACHE_FORMULA_VALUES)
+        print(f"{output_filename}: " + (f"rebuilt {', '.join(rebuilt_sheets)}" if rebuilt_sheets else "up to date"))
+    except Exception as e:
+        print(f"Error writing {output_filename}: {e}")
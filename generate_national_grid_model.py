@@ -1,15 +1,27 @@
-```python
+import math
 import openpyxl
+import os
 from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
 from openpyxl.utils import get_column_letter
 
+from credit_engine import CREDIT_METRIC_KEYS, CREDIT_METRICS, RATING_THRESHOLDS, run_credit_screen
+from formula_templates import render_formula_years
+from regen_manifest import regenerate
+from scenario_engine import SCENARIO_INPUT_CSVS
+
 # --- Configuration & Constants ---
 # Years for historical data to be manually entered or linked if available in digital form
 HISTORICAL_YEARS_DATA = ["FY2020", "FY2021", "FY2022", "FY2023", "FY2024"]
 # Years for forecast period
 FORECAST_YEARS_MODEL = [f"FY{2025 + i}" for i in range(16)] # FY2025 to FY2040
+ASSUMPTIONS_FIRST_COL = 2 # Assumption sheets hold FY2025 in column B
 # Columns to display on sheets that show both history and forecast
 DISPLAY_YEARS = HISTORICAL_YEARS_DATA[-2:] + FORECAST_YEARS_MODEL # Last 2 historical + all forecast
+# True: stream sheets through the write-only backend (flat memory; any change rebuilds all sheets)
+STREAMING_OUTPUT = False
+# True: write each formula's result (evaluated by formula_engine) as its cached value, so the saved file opens without
+# a recalculation and non-Excel readers see numbers
+CACHE_FORMULA_VALUES = True
 
 # --- Styling Definitions ---
 # Colors (Hex format)
@@ -26,6 +38,7 @@ FONT_HEADER = Font(bold=True, color=COLOR_WHITE, name='Calibri', size=11)
 FONT_SUBHEADER = Font(bold=True, color=COLOR_BLACK, name='Calibri', size=11)
 FONT_INPUT = Font(color=COLOR_INPUT_BLUE, name='Calibri', size=10)
 FONT_FORMULA = Font(color=COLOR_BLACK, name='Calibri', size=10)
+FONT_ROW_LABEL = Font(bold=True, name='Calibri', size=10)
 FONT_LINK = Font(color=COLOR_GREEN_LINK, name='Calibri', size=10) # For conceptual marking
 
 # Fills
@@ -73,7 +86,7 @@ def setup_sheet_headers(ws, title, years_list, first_data_col_idx=2, row_num=1,
 
 def style_row_header(cell, level=1):
     """Styles a row header cell."""
-    cell.font = FONT_SUBHEADER if level == 1 else Font(bold=True, name='Calibri', size=10)
+    cell.font = FONT_SUBHEADER if level == 1 else FONT_ROW_LABEL
     if level == 1:
         cell.fill = FILL_SUBHEADER
     cell.alignment = ALIGN_LEFT
@@ -96,15 +109,7 @@ def set_column_widths(ws, widths_dict):
     for col_letter, width in widths_dict.items():
         ws.column_dimensions[col_letter].width = width
 
-# --- Create Workbook ---
-wb = openpyxl.Workbook()
-wb.remove(wb.active) # Remove default sheet
-
 # --- Sheet: Assumptions_Macro ---
-ws_am = wb.create_sheet("Assumptions_Macro")
-set_column_widths(ws_am, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
-setup_sheet_headers(ws_am, "Macro & Group Assumptions", FORECAST_YEARS_MODEL)
-
 macro_data = [
     ("MACROECONOMIC", None, None, True), # Item, Values, NumFormat, Notes, IsSectionHeader
     ("UK CPIH (Annual %)", [0.03, 0.025] + [0.02]*14, FORMAT_PERCENT_1DP, "Illustrative path to long-term target"),
@@ -123,28 +128,32 @@ macro_data = [
     ("Target Minimum Cash Balance (£m)", [1000]*16, FORMAT_NUMBER_0DP, "Operational liquidity target"),
     ("Number of Shares Outstanding (millions)", [3700]*16, FORMAT_NUMBER_0DP, "Illustrative, for EPS calc; assumes no buybacks/issuance")
 ]
-current_row = 2
-for item_data in macro_data:
-    item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
-    is_section_header = item_data[4] if len(item_data) > 4 else False
-    cell_A = ws_am.cell(row=current_row, column=1, value=item)
-    if is_section_header:
-        ws_am.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
-        cell_A.font = FONT_HEADER
-        cell_A.fill = FILL_HEADER
-        cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        ws_am.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
-        for i, val in enumerate(values):
-            data_cell = ws_am.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=True, number_format=num_format)
-    current_row += 1
+
+def build_assumptions_macro(wb):
+    """Creates Assumptions_Macro from macro_data."""
+    ws_am = wb.create_sheet("Assumptions_Macro")
+    set_column_widths(ws_am, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
+    setup_sheet_headers(ws_am, "Macro & Group Assumptions", FORECAST_YEARS_MODEL)
+    current_row = 2
+    for item_data in macro_data:
+        item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
+        is_section_header = item_data[4] if len(item_data) > 4 else (values is None) # Section rows carry no values
+        cell_A = ws_am.cell(row=current_row, column=1, value=item)
+        if is_section_header:
+            ws_am.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
+            cell_A.font = FONT_HEADER
+            cell_A.fill = FILL_HEADER
+            cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            ws_am.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
+            for i, val in enumerate(values):
+                data_cell = ws_am.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=True, number_format=num_format)
+        current_row += 1
+    return ws_am
 
 # --- Sheet: Hist_PL_Segment ---
-ws_hpl = wb.create_sheet("Hist_PL_Segment")
-set_column_widths(ws_hpl, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
-setup_sheet_headers(ws_hpl, "Historical P&L by Segment (£m)", HISTORICAL_YEARS_DATA)
 hpl_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num_Format)
     ("UK Electricity Transmission (NGET)", None, None, None, None, None, "", True, None),
     ("Revenue", 3000, 3100, 3200, 3300, 3400, "", False, FORMAT_NUMBER_0DP_NEG_PAREN),
@@ -190,27 +199,31 @@ hpl_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num
     ("Non-controlling Interests", -60,-65,-50,-55,-35, "", False, FORMAT_NUMBER_0DP_NEG_PAREN),
     ("Net Profit (for Equity Holders)", "=B42+B43", "=C42+C43", "=D42+D43", "=E42+E43", "=F42+F43", "Calculated", False, FORMAT_NUMBER_0DP_NEG_PAREN)
 ]
-current_row = 2
-for row_data_tuple in hpl_rows:
-    desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
-    data_vals = row_data_tuple[1:6]
-
-    cell_A = ws_hpl.cell(row=current_row, column=1, value=desc)
-    if is_header_val:
-        ws_hpl.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        for i, val in enumerate(data_vals):
-            data_cell = ws_hpl.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
-        ws_hpl.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
-    current_row +=1
+
+def build_hist_pl_segment(wb):
+    """Creates Hist_PL_Segment from hpl_rows."""
+    ws_hpl = wb.create_sheet("Hist_PL_Segment")
+    set_column_widths(ws_hpl, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
+    setup_sheet_headers(ws_hpl, "Historical P&L by Segment (£m)", HISTORICAL_YEARS_DATA)
+    current_row = 2
+    for row_data_tuple in hpl_rows:
+        desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
+        data_vals = row_data_tuple[1:6]
+
+        cell_A = ws_hpl.cell(row=current_row, column=1, value=desc)
+        if is_header_val:
+            ws_hpl.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            for i, val in enumerate(data_vals):
+                data_cell = ws_hpl.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
+            ws_hpl.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
+        current_row +=1
+    return ws_hpl
 
 # --- Sheet: Hist_BS_Consol ---
-ws_hbs = wb.create_sheet("Hist_BS_Consol")
-set_column_widths(ws_hbs, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
-setup_sheet_headers(ws_hbs, "Historical Balance Sheet (£m)", HISTORICAL_YEARS_DATA)
 hbs_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num_Format)
     ("ASSETS", None, None, None, None, None, "", True, None),
     ("Non-Current Assets", None, None, None, None, None, "", True, None),
@@ -249,27 +262,31 @@ hbs_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num
     ("TOTAL LIABILITIES & EQUITY", "=B22+B35", "=C22+C35", "=D22+D35", "=E22+E35", "=F22+F35", "Calculated", False, FORMAT_NUMBER_0DP_NEG_PAREN),
     ("Balance Check (Assets - L&E)", "=B16-B36", "=C16-C36", "=D16-D36", "=E16-E36", "=F16-F36", "Should be 0", False, FORMAT_NUMBER_0DP_NEG_PAREN)
 ]
-current_row = 2
-for row_data_tuple in hbs_rows: # Adapt as per hpl_rows
-    desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
-    data_vals = row_data_tuple[1:6]
-    cell_A = ws_hbs.cell(row=current_row, column=1, value=desc)
-    if is_header_val:
-        ws_hbs.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2 if desc.startswith("Total") or desc.startswith("TOTAL") else 3)
-        for i, val in enumerate(data_vals):
-            data_cell = ws_hbs.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
-        ws_hbs.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
-    current_row +=1
+
+def build_hist_bs_consol(wb):
+    """Creates Hist_BS_Consol from hbs_rows."""
+    ws_hbs = wb.create_sheet("Hist_BS_Consol")
+    set_column_widths(ws_hbs, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
+    setup_sheet_headers(ws_hbs, "Historical Balance Sheet (£m)", HISTORICAL_YEARS_DATA)
+    current_row = 2
+    for row_data_tuple in hbs_rows: # Adapt as per hpl_rows
+        desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
+        data_vals = row_data_tuple[1:6]
+        cell_A = ws_hbs.cell(row=current_row, column=1, value=desc)
+        if is_header_val:
+            ws_hbs.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2 if desc.startswith("Total") or desc.startswith("TOTAL") else 3)
+            for i, val in enumerate(data_vals):
+                data_cell = ws_hbs.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
+            ws_hbs.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
+        current_row +=1
+    return ws_hbs
 
 
 # --- Sheet: Hist_CF_Consol ---
-ws_hcf = wb.create_sheet("Hist_CF_Consol")
-set_column_widths(ws_hcf, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
-setup_sheet_headers(ws_hcf, "Historical Cash Flow (£m)", HISTORICAL_YEARS_DATA)
 hcf_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num_Format)
     ("Cash Flow from Operating Activities (CFO)", None, None, None, None, None, "", True, None),
     ("Profit Before Tax", 2320,2335,2310,2195,2295, "From P&L", False, FORMAT_NUMBER_0DP_NEG_PAREN),
@@ -290,26 +307,30 @@ hcf_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num
     ("Cash at Beginning of Year", 1440, 1000, 345, -1575, -2410, "From prior year BS", False, FORMAT_NUMBER_0DP_NEG_PAREN), # Example, ensure link
     ("Cash at End of Year", 1000, 345, -1575, -2410, -4120, "Should match BS Cash", False, FORMAT_NUMBER_0DP_NEG_PAREN) # Example, ensure link
 ]
-current_row = 2
-for row_data_tuple in hcf_rows: # Adapt as per hpl_rows
-    desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
-    data_vals = row_data_tuple[1:6]
-    cell_A = ws_hcf.cell(row=current_row, column=1, value=desc)
-    if is_header_val:
-        ws_hcf.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2 if "Net C" in desc or "Cash at" in desc else 3)
-        for i, val in enumerate(data_vals):
-            data_cell = ws_hcf.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
-        ws_hcf.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
-    current_row +=1
+
+def build_hist_cf_consol(wb):
+    """Creates Hist_CF_Consol from hcf_rows."""
+    ws_hcf = wb.create_sheet("Hist_CF_Consol")
+    set_column_widths(ws_hcf, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
+    setup_sheet_headers(ws_hcf, "Historical Cash Flow (£m)", HISTORICAL_YEARS_DATA)
+    current_row = 2
+    for row_data_tuple in hcf_rows: # Adapt as per hpl_rows
+        desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
+        data_vals = row_data_tuple[1:6]
+        cell_A = ws_hcf.cell(row=current_row, column=1, value=desc)
+        if is_header_val:
+            ws_hcf.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2 if "Net C" in desc or "Cash at" in desc else 3)
+            for i, val in enumerate(data_vals):
+                data_cell = ws_hcf.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
+            ws_hcf.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
+        current_row +=1
+    return ws_hcf
 
 # --- Sheet: Hist_RAV_RateBase ---
-ws_hrav = wb.create_sheet("Hist_RAV_RateBase")
-set_column_widths(ws_hrav, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
-setup_sheet_headers(ws_hrav, "Historical RAV & Rate Base (£m or $m)", HISTORICAL_YEARS_DATA)
 hrav_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Num_Format)
     ("UK Electricity Transmission (NGET) - RAV", None, None, None, None, None, "£m", True, None),
     ("Opening RAV", 18000, 18800, 19700, 20800, 22000, "", False, FORMAT_NUMBER_0DP),
@@ -328,32 +349,36 @@ hrav_rows = [ # (Description, FY20, FY21, FY22, FY23, FY24, Notes, Is_Header, Nu
     ("US Regulated - Rate Base (MA)", None, None, None, None, None, "$m (unless noted)", True, None),
     ("Closing Rate Base ($m)", 8300,8600,8900,9200,9500, "Illustrative", False, FORMAT_NUMBER_0DP),
 ]
-current_row = 2
-for row_data_tuple in hrav_rows: # Adapt as per hpl_rows
-    desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
-    data_vals = row_data_tuple[1:6]
-    cell_A = ws_hrav.cell(row=current_row, column=1, value=desc)
-    if is_header_val:
-        ws_hrav.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2 if "Closing" in desc else 3)
-        for i, val in enumerate(data_vals):
-            data_cell = ws_hrav.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
-        ws_hrav.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
-    current_row +=1
+
+def build_hist_rav_ratebase(wb):
+    """Creates Hist_RAV_RateBase from hrav_rows."""
+    ws_hrav = wb.create_sheet("Hist_RAV_RateBase")
+    set_column_widths(ws_hrav, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(HISTORICAL_YEARS_DATA))}, get_column_letter(len(HISTORICAL_YEARS_DATA)+2): 40})
+    setup_sheet_headers(ws_hrav, "Historical RAV & Rate Base (£m or $m)", HISTORICAL_YEARS_DATA)
+    current_row = 2
+    for row_data_tuple in hrav_rows: # Adapt as per hpl_rows
+        desc, notes_val, is_header_val, num_fmt_val = row_data_tuple[0], row_data_tuple[6], row_data_tuple[7], row_data_tuple[8]
+        data_vals = row_data_tuple[1:6]
+        cell_A = ws_hrav.cell(row=current_row, column=1, value=desc)
+        if is_header_val:
+            ws_hrav.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(HISTORICAL_YEARS_DATA)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2 if "Closing" in desc else 3)
+            for i, val in enumerate(data_vals):
+                data_cell = ws_hrav.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=not (isinstance(val, str) and val.startswith("=")), number_format=num_fmt_val)
+            ws_hrav.cell(row=current_row, column=len(HISTORICAL_YEARS_DATA)+2, value=notes_val).border = BORDER_THIN_ALL
+        current_row +=1
+    return ws_hrav
 
 
 # --- Sheet: Assumptions_UK_Reg ---
-ws_ukr = wb.create_sheet("Assumptions_UK_Reg")
-set_column_widths(ws_ukr, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
-setup_sheet_headers(ws_ukr, "UK Regulated Assumptions", FORECAST_YEARS_MODEL)
 uk_reg_data = [
     ("NGET (RIIO-T2/T3)", None, None, True),
     ("RAV: Capex Additions (£m)", [1700, 1800, 1900, 2000, 2100] + [2200]*11, FORMAT_NUMBER_0DP, "Net of contribs. From investment plans."),
     ("RAV: Regulatory Depn Rate (% Opening RAV)", [0.025]*16, FORMAT_PERCENT_1DP, "Or abs £m. From Ofgem/company."),
-    ("RAV: Inflation Link (CPIH Ref)", ["=Assumptions_Macro!C2"]*16, FORMAT_PERCENT_1DP, "='Assumptions_Macro'!C2 (drag right)"), # Note: C2 is CPIH for FY25
+    ("RAV: Inflation Link (CPIH Ref)", render_formula_years("=Assumptions_Macro!B3", 16, ASSUMPTIONS_FIRST_COL), FORMAT_PERCENT_1DP, "Links to UK CPIH in Assumptions_Macro"), # Note: B3 is CPIH for FY25
     ("Revenue: Allowed WACC (Nominal %)", [0.050, 0.050, 0.050, 0.048, 0.048] + [0.048]*11, FORMAT_PERCENT_1DP, "Illustrative. From Ofgem RIIO-T2/3."),
     ("Revenue: Outperformance/Underperformance (£m)", [50, 50, 25, 25, 0] + [0]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Net incentive earnings"),
     ("Opex: Base before efficiency (£m)", [1250, 1270, 1290, 1310, 1330] + [1350]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Grows with inflation & activity"),
@@ -361,35 +386,39 @@ uk_reg_data = [
     ("NGED (RIIO-ED2/ED3)", None, None, True),
     ("RAV: Capex Additions (£m)", [1400, 1500, 1600, 1700, 1800] + [1900]*11, FORMAT_NUMBER_0DP, "From investment plans."),
     ("RAV: Regulatory Depn Rate (% Opening RAV)", [0.030]*16, FORMAT_PERCENT_1DP, "From Ofgem/company."),
-    ("RAV: Inflation Link (CPIH Ref)", ["=Assumptions_Macro!C2"]*16, FORMAT_PERCENT_1DP, "='Assumptions_Macro'!C2 (drag right)"),
+    ("RAV: Inflation Link (CPIH Ref)", render_formula_years("=Assumptions_Macro!B3", 16, ASSUMPTIONS_FIRST_COL), FORMAT_PERCENT_1DP, "Links to UK CPIH in Assumptions_Macro"),
     ("Revenue: Allowed WACC (Nominal %)", [0.048, 0.048, 0.048, 0.046, 0.046] + [0.046]*11, FORMAT_PERCENT_1DP, "Illustrative. From Ofgem RIIO-ED2/3."),
     ("Revenue: Outperformance/Underperformance (£m)", [40, 40, 20, 20, 0] + [0]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Net incentive earnings"),
     ("Opex: Base before efficiency (£m)", [1300, 1320, 1340, 1360, 1380] + [1400]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Grows with inflation & activity"),
     ("Opex: Efficiency Target (% reduction on base)", [0.01, 0.01, 0.005, 0.005, 0.005] + [0.005]*11, FORMAT_PERCENT_1DP, "Annual efficiency"),
 ]
-current_row = 2
-for item_data in uk_reg_data:
-    item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
-    is_section_header = item_data[4] if len(item_data) > 4 else (values is None) # Simplified section check
-    cell_A = ws_ukr.cell(row=current_row, column=1, value=item)
-    if is_section_header:
-        ws_ukr.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        ws_ukr.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
-        for i, val in enumerate(values):
-            data_cell = ws_ukr.cell(row=current_row, column=i+2, value=val)
-            if isinstance(val, str) and val.startswith("="): # Formula
-                style_data_cell(data_cell, is_input=False, number_format=num_format) # Formulas are not inputs
-            else: # Input
-                style_data_cell(data_cell, is_input=True, number_format=num_format)
-    current_row += 1
+
+def build_assumptions_uk_reg(wb):
+    """Creates Assumptions_UK_Reg from uk_reg_data."""
+    ws_ukr = wb.create_sheet("Assumptions_UK_Reg")
+    set_column_widths(ws_ukr, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
+    setup_sheet_headers(ws_ukr, "UK Regulated Assumptions", FORECAST_YEARS_MODEL)
+    current_row = 2
+    for item_data in uk_reg_data:
+        item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
+        is_section_header = item_data[4] if len(item_data) > 4 else (values is None) # Simplified section check
+        cell_A = ws_ukr.cell(row=current_row, column=1, value=item)
+        if is_section_header:
+            ws_ukr.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            ws_ukr.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
+            for i, val in enumerate(values):
+                data_cell = ws_ukr.cell(row=current_row, column=i+2, value=val)
+                if isinstance(val, str) and val.startswith("="): # Formula
+                    style_data_cell(data_cell, is_input=False, number_format=num_format) # Formulas are not inputs
+                else: # Input
+                    style_data_cell(data_cell, is_input=True, number_format=num_format)
+        current_row += 1
+    return ws_ukr
 
 # --- Sheet: Assumptions_US_Reg ---
-ws_usr = wb.create_sheet("Assumptions_US_Reg")
-set_column_widths(ws_usr, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
-setup_sheet_headers(ws_usr, "US Regulated Assumptions", FORECAST_YEARS_MODEL)
 us_reg_data = [
     ("New York (NY)", None, None, True),
     ("Rate Base: Capex Additions ($m)", [1200, 1250, 1300, 1350, 1400] + [1450]*11, FORMAT_NUMBER_0DP, "Original currency. Company plans."),
@@ -406,26 +435,30 @@ us_reg_data = [
     ("Revenue: Overall Growth Rate (%)", [0.038,0.040,0.042,0.038,0.036] + [0.033]*11, FORMAT_PERCENT_1DP, ""),
     ("Opex: Growth (before US CPI inflation) (%)", [0.008, 0.008, 0.006, 0.004, 0.004] + [0.004]*11, FORMAT_PERCENT_1DP, ""),
 ]
-current_row = 2 # Reset for this sheet
-for item_data in us_reg_data: # Adapt as per macro_data
-    item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
-    is_section_header = item_data[4] if len(item_data) > 4 else (values is None)
-    cell_A = ws_usr.cell(row=current_row, column=1, value=item)
-    if is_section_header:
-        ws_usr.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        ws_usr.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
-        for i, val in enumerate(values):
-            data_cell = ws_usr.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=True, number_format=num_format)
-    current_row += 1
+
+def build_assumptions_us_reg(wb):
+    """Creates Assumptions_US_Reg from us_reg_data."""
+    ws_usr = wb.create_sheet("Assumptions_US_Reg")
+    set_column_widths(ws_usr, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
+    setup_sheet_headers(ws_usr, "US Regulated Assumptions", FORECAST_YEARS_MODEL)
+    current_row = 2 # Reset for this sheet
+    for item_data in us_reg_data: # Adapt as per macro_data
+        item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
+        is_section_header = item_data[4] if len(item_data) > 4 else (values is None)
+        cell_A = ws_usr.cell(row=current_row, column=1, value=item)
+        if is_section_header:
+            ws_usr.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            ws_usr.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
+            for i, val in enumerate(values):
+                data_cell = ws_usr.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=True, number_format=num_format)
+        current_row += 1
+    return ws_usr
 
 # --- Sheet: Assumptions_NGV ---
-ws_ngva = wb.create_sheet("Assumptions_NGV")
-set_column_widths(ws_ngva, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
-setup_sheet_headers(ws_ngva, "NGV Assumptions", FORECAST_YEARS_MODEL)
 ngv_data = [
     ("INTERCONNECTORS", None, None, True),
     ("IFA1/2 Revenue (£m)", [158,191,179,161,146] + [140]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Capacity * Avail * Spread * Hours"),
@@ -439,21 +472,28 @@ ngv_data = [
     ("Grain LNG Opex (£m)", [-50,-51,-52,-53,-54] + [-55]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Grows with inflation"),
     ("Grain LNG Capex (£m)", [-20,-30,-40,-20,-15] + [-10]*11, FORMAT_NUMBER_0DP_NEG_PAREN, "Expansion/Maintenance")
 ]
-current_row = 2 # Reset for this sheet
-for item_data in ngv_data: # Adapt as per macro_data
-    item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
-    is_section_header = item_data[4] if len(item_data) > 4 else (values is None)
-    cell_A = ws_ngva.cell(row=current_row, column=1, value=item)
-    if is_section_header:
-        ws_ngva.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        ws_ngva.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
-        for i, val in enumerate(values):
-            data_cell = ws_ngva.cell(row=current_row, column=i+2, value=val)
-            style_data_cell(data_cell, is_input=True, number_format=num_format)
-    current_row += 1
+
+def build_assumptions_ngv(wb):
+    """Creates Assumptions_NGV from ngv_data."""
+    ws_ngva = wb.create_sheet("Assumptions_NGV")
+    set_column_widths(ws_ngva, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 50})
+    setup_sheet_headers(ws_ngva, "NGV Assumptions", FORECAST_YEARS_MODEL)
+    current_row = 2 # Reset for this sheet
+    for item_data in ngv_data: # Adapt as per macro_data
+        item, values, num_format, notes_text = item_data[0], item_data[1], item_data[2], item_data[3]
+        is_section_header = item_data[4] if len(item_data) > 4 else (values is None)
+        cell_A = ws_ngva.cell(row=current_row, column=1, value=item)
+        if is_section_header:
+            ws_ngva.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(FORECAST_YEARS_MODEL)+2)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            ws_ngva.cell(row=current_row, column=len(FORECAST_YEARS_MODEL)+2, value=notes_text).border = BORDER_THIN_ALL
+            for i, val in enumerate(values):
+                data_cell = ws_ngva.cell(row=current_row, column=i+2, value=val)
+                style_data_cell(data_cell, is_input=True, number_format=num_format)
+        current_row += 1
+    return ws_ngva
 
 # --- Placeholder for Forecast Sheets (P&L, BS, CF, RAV, Debt, Credit Metrics, Summary) ---
 # These would involve complex formula generation linking to the sheets above.
@@ -466,10 +506,10 @@ sheet_details_forecast = [
     ("Debt_Schedule_Forecast", "Forecast Debt Schedule (£m)", FORECAST_YEARS_MODEL, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(FORECAST_YEARS_MODEL))}, get_column_letter(len(FORECAST_YEARS_MODEL)+2): 70}),
     ("Forecast_CF_Consol", "Forecast Cash Flow (£m)", DISPLAY_YEARS, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(DISPLAY_YEARS))}, get_column_letter(len(DISPLAY_YEARS)+2): 70}),
     ("Forecast_BS_Consol", "Forecast Balance Sheet (£m)", DISPLAY_YEARS, {'A': 40, **{get_column_letter(i+2): 12 for i in range(len(DISPLAY_YEARS))}, get_column_letter(len(DISPLAY_YEARS)+2): 70}),
-    ("Credit_Metrics", "Credit Metrics", DISPLAY_YEARS, {'A': 35, **{get_column_letter(i+2): 12 for i in range(len(DISPLAY_YEARS))}, get_column_letter(len(DISPLAY_YEARS)+2): 60}),
 ]
 
-for sheet_name, header_title, year_list, col_widths in sheet_details_forecast:
+def build_forecast_sheet(wb, sheet_name, header_title, year_list, col_widths):
+    """Creates one forecast sheet (headers only; Forecast_BS_Consol also gets the balance check row)."""
     ws = wb.create_sheet(sheet_name)
     set_column_widths(ws, col_widths)
     setup_sheet_headers(ws, header_title, year_list, notes_col=True if sheet_name != "Cover_Summary" else False)
@@ -486,13 +526,62 @@ for sheet_name, header_title, year_list, col_widths in sheet_details_forecast:
             # These row numbers would need to be accurate based on the full BS structure.
             ws.cell(row=last_data_row, column=i+2, value=f"={col}16-{col}36").number_format = FORMAT_NUMBER_0DP # Should be 0
             style_data_cell(ws.cell(row=last_data_row, column=i+2))
+    return ws
+
+
+# --- Sheet: Credit_Metrics ---
+# Values (not formulas) from credit_engine.py for the base case, run on the input CSVs in the data directory: the
+# credit metrics per forecast year, then every RATING_THRESHOLDS entry's headroom (in the metric's units, >= 0 where
+# met) and breach flag. The metric rows are fixed (credit_metric_row), so Cover_Summary links to them.
+credit_sheet_details = ("Credit_Metrics", "Credit Metrics", DISPLAY_YEARS) # SheetName, Title, Columns
+CREDIT_METRIC_FIRST_ROW = 3 # Row 2 is the section header
+CREDIT_UNIT_FORMATS = {"%": FORMAT_PERCENT_1DP, "x": FORMAT_MULTIPLIER}
+
+def credit_metric_row(key):
+    """Credit_Metrics row holding credit_engine metric `key`."""
+    return CREDIT_METRIC_FIRST_ROW + CREDIT_METRIC_KEYS.index(key)
+
+def build_credit_metrics_sheet(wb, sheet_name, title, year_list, data_dir="."):
+    """Creates Credit_Metrics: base-case metrics, then threshold headroom and breach flags per forecast year."""
+    ws = wb.create_sheet(sheet_name)
+    credit = run_credit_screen(data_dir=data_dir)
+    set_column_widths(ws, {'A': 45, **{get_column_letter(i+2): 12 for i in range(len(year_list))}, get_column_letter(len(year_list)+2): 60})
+    setup_sheet_headers(ws, title, year_list)
+    columns = [(2 + i, credit["years"].index(year)) for i, year in enumerate(year_list) if year in credit["years"]]
+    metric_info = {key: (label, unit) for key, label, unit in CREDIT_METRICS}
+    threshold_labels = []
+    for name, key, bound, level in credit["thresholds"]:
+        label, unit = metric_info[key]
+        threshold_labels.append(f"{name}: {label} {'>=' if bound == 'min' else '<='} {f'{level:.1%}' if unit == '%' else f'{level:g}x'}")
+
+    sections = [ # (Section Header, [(Row Label, Values per forecast year, Number Format)])
+        ("Base Case Credit Metrics", [(f"{label} ({unit})", credit["metrics"][key], CREDIT_UNIT_FORMATS[unit]) for key, label, unit in CREDIT_METRICS]),
+        ("Threshold Headroom (metric units; negative = breach)",
+         [(text, credit["headroom"][t], CREDIT_UNIT_FORMATS[metric_info[row[1]][1]]) for t, (text, row) in enumerate(zip(threshold_labels, credit["thresholds"]))]),
+        ("Threshold Breach", [(text, credit["breach"][t], None) for t, text in enumerate(threshold_labels)]),
+    ]
+    row = CREDIT_METRIC_FIRST_ROW - 1
+    for header, lines in sections:
+        style_row_header(ws.cell(row=row, column=1, value=header), level=1)
+        for r, (label, values, number_format) in enumerate(lines, start=row + 1):
+            style_row_header(ws.cell(row=r, column=1, value=label), level=2)
+            for col, y in columns:
+                if number_format is None:
+                    cell = ws.cell(row=r, column=col, value=bool(values[y]))
+                    style_data_cell(cell, number_format="General")
+                    cell.alignment = ALIGN_CENTER
+                else: # A net cash position or no interest gives an infinite ratio, which a cell can't hold
+                    value = float(values[y])
+                    style_data_cell(ws.cell(row=r, column=col, value=value if math.isfinite(value) else "n/a"), number_format=number_format)
+        row += len(lines) + 2
+
+    ws.cell(row=row, column=1, value="Python-calculated base case (credit_engine.py); thresholds are RATING_THRESHOLDS. Regenerate to refresh.").font = FONT_INPUT
+    return ws
 
 
 # --- Sheet: Cover_Summary ---
-ws_summ = wb.create_sheet("Cover_Summary")
+CREDIT_FIRST_FORECAST_COL = get_column_letter(2 + DISPLAY_YEARS.index(FORECAST_YEARS_MODEL[0])) # FY2025 on Credit_Metrics
 summary_display_cols = HISTORICAL_YEARS_DATA[-1:] + [FORECAST_YEARS_MODEL[0], FORECAST_YEARS_MODEL[1], FORECAST_YEARS_MODEL[2], FORECAST_YEARS_MODEL[5], FORECAST_YEARS_MODEL[10], FORECAST_YEARS_MODEL[-1]]
-set_column_widths(ws_summ, {'A': 40, **{get_column_letter(i+2): 14 for i in range(len(summary_display_cols))}}) # No notes column on summary
-setup_sheet_headers(ws_summ, "Model Summary", summary_display_cols, notes_col=False, main_header_fill=FILL_GREY, year_header_fill=FILL_GREY)
 # ... (Populate with direct links to key outputs from other forecast sheets and credit metrics sheet)
 # Add placeholders for charts.
 summary_rows = [
@@ -504,42 +593,83 @@ summary_rows = [
     ("Net CFO", "='Forecast_CF_Consol'!D_NetCFO_Row", False),
     ("Total Capex", "=(-1)*SUM('Forecast_CF_Consol'!D_CapexPP&E_Row:'Forecast_CF_Consol'!D_CapexIntang_Row)", False),
     ("KEY CREDIT METRICS", None, True),
-    ("FFO / Net Debt (%)", "='Credit_Metrics'!D_FFONetDebt_Row", False), # Placeholder for FFO/Net Debt row
-    ("Net Debt / EBITDA (x)", "='Credit_Metrics'!D_NetDebtEBITDA_Row", False),
+    ("FFO / Net Debt (%)", f"='Credit_Metrics'!{CREDIT_FIRST_FORECAST_COL}{credit_metric_row('ffo_net_debt')}", False),
+    ("Net Debt / EBITDA (x)", f"='Credit_Metrics'!{CREDIT_FIRST_FORECAST_COL}{credit_metric_row('net_debt_ebitda')}", False),
 ]
-current_row = 2
-for item, formula_base_fy25, is_header in summary_rows:
-    cell_A = ws_summ.cell(row=current_row, column=1, value=item)
-    if is_header:
-        ws_summ.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(summary_display_cols)+1)
-        cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
-    else:
-        style_row_header(cell_A, level=2)
-        # Link to the correct columns in DISPLAY_YEARS for summary_display_cols
-        # This requires mapping summary_display_cols back to DISPLAY_YEARS columns
-        # For simplicity, just putting the base formula for the first forecast year here.
-        # A full implementation would correctly pick values for FY24, FY25, FY26, FY27, FY30 etc.
-        data_cell = ws_summ.cell(row=current_row, column=2, value=f"Link Hist {item}") # Link for FY24
-        style_data_cell(data_cell, is_link=True)
-        data_cell = ws_summ.cell(row=current_row, column=3, value=formula_base_fy25) # Link for FY25
-        style_data_cell(data_cell, is_link=True, number_format=FORMAT_PERCENT_1DP if "%" in item else FORMAT_MULTIPLIER if "(x)" in item else FORMAT_NUMBER_0DP_NEG_PAREN)
-        # ... and so on for other selected summary years, adjusting column in formula_base
-    current_row +=1
-
 
+def build_cover_summary(wb):
+    """Creates Cover_Summary from summary_rows."""
+    ws_summ = wb.create_sheet("Cover_Summary")
+    set_column_widths(ws_summ, {'A': 40, **{get_column_letter(i+2): 14 for i in range(len(summary_display_cols))}}) # No notes column on summary
+    setup_sheet_headers(ws_summ, "Model Summary", summary_display_cols, notes_col=False, main_header_fill=FILL_GREY, year_header_fill=FILL_GREY)
+    current_row = 2
+    for item, formula_base_fy25, is_header in summary_rows:
+        cell_A = ws_summ.cell(row=current_row, column=1, value=item)
+        if is_header:
+            ws_summ.merge_cells(start_row=current_row, start_column=1, end_row=current_row, end_column=len(summary_display_cols)+1)
+            cell_A.font = FONT_HEADER; cell_A.fill = FILL_HEADER; cell_A.alignment = ALIGN_CENTER
+        else:
+            style_row_header(cell_A, level=2)
+            # Link to the correct columns in DISPLAY_YEARS for summary_display_cols
+            # This requires mapping summary_display_cols back to DISPLAY_YEARS columns
+            # For simplicity, just putting the base formula for the first forecast year here.
+            # A full implementation would correctly pick values for FY24, FY25, FY26, FY27, FY30 etc.
+            data_cell = ws_summ.cell(row=current_row, column=2, value=f"Link Hist {item}") # Link for FY24
+            style_data_cell(data_cell, is_link=True)
+            data_cell = ws_summ.cell(row=current_row, column=3, value=formula_base_fy25) # Link for FY25
+            style_data_cell(data_cell, is_link=True, number_format=FORMAT_PERCENT_1DP if "%" in item else FORMAT_MULTIPLIER if "(x)" in item else FORMAT_NUMBER_0DP_NEG_PAREN)
+            # ... and so on for other selected summary years, adjusting column in formula_base
+        current_row +=1
+    return ws_summ
+
+
+# --- Sheet Registry ---
+# Sheets each forecast sheet links to; a rebuild of an upstream sheet also rebuilds its dependents
+SHEET_UPSTREAM = {
+    "Forecast_PL_Segment": ["Assumptions_Macro", "Assumptions_UK_Reg", "Assumptions_US_Reg", "Assumptions_NGV", "Hist_PL_Segment"],
+    "RAV_RateBase_Forecast": ["Assumptions_Macro", "Assumptions_UK_Reg", "Assumptions_US_Reg", "Hist_RAV_RateBase"],
+    "Debt_Schedule_Forecast": ["Forecast_PL_Segment", "Assumptions_Macro", "Hist_BS_Consol"],
+    "Forecast_CF_Consol": ["Forecast_PL_Segment", "Debt_Schedule_Forecast", "Hist_CF_Consol"],
+    "Forecast_BS_Consol": ["Forecast_CF_Consol", "Debt_Schedule_Forecast", "RAV_RateBase_Forecast", "Hist_BS_Consol"],
+    "Credit_Metrics": ["Forecast_PL_Segment", "Forecast_CF_Consol", "Forecast_BS_Consol", "Debt_Schedule_Forecast"],
+    "Cover_Summary": ["Forecast_PL_Segment", "Forecast_CF_Consol", "Forecast_BS_Consol", "Credit_Metrics"],
+}
+
+sheet_builders = { # SheetName: (Builder, Row Definitions) in build order
+    "Assumptions_Macro": (build_assumptions_macro, macro_data),
+    "Hist_PL_Segment": (build_hist_pl_segment, hpl_rows),
+    "Hist_BS_Consol": (build_hist_bs_consol, hbs_rows),
+    "Hist_CF_Consol": (build_hist_cf_consol, hcf_rows),
+    "Hist_RAV_RateBase": (build_hist_rav_ratebase, hrav_rows),
+    "Assumptions_UK_Reg": (build_assumptions_uk_reg, uk_reg_data),
+    "Assumptions_US_Reg": (build_assumptions_us_reg, us_reg_data),
+    "Assumptions_NGV": (build_assumptions_ngv, ngv_data),
+    **{details[0]: (lambda wb, details=details: build_forecast_sheet(wb, *details), details) for details in sheet_details_forecast},
+    "Credit_Metrics": (lambda wb: build_credit_metrics_sheet(wb, *credit_sheet_details), (credit_sheet_details, CREDIT_METRICS, RATING_THRESHOLDS)),
+    "Cover_Summary": (build_cover_summary, (summary_display_cols, summary_rows)),
+}
+# Credit_Metrics is the only sheet calculated from the input CSVs, so only it (and Cover_Summary) rebuilds when they change
+sheet_specs = [(name, SCENARIO_INPUT_CSVS if name == credit_sheet_details[0] else [], SHEET_UPSTREAM.get(name, []), definition)
+               for name, (_, definition) in sheet_builders.items()]
 # Move Cover_Summary to be the first sheet
-if "Cover_Summary" in wb.sheetnames and "Assumptions_Macro" in wb.sheetnames: # Check if sheets exist
-    wb.move_sheet(ws_summ, offset=-len(wb.sheetnames)+1)
+sheet_order = ["Cover_Summary"] + [name for name in sheet_builders if name != "Cover_Summary"]
+
+def build_sheet(wb, sheet_name, data_dir="."):
+    """Builds one sheet by name (used for both full and incremental regeneration); only Credit_Metrics reads `data_dir`."""
+    if sheet_name == credit_sheet_details[0]:
+        return build_credit_metrics_sheet(wb, *credit_sheet_details, data_dir=data_dir)
+    return sheet_builders[sheet_name][0](wb)
 
 
 # --- Final Save ---
-output_filename = "NationalGrid_FinancialModel_Generated.xlsx"
-try:
-    wb.save(output_filename)
-    # print(f"Successfully created '{output_filename}'") # Cannot use print
-except Exception as e:
-    # print(f"Error saving workbook: {e}") # Cannot use print
-    # In a real script, you'd log this error
-    pass
-
-```
+# Only sheets whose row definitions changed (and their dependents) are rewritten on a rerun
+if __name__ == "__main__":
+    output_filename = "NationalGrid_FinancialModel_Generated.xlsx"
+    try:
+        rebuilt_sheets = regenerate(output_filename, sheet_specs, sheet_order, build_sheet, os.path.abspath(__file__), streaming=STREAMING_OUTPUT,
+                                    cache_values=CACHE_FORMULA_VALUES)
+        # print(f"Successfully created '{output_filename}'") # Cannot use print
+    except Exception as e:
+        # print(f"Error saving workbook: {e}") # Cannot use print
+        # In a real script, you'd log this error
+        pass
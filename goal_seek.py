@@ -0,0 +1,121 @@
+import math
+
+import numpy as np
+
+from scenario_engine import load_model_inputs, run_scenarios, stack_scenarios
+
+# --- Configuration & Constants ---
+# Credit constraints every solved year must meet: (Group Output, Bound: 'min' = at least / 'max' = at most, Threshold)
+CREDIT_CONSTRAINTS = [
+    ("ffo_net_debt", "min", 0.07),     # FFO / Net Debt of at least 7%
+    ("net_debt_ebitda", "max", 9.5),   # Net Debt / EBITDA of at most 9.5x
+]
+
+# Levers the solver can push: Lever -> (Scenario Input, How the lever applies, Lower Bound, Upper Bound, Reported Output)
+# 'mult' scales the input (e.g. every segment's capex plan); 'level' replaces it.
+GOAL_SEEK_LEVERS = {
+    "capex": ("capex", "mult", 0.0, 3.0, "capex"),                 # Multiple of the capex plan in each year
+    "dividends": ("payout_ratio", "level", 0.0, 1.0, "dividends"), # Payout ratio of profit to equity holders
+}
+GOAL_SEEK_TOL = 1e-4 # Width of the final bracket on the lever
+
+
+# --- Constraints ---
+def constraint_slack(group, constraints=CREDIT_CONSTRAINTS):
+    """Smallest headroom over all constraints, per scenario and year: >= 0 where every constraint is met."""
+    slack = None
+    for output, bound, threshold in constraints:
+        if bound not in ("min", "max"):
+            raise ValueError(f"Constraint on '{output}' has unknown bound '{bound}'")
+        headroom = group[output] - threshold if bound == "min" else threshold - group[output]
+        slack = headroom if slack is None else np.minimum(slack, headroom)
+    return slack
+
+
+# --- Solver ---
+def goal_seek(lever="capex", constraints=CREDIT_CONSTRAINTS, overrides=None, base=None, data_dir=".", n_scenarios=None,
+              per_year=True, bounds=None, tol=GOAL_SEEK_TOL):
+    """
+    Finds the largest lever value meeting every constraint, by bisection run on all scenarios at once.
+
+    per_year=True solves the years in order: each year's lever is pushed as far as that year's constraints allow,
+    given the levers already solved for earlier years (later years stay at the plan while a year is solved). This is
+    the maximum path when spending is front-loaded. per_year=False solves one lever per scenario applied to every year,
+    constrained in all years. Both assume the constraints tighten as the lever rises, as they do for capex and payout.
+
+    `overrides` / `n_scenarios` set up scenarios as for run_scenarios; `bounds` replaces the lever's (lower, upper).
+    Returns a dict with 'lever' (scenarios x years), the resulting path of the lever's output in £m ('capex' or
+    'dividends'), 'slack' (smallest constraint headroom), 'feasible' (False where even the lower bound breaches;
+    the lever is left at the lower bound there), 'runs' (engine calls made) and 'results' (run_scenarios output at
+    the solution).
+    """
+    if lever not in GOAL_SEEK_LEVERS:
+        raise KeyError(f"Unknown lever '{lever}'; available: {sorted(GOAL_SEEK_LEVERS)}")
+    input_key, how, lower, upper, output = GOAL_SEEK_LEVERS[lever]
+    lower, upper = bounds or (lower, upper)
+    if base is None:
+        base = load_model_inputs(data_dir)
+    overrides = dict(overrides or {})
+    inputs, n_scenarios = stack_scenarios(base, overrides, n_scenarios)
+    plan = np.asarray(inputs[input_key], dtype=float)
+    n_years = plan.shape[-1]
+
+    def applied(lever_values):
+        if how == "mult":
+            return plan * lever_values.reshape((n_scenarios,) + (1,) * (plan.ndim - 2) + (n_years,))
+        return np.broadcast_to(lever_values.reshape((n_scenarios,) + (1,) * (plan.ndim - 2) + (n_years,)), plan.shape)
+
+    runs = 0
+    def evaluate(lever_values):
+        nonlocal runs
+        runs += 1
+        overrides[input_key] = applied(lever_values)
+        results = run_scenarios(overrides, base=base, n_scenarios=n_scenarios)
+        return results, constraint_slack(results["group"], constraints)
+
+    # The plan, expressed as lever values (used for the years not yet solved)
+    lever_values = np.ones((n_scenarios, n_years)) if how == "mult" else plan.reshape(n_scenarios, -1, n_years)[:, 0].copy()
+    n_iter = max(0, math.ceil(math.log2((upper - lower) / tol)))
+    years = [[y] for y in range(n_years)] if per_year else [list(range(n_years))]
+    feasible = np.ones((n_scenarios, n_years), dtype=bool)
+    for cols in years:
+        def ok_at(value):
+            lever_values[:, cols] = value[:, None]
+            return (evaluate(lever_values)[1][:, cols] >= 0.0).all(axis=-1)
+        lo, hi = np.full(n_scenarios, float(lower)), np.full(n_scenarios, float(upper))
+        ok_hi = ok_at(hi)
+        ok_lo = ok_at(lo)
+        feasible[:, cols] = ok_lo[:, None]
+        for _ in range(n_iter):
+            if ok_hi.all() or not ok_lo.any():
+                break
+            mid = 0.5 * (lo + hi)
+            ok = ok_at(mid)
+            lo, hi = np.where(ok, mid, lo), np.where(ok, hi, mid)
+        lever_values[:, cols] = np.where(ok_hi, upper, lo)[:, None]
+
+    results, slack = evaluate(lever_values)
+    return {
+        "lever": lever_values,
+        output: results["group"][output],
+        "slack": slack,
+        "feasible": feasible,
+        "runs": runs,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    lever_name = sys.argv[1] if len(sys.argv) > 1 else "capex"
+    model_base = load_model_inputs()
+    np.set_printoptions(precision=3, suppress=True, linewidth=160)
+    for solve_per_year in (True, False):
+        start = time.perf_counter()
+        solved = goal_seek(lever_name, base=model_base, per_year=solve_per_year)
+        elapsed = time.perf_counter() - start
+        print(f"\nMax {lever_name} ({'per year' if solve_per_year else 'uniform'}), {solved['runs']} engine runs in {elapsed * 1000:.0f} ms")
+        print("Lever:       ", solved["lever"][0])
+        print(f"{lever_name.capitalize()} (£m):".ljust(14), solved[GOAL_SEEK_LEVERS[lever_name][4]][0].round(0))
+        print("Min headroom:", solved["slack"][0])
@@ -0,0 +1,371 @@
+import os
+
+import numpy as np
+
+from model_inputs import load_input_tables
+
+# --- Configuration & Constants ---
+PL_CSV = "hist_pl_segment.csv"
+BS_CSV = "hist_bs_consol.csv"
+CF_CSV = "hist_cf_consol.csv"
+RAV_CSV = "hist_rav_ratebase.csv"
+VALIDATED_CSVS = ["assumptions_macro.csv", "assumptions_uk_reg.csv", "assumptions_us_reg.csv", "assumptions_ngv.csv",
+                  PL_CSV, BS_CSV, CF_CSV, RAV_CSV]
+
+VALIDATION_ABS_TOL = 0.5   # £m/$m: half a unit of the packs' rounding
+VALIDATION_REL_TOL = 1e-6  # Of the identity's gross size (sum of absolute terms)
+SEVERITIES = ("error", "warning")
+
+PL_SEGMENT_SECTIONS = "*" # Every section holding the target item
+PL_GROUP = "GROUP CONSOLIDATED"
+
+# Identities: (Check, Severity, File, Section, Target Item, Terms, Abs Tolerance)
+# The target must equal the sum of the signed terms in every year. A term is (Sign, Item) in the target's section,
+# (Sign, Item, Section) elsewhere in the file or (Sign, Item, Section, File) in another file. Section None takes the
+# item's first row anywhere in its file; a rule Section of "*" repeats the rule for every section holding the target,
+# and a term Section of "*" sums the item over every section of the file that has it.
+IDENTITY_RULES = [
+    # P&L by segment
+    ("EBITDA = Revenue + Operating Costs", "error", PL_CSV, PL_SEGMENT_SECTIONS, "EBITDA",
+     [(1, "Revenue"), (1, "Operating Costs")], VALIDATION_ABS_TOL),
+    ("EBIT = EBITDA + D&A", "error", PL_CSV, PL_SEGMENT_SECTIONS, "Operating Profit (EBIT)",
+     [(1, "EBITDA"), (1, "Depreciation & Amort.")], VALIDATION_ABS_TOL),
+    ("Group revenue = sum of segments", "error", PL_CSV, PL_GROUP, "Total Revenue",
+     [(1, "Revenue", "*")], VALIDATION_ABS_TOL),
+    ("Group operating costs = sum of segments", "error", PL_CSV, PL_GROUP, "Total Operating Costs",
+     [(1, "Operating Costs", "*")], VALIDATION_ABS_TOL),
+    ("Group EBITDA = sum of segments", "error", PL_CSV, PL_GROUP, "Total EBITDA",
+     [(1, "EBITDA", "*")], VALIDATION_ABS_TOL),
+    ("Group EBITDA = Revenue + Operating Costs", "error", PL_CSV, PL_GROUP, "Total EBITDA",
+     [(1, "Total Revenue"), (1, "Total Operating Costs")], VALIDATION_ABS_TOL),
+    ("Group D&A = sum of segments", "error", PL_CSV, PL_GROUP, "Total Deprec. & Amort.",
+     [(1, "Depreciation & Amort.", "*")], VALIDATION_ABS_TOL),
+    ("Group EBIT = EBITDA + D&A", "error", PL_CSV, PL_GROUP, "Total Operating Profit (EBIT)",
+     [(1, "Total EBITDA"), (1, "Total Deprec. & Amort.")], VALIDATION_ABS_TOL),
+    ("PBT = EBIT + interest + other", "error", PL_CSV, PL_GROUP, "Profit Before Tax (PBT)",
+     [(1, "Total Operating Profit (EBIT)"), (1, "Interest Income"), (1, "Interest Expense"), (1, "Other Income/Expense")], VALIDATION_ABS_TOL),
+    ("Profit after tax = PBT + tax", "error", PL_CSV, PL_GROUP, "Profit After Tax",
+     [(1, "Profit Before Tax (PBT)"), (1, "Taxation")], VALIDATION_ABS_TOL),
+    ("Net profit = PAT + NCI", "error", PL_CSV, PL_GROUP, "Net Profit (for Equity Holders)",
+     [(1, "Profit After Tax"), (1, "Non-controlling Interests")], VALIDATION_ABS_TOL),
+    # Balance sheet
+    ("Non-current assets total", "error", BS_CSV, None, "Total Non-Current Assets",
+     [(1, "Property, Plant & Equipment"), (1, "Intangible Assets"), (1, "Investments (JVs, Assoc.)"), (1, "Deferred Tax Assets"),
+      (1, "Other Non-Current Assets")], VALIDATION_ABS_TOL),
+    ("Current assets total", "error", BS_CSV, None, "Total Current Assets",
+     [(1, "Inventories"), (1, "Trade & Other Receivables"), (1, "Cash & Cash Equivalents"), (1, "Other Current Assets")], VALIDATION_ABS_TOL),
+    ("Total assets", "error", BS_CSV, None, "TOTAL ASSETS",
+     [(1, "Total Non-Current Assets"), (1, "Total Current Assets")], VALIDATION_ABS_TOL),
+    ("Equity total", "error", BS_CSV, None, "Total Equity",
+     [(1, "Share Capital"), (1, "Share Premium / Reserves"), (1, "Non-Controlling Interests")], VALIDATION_ABS_TOL),
+    ("Non-current liabilities total", "error", BS_CSV, None, "Total Non-Current Liab.",
+     [(1, "Borrowings (Long-term)"), (1, "Deferred Tax Liabilities"), (1, "Provisions"), (1, "Other Non-Current Liab.")], VALIDATION_ABS_TOL),
+    ("Current liabilities total", "error", BS_CSV, None, "Total Current Liabilities",
+     [(1, "Borrowings (Short-term)"), (1, "Trade & Other Payables"), (1, "Current Tax Liabilities"), (1, "Other Current Liabilities")], VALIDATION_ABS_TOL),
+    ("Total liabilities", "error", BS_CSV, None, "Total Liabilities",
+     [(1, "Total Non-Current Liab."), (1, "Total Current Liabilities")], VALIDATION_ABS_TOL),
+    ("Total liabilities & equity", "error", BS_CSV, None, "TOTAL LIABILITIES & EQUITY",
+     [(1, "Total Equity"), (1, "Total Liabilities")], VALIDATION_ABS_TOL),
+    ("Balance sheet balances", "error", BS_CSV, None, "TOTAL ASSETS",
+     [(1, "TOTAL LIABILITIES & EQUITY")], VALIDATION_ABS_TOL),
+    ("Balance Check row", "error", BS_CSV, None, "Balance Check",
+     [(1, "TOTAL ASSETS"), (-1, "TOTAL LIABILITIES & EQUITY")], VALIDATION_ABS_TOL),
+    # Cash flow
+    ("Net CFO total", "error", CF_CSV, None, "Net CFO",
+     [(1, "Profit Before Tax"), (1, "Depreciation & Amortization"), (1, "Net Interest Expense (paid vs exp)"), (1, "Taxes Paid"),
+      (1, "Changes in Working Capital"), (1, "Other Non-Cash Items / Other")], VALIDATION_ABS_TOL),
+    ("Net CFI total", "error", CF_CSV, None, "Net CFI",
+     [(1, "Purchase of PP&E (Capex)"), (1, "Purchase of Intangibles"), (1, "Proceeds from Sale of Assets"),
+      (1, "Acquisitions, net of cash acquired"), (1, "Divestments"), (1, "Interest Received"), (1, "Dividends Received (JVs/Assoc)")], VALIDATION_ABS_TOL),
+    ("Net CFF total", "error", CF_CSV, None, "Net CFF",
+     [(1, "Proceeds from Borrowings"), (1, "Repayment of Borrowings"), (1, "Dividends Paid to Equity Holders"), (1, "Dividends Paid to NCI"),
+      (1, "Interest Paid"), (1, "Other Financing Activities")], VALIDATION_ABS_TOL),
+    ("Net change in cash = CFO + CFI + CFF", "error", CF_CSV, None, "Net Change in Cash & Equivalents",
+     [(1, "Net CFO"), (1, "Net CFI"), (1, "Net CFF")], VALIDATION_ABS_TOL),
+    ("Closing cash = opening + change + FX", "error", CF_CSV, None, "Cash at End of Year",
+     [(1, "Cash at Beginning of Year"), (1, "Net Change in Cash & Equivalents"), (1, "FX Impact on Cash")], VALIDATION_ABS_TOL),
+    # Across statements
+    ("CF PBT = P&L PBT", "warning", CF_CSV, None, "Profit Before Tax",
+     [(1, "Profit Before Tax (PBT)", PL_GROUP, PL_CSV)], VALIDATION_ABS_TOL),
+    ("CF D&A add-back = P&L D&A", "warning", CF_CSV, None, "Depreciation & Amortization",
+     [(-1, "Total Deprec. & Amort.", PL_GROUP, PL_CSV)], VALIDATION_ABS_TOL),
+    ("CF closing cash = BS cash", "warning", CF_CSV, None, "Cash at End of Year",
+     [(1, "Cash & Cash Equivalents", None, BS_CSV)], VALIDATION_ABS_TOL),
+    # RAV / rate base roll-forwards
+    ("NGET closing RAV roll-forward", "error", RAV_CSV, "UK Electricity Transmission (NGET) - RAV", "Closing RAV",
+     [(1, "Opening RAV"), (1, "Capex Additions (Allowed)"), (1, "Regulatory Depreciation"), (1, "Inflation Adjustment"),
+      (1, "Other Movements (e.g. disposals)")], VALIDATION_ABS_TOL),
+    ("NGED closing RAV roll-forward", "error", RAV_CSV, "UK Electricity Distribution (NGED) - RAV", "Closing RAV",
+     [(1, "Opening RAV"), (1, "Capex Additions (Allowed)"), (1, "Regulatory Depreciation"), (1, "Inflation Adjustment"),
+      (1, "Other Movements")], VALIDATION_ABS_TOL),
+    ("NY closing rate base roll-forward", "error", RAV_CSV, "US Regulated - Rate Base (NY)", "Closing Rate Base (NY)",
+     [(1, "Opening Rate Base"), (1, "Capex Additions"), (1, "Book Depreciation"), (1, "Other Regulatory Adjustments")], VALIDATION_ABS_TOL),
+    ("MA closing rate base roll-forward", "error", RAV_CSV, "US Regulated - Rate Base (MA)", "Closing Rate Base (MA)",
+     [(1, "Opening Rate Base"), (1, "Capex Additions"), (1, "Book Depreciation"), (1, "Other Regulatory Adjustments")], VALIDATION_ABS_TOL),
+]
+
+# Continuity: (Check, Severity, File, Section, Opening Item, Closing Item) - each year's opening equals last year's closing
+ROLL_FORWARD_RULES = [
+    ("Opening cash = prior closing cash", "error", CF_CSV, None, "Cash at Beginning of Year", "Cash at End of Year"),
+    ("NGET opening RAV = prior closing", "warning", RAV_CSV, "UK Electricity Transmission (NGET) - RAV", "Opening RAV", "Closing RAV"),
+    ("NGED opening RAV = prior closing", "warning", RAV_CSV, "UK Electricity Distribution (NGED) - RAV", "Opening RAV", "Closing RAV"), # Acquired in FY22
+    ("NY opening rate base = prior closing", "warning", RAV_CSV, "US Regulated - Rate Base (NY)", "Opening Rate Base", "Closing Rate Base (NY)"),
+    ("MA opening rate base = prior closing", "warning", RAV_CSV, "US Regulated - Rate Base (MA)", "Opening Rate Base", "Closing Rate Base (MA)"),
+]
+
+# Plausible ranges by the Unit column of the assumption and RAV files: Unit -> (Min, Max)
+UNIT_RANGES = {
+    "%": (-1.0, 1.0),
+    "x.xx": (0.0, np.inf),
+    "Row Ref": (1.0, np.inf),
+}
+
+
+# --- Rule Compilation ---
+def _layout(tables):
+    """Hashable description of the tables' structure: the same layout compiles to the same rule matrices."""
+    return tuple((fname, tuple(table["years"]), tuple((row["section"], row["item"], row["unit"]) for row in table["rows"]))
+                 for fname, table in sorted(tables.items()))
+
+
+def _find_rows(layout_rows, item, section):
+    """Positions of item rows in a file: the first match in a section (or anywhere for None), every match for '*'."""
+    matches = [idx for idx, (row_section, row_item, _) in enumerate(layout_rows)
+               if row_item == item and (section in (None, "*") or row_section == section)]
+    return matches if section == "*" else matches[:1]
+
+
+def compile_rules(layout, identity_rules=IDENTITY_RULES, roll_forward_rules=ROLL_FORWARD_RULES, unit_ranges=UNIT_RANGES):
+    """
+    Turns the rule tables into matrices over the stacked rows of every file (see _stack_values):
+    residual = current @ values + lagged @ values shifted one year, one row per check. Rules whose file is not in
+    the layout are skipped; references to rows a file does not have become 'structure' failures.
+    """
+    offsets, file_rows, n_rows = {}, {}, 0
+    for fname, _, rows in layout:
+        offsets[fname], file_rows[fname] = n_rows, rows
+        n_rows += len(rows)
+    years = sorted({year for _, file_years, _ in layout for year in file_years})
+
+    checks, targets, current, lagged, structure = [], [], [], [], []
+    def add_check(check, severity, fname, section, target_idx, tol, terms, lag_terms=()):
+        cur, lag = np.zeros(n_rows), np.zeros(n_rows)
+        cur[offsets[fname] + target_idx] += 1.0
+        targets.append(offsets[fname] + target_idx)
+        for coef, row in terms:
+            cur[row] -= coef
+        for coef, row in lag_terms:
+            lag[row] -= coef
+        row = file_rows[fname][target_idx]
+        checks.append({"check": check, "severity": severity, "file": fname, "section": row[0], "item": row[1], "tolerance": tol})
+        current.append(cur)
+        lagged.append(lag)
+
+    def missing(check, severity, fname, section, item):
+        structure.append({"check": check, "severity": severity, "file": fname, "section": section, "item": item,
+                          "year": None, "value": None, "expected": None, "difference": None, "tolerance": None,
+                          "message": f"row not found in {fname}"})
+
+    for check, severity, fname, section, target, terms, tol in identity_rules:
+        if fname not in offsets:
+            continue
+        if section == "*":
+            sections = list(dict.fromkeys(s for s, item, _ in file_rows[fname] if item == target))
+        else:
+            sections = [section]
+        for target_section in sections:
+            target_rows = _find_rows(file_rows[fname], target, target_section)
+            if not target_rows:
+                missing(check, severity, fname, target_section, target)
+                continue
+            resolved, ok = [], True
+            for term in terms:
+                sign, item = term[0], term[1]
+                term_section = term[2] if len(term) > 2 else target_section
+                term_file = term[3] if len(term) > 3 else fname
+                if term_file not in offsets:
+                    ok = False
+                    break
+                rows = _find_rows(file_rows[term_file], item, term_section)
+                if not rows:
+                    missing(check, severity, term_file, term_section, item)
+                    ok = False
+                    break
+                resolved.extend((float(sign), offsets[term_file] + r) for r in rows)
+            if ok:
+                add_check(check, severity, fname, target_section, target_rows[0], tol, resolved)
+
+    for check, severity, fname, section, opening, closing in roll_forward_rules:
+        if fname not in offsets:
+            continue
+        opening_rows, closing_rows = _find_rows(file_rows[fname], opening, section), _find_rows(file_rows[fname], closing, section)
+        if not opening_rows or not closing_rows:
+            missing(check, severity, fname, section, opening if not opening_rows else closing)
+            continue
+        add_check(check, severity, fname, section, opening_rows[0], VALIDATION_ABS_TOL, [], [(1.0, offsets[fname] + closing_rows[0])])
+
+    lower, upper = np.full(n_rows, -np.inf), np.full(n_rows, np.inf)
+    for fname, _, rows in layout:
+        for r, (_, _, unit) in enumerate(rows):
+            if unit in unit_ranges:
+                lower[offsets[fname] + r], upper[offsets[fname] + r] = unit_ranges[unit]
+
+    n_checks = len(checks)
+    return {
+        "years": years,
+        "offsets": offsets,
+        "checks": checks,
+        "targets": np.array(targets, dtype=int),
+        "current": np.array(current).reshape(n_checks, n_rows),
+        "lagged": np.array(lagged).reshape(n_checks, n_rows),
+        "tolerance": np.array([c["tolerance"] for c in checks]).reshape(n_checks, 1),
+        "lower": lower,
+        "upper": upper,
+        "structure": structure,
+    }
+
+
+_compiled_rules = {} # Layout -> compiled rules (packs from one template share them)
+
+
+def _stack_values(tables, layout, years):
+    """All files' rows stacked on the union of their years: (rows x years) values plus a mask of the years each file covers."""
+    n_rows = sum(len(rows) for _, _, rows in layout)
+    values = np.full((n_rows, len(years)), np.nan)
+    covered = np.zeros((n_rows, len(years)), dtype=bool)
+    start = 0
+    for fname, file_years, rows in layout:
+        cols = [years.index(y) for y in file_years]
+        values[start:start + len(rows), cols] = tables[fname]["values"]
+        covered[start:start + len(rows), cols] = True
+        start += len(rows)
+    return values, covered
+
+
+# --- Validation ---
+def _failures(compiled, values, covered, layout):
+    """
+    Evaluates every compiled check on (packs x rows x years) values in one pass and returns one failure list per
+    pack. Blank cells count as zero in identities (as Excel's SUM does) and are reported separately.
+    """
+    checks, years = compiled["checks"], compiled["years"]
+    filled = np.nan_to_num(values)
+    lag_filled = np.concatenate([np.zeros(filled.shape[:-1] + (1,)), filled[..., :-1]], axis=-1)
+    lag_covered = np.concatenate([np.zeros(covered.shape[:-1] + (1,), dtype=bool), covered[..., :-1]], axis=-1)
+    current, lagged = compiled["current"], compiled["lagged"]
+
+    residual = current @ filled + lagged @ lag_filled # (packs x checks x years)
+    gross = np.abs(current) @ np.abs(filled) + np.abs(lagged) @ np.abs(lag_filled)
+    undefined = (np.abs(current) @ ~covered) + (np.abs(lagged) @ ~lag_covered) > 0 # A referenced file lacks the year
+    tolerance = np.maximum(compiled["tolerance"], VALIDATION_REL_TOL * gross)
+    identity_fail = ~undefined & (np.abs(residual) > tolerance)
+
+    blank = covered & np.isnan(values)
+    out_of_range = covered & ~blank & ((values < compiled["lower"][:, None]) | (values > compiled["upper"][:, None]))
+
+    row_info = [(fname, section, item) for fname, _, rows in layout for section, item, _ in rows]
+    target_value = filled[:, compiled["targets"]] # (packs x checks x years)
+    reports = []
+    for p in range(values.shape[0]):
+        failures = list(compiled["structure"])
+        for c, y in zip(*np.nonzero(identity_fail[p])):
+            value, diff = target_value[p, c, y], residual[p, c, y]
+            failures.append(dict(checks[c], year=years[y], value=float(value), expected=float(value - diff),
+                                 difference=float(diff), tolerance=float(tolerance[p, c, y]), message=None))
+        for r, y in zip(*np.nonzero(blank[p])):
+            fname, section, item = row_info[r]
+            failures.append({"check": "Blank input cell", "severity": "error", "file": fname, "section": section, "item": item,
+                             "year": years[y], "value": None, "expected": None, "difference": None, "tolerance": None, "message": None})
+        for r, y in zip(*np.nonzero(out_of_range[p])):
+            fname, section, item = row_info[r]
+            lo, hi = compiled["lower"][r], compiled["upper"][r]
+            failures.append({"check": "Value out of range", "severity": "error", "file": fname, "section": section, "item": item,
+                             "year": years[y], "value": float(values[p, r, y]), "expected": None, "difference": None, "tolerance": None,
+                             "message": f"expected {lo:g} to {hi:g}"})
+        reports.append(failures)
+    return reports
+
+
+def validate_tables(tables):
+    """Checks one set of parsed input tables ({csv name: table}) and returns its failures (see validate_packs)."""
+    return validate_packs([tables])[0]
+
+
+def validate_inputs(data_dir=".", csv_filenames=None):
+    """Checks the input CSVs present in data_dir. Returns a list of failure dicts, empty if every check passes."""
+    return validate_packs([data_dir], csv_filenames)[0]
+
+
+def validate_packs(packs, csv_filenames=None):
+    """
+    Checks many entity packs: each pack is a data directory or a dict of parsed tables. Packs with the same layout
+    (files, years, rows) share one compiled rule set and are evaluated together as a (packs x rows x years) stack.
+    Returns one list of failure dicts per pack, each with 'check', 'severity' ('error'/'warning'), 'file',
+    'section', 'item', 'year', 'value', 'expected', 'difference', 'tolerance' and 'message'.
+    """
+    loaded = []
+    for pack in packs:
+        if isinstance(pack, dict):
+            loaded.append(pack)
+        else:
+            names = csv_filenames or [f for f in VALIDATED_CSVS if os.path.exists(os.path.join(pack, f))]
+            loaded.append(load_input_tables(pack, names))
+
+    by_layout = {}
+    for idx, tables in enumerate(loaded):
+        by_layout.setdefault(_layout(tables), []).append(idx)
+    reports = [None] * len(loaded)
+    for layout, indices in by_layout.items():
+        if layout not in _compiled_rules:
+            _compiled_rules[layout] = compile_rules(layout)
+        compiled = _compiled_rules[layout]
+        stacked = [_stack_values(loaded[idx], layout, compiled["years"]) for idx in indices]
+        values = np.stack([v for v, _ in stacked])
+        covered = np.stack([c for _, c in stacked])
+        for idx, failures in zip(indices, _failures(compiled, values, covered, layout)):
+            reports[idx] = failures
+    return reports
+
+
+def has_errors(failures):
+    return any(f["severity"] == "error" for f in failures)
+
+
+def format_failures(failures, limit=20):
+    """Readable report lines, errors first, e.g. 'error  hist_bs_consol.csv FY2021 TOTAL ASSETS: 57,230 vs 57,730 (-500) [Balance sheet balances]'."""
+    if not failures:
+        return "Input validation: all checks passed"
+    ordered = sorted(failures, key=lambda f: (SEVERITIES.index(f["severity"]), f["file"], f["year"] or ""))
+    n_errors = sum(f["severity"] == "error" for f in failures)
+    lines = [f"Input validation: {n_errors} errors, {len(failures) - n_errors} warnings"]
+    for f in ordered[:limit]:
+        where = f"{f['file']} {f['year'] or ''} {f['item']}".replace("  ", " ")
+        if f["difference"] is not None:
+            detail = f"{f['value']:,.1f} vs {f['expected']:,.1f} ({f['difference']:+,.1f})"
+        elif f["value"] is not None:
+            detail = f"{f['value']:g}, {f['message']}"
+        else:
+            detail = f["message"] or "blank"
+        lines.append(f"  {f['severity']:<8}{where}: {detail} [{f['check']}]")
+    if len(ordered) > limit:
+        lines.append(f"  ... {len(ordered) - limit} more")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    import sys
+    import time
+
+    parser = argparse.ArgumentParser(description="Check the historical identities and assumption ranges of one or more input directories.")
+    parser.add_argument("data_dirs", nargs="*", default=["."])
+    parser.add_argument("--limit", type=int, default=20, help="failures to list per directory")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    pack_reports = validate_packs(args.data_dirs)
+    elapsed = time.perf_counter() - start
+    for data_dir, pack_failures in zip(args.data_dirs, pack_reports):
+        print(f"{data_dir}: {format_failures(pack_failures, args.limit)}")
+    print(f"{len(args.data_dirs)} input set(s) checked in {elapsed * 1000:.1f} ms")
+    sys.exit(1 if any(has_errors(r) for r in pack_reports) else 0)
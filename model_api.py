@@ -0,0 +1,118 @@
+import os
+
+from credit_engine import credit_metrics, screen_thresholds
+from model_inputs import load_input_tables
+from rav_engine import forecast_rav, load_rav_inputs
+from scenario_engine import GROUP_OUTPUTS, NGV_SEGMENT_OUTPUTS, SCENARIO_INPUT_CSVS, SEGMENT_OUTPUTS, load_model_inputs, run_scenarios, stack_scenarios
+from statements_engine import build_statements, check_statements, load_opening_balance_sheet
+from time_axis import phase_model_inputs
+
+# --- Output Registry ---
+# Output name -> (Requires, Function of the model and the required values). Outputs are computed on first
+# request and memoised per Model, so asking for one series only evaluates what that series depends on.
+MODEL_OUTPUTS = {
+    "tables": ((), lambda model: model.tables_or_load()),
+    "base_inputs": (("tables",), lambda model, tables: model.phased(load_model_inputs(model.data_dir or ".", tables=tables))),
+    "rav": (("tables",), lambda model, tables: forecast_rav(inputs=model.phased(load_rav_inputs(model.data_dir or ".", tables=tables)))),
+    "scenarios": (("base_inputs",), lambda model, base: run_scenarios(model.overrides, base=base, n_scenarios=model.n_scenarios)),
+    "segments": (("scenarios",), lambda model, scenarios: scenarios["segments"]),
+    "ngv": (("scenarios",), lambda model, scenarios: scenarios["ngv"]),
+    "group": (("scenarios",), lambda model, scenarios: scenarios["group"]),
+    "statements": (("tables", "base_inputs", "scenarios"), lambda model, tables, base, scenarios: build_statements(
+        scenarios, stack_scenarios(base, model.overrides, scenarios["n_scenarios"])[0], load_opening_balance_sheet(tables))),
+    "statements_check": (("statements",), lambda model, statements: check_statements(statements)),
+    "credit_metrics": (("base_inputs", "group"), lambda model, base, group: credit_metrics(group, base.get("periods_per_year", 1))),
+    "credit_screen": (("credit_metrics",), lambda model, metrics: screen_thresholds(metrics)),
+}
+for _key in SEGMENT_OUTPUTS:
+    MODEL_OUTPUTS[f"segments.{_key}"] = (("segments",), lambda model, segments, _key=_key: segments[_key])
+for _key in NGV_SEGMENT_OUTPUTS:
+    MODEL_OUTPUTS[f"ngv.{_key}"] = (("ngv",), lambda model, ngv, _key=_key: ngv[_key])
+for _key in GROUP_OUTPUTS:
+    MODEL_OUTPUTS[f"group.{_key}"] = (("group",), lambda model, group, _key=_key: group[_key])
+del _key
+
+# Outputs that do not depend on the overrides: shared by every Model derived with Model.with_overrides
+INPUT_OUTPUTS = ("tables", "base_inputs", "rav")
+DEFAULT_OUTPUTS = ("group",)
+XLSX_GENERATOR_MODULE = "generate_full_national_grid_model"
+
+
+# --- Model ---
+class Model:
+    """
+    A lazily evaluated model over one set of inputs. `inputs` is a data directory holding the input CSVs or a dict of
+    already parsed tables keyed by CSV name (as returned by model_inputs.load_input_tables). `overrides` and
+    `n_scenarios` are passed to scenario_engine.run_scenarios. `time_axis` (a time_axis.TimeAxis) runs the engines
+    per period instead of per CSV year. Nothing is read or calculated until an output is requested.
+    """
+
+    def __init__(self, inputs=".", overrides=None, n_scenarios=None, time_axis=None):
+        if isinstance(inputs, dict):
+            self.data_dir, self._tables = None, inputs
+        else:
+            self.data_dir, self._tables = os.fspath(inputs), None
+        self.overrides = overrides
+        self.n_scenarios = n_scenarios
+        self.time_axis = time_axis
+        self._values = {}
+
+    def phased(self, inputs):
+        return inputs if self.time_axis is None else phase_model_inputs(inputs, self.time_axis)
+
+    def with_overrides(self, overrides=None, n_scenarios=None):
+        """A Model over the same inputs with other overrides; the parsed tables, base inputs and RAV forecast
+        already computed here are reused rather than rebuilt."""
+        model = Model(self._tables if self.data_dir is None else self.data_dir, overrides, n_scenarios, self.time_axis)
+        model._tables = self._tables
+        model._values = {name: self._values[name] for name in INPUT_OUTPUTS if name in self._values}
+        return model
+
+    def tables_or_load(self):
+        if self._tables is None:
+            self._tables = load_input_tables(self.data_dir, SCENARIO_INPUT_CSVS)
+        return self._tables
+
+    def __getitem__(self, name):
+        if name not in self._values:
+            if name not in MODEL_OUTPUTS:
+                raise KeyError(f"Unknown model output '{name}'; available: {sorted(MODEL_OUTPUTS)}")
+            requires, compute = MODEL_OUTPUTS[name]
+            self._values[name] = compute(self, *(self[dep] for dep in requires))
+        return self._values[name]
+
+    def write_xlsx(self, path, sheets=None, streaming=False, cache_values=True):
+        """
+        Writes the requested sheets (plus the sheets their formulas link to; all sheets if None) to path, with each
+        formula's result as its cached value unless cache_values is False.
+        The workbook generator, and with it openpyxl, is only imported here. The workbook is the base case laid out on
+        the generator's TIME_AXIS, so a model with overrides, several scenarios or another time axis raises ValueError
+        rather than writing figures that disagree with its outputs.
+        """
+        if self.data_dir is None:
+            raise ValueError("xlsx output lays the input CSVs out as sheets, so the model needs inputs as a data directory")
+        if self.overrides is not None or self.n_scenarios not in (None, 1):
+            raise ValueError("xlsx output is the base case; write it from a Model without overrides or n_scenarios")
+        import importlib
+        generator = importlib.import_module(XLSX_GENERATOR_MODULE)
+        if self.time_axis is not None and list(self.time_axis.labels) != list(generator.TIME_AXIS.labels):
+            raise ValueError(f"xlsx output uses the generator's time axis ({generator.TIME_AXIS!r}), not {self.time_axis!r}")
+        wb = generator.build_workbook(sheets, data_dir=self.data_dir, streaming=streaming)
+        wb.save(path)
+        if cache_values:
+            from xlsx_cached_values import write_cached_values
+            write_cached_values(path)
+        return wb.sheetnames
+
+
+def build_model(inputs=".", outputs=DEFAULT_OUTPUTS, overrides=None, n_scenarios=None, time_axis=None, xlsx_path=None, sheets=None):
+    """
+    Builds only what is asked for and returns {output name: value} for the names in `outputs` (see MODEL_OUTPUTS,
+    e.g. 'rav', 'group', 'group.ffo_net_debt', 'segments.closing_rav'). When xlsx_path is given the requested `sheets`
+    are also written there, and only then is openpyxl imported.
+    """
+    model = Model(inputs, overrides=overrides, n_scenarios=n_scenarios, time_axis=time_axis)
+    results = {name: model[name] for name in outputs}
+    if xlsx_path is not None:
+        model.write_xlsx(xlsx_path, sheets)
+    return results
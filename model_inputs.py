@@ -0,0 +1,198 @@
+import csv
+import json
+import os
+
+import numpy as np
+
+from regen_manifest import file_hash
+
+# --- Configuration & Constants ---
+HISTORICAL_YEARS_DATA = ["FY2020", "FY2021", "FY2022", "FY2023", "FY2024"]
+FORECAST_YEARS_MODEL = [f"FY{2025 + i}" for i in range(16)] # FY2025 to FY2040
+
+# Header labels used in the first column of the input CSVs (never section headers)
+CSV_HEADER_LABELS = ("Assumption", "Line Item (£m)", "Line Item")
+
+# Parsed tables are cached next to the CSVs as <name>.npy (values) + <name>.json (labels and source stamp)
+INPUT_CACHE_DIR = ".model_cache"
+INPUT_CACHE_VERSION = 1
+
+
+# --- Helper Functions ---
+def parse_csv_number(value):
+    """Converts a CSV field to a float. Returns None for blanks and text."""
+    if value is None:
+        return None
+    text = value.strip()
+    if text == "":
+        return None
+    is_percent = text.endswith('%')
+    text = text.rstrip('%').replace(',', '')
+    if text.startswith('(') and text.endswith(')'): # (1,234) style negatives
+        text = '-' + text[1:-1]
+    try:
+        num_val = float(text)
+    except ValueError:
+        return None
+    return num_val / 100 if is_percent else num_val
+
+
+def _split_csv_row(row_content, n_lead_cols, n_years):
+    """
+    Splits a raw CSV row into (label, lead_fields, year_fields, notes).
+    Some input files carry unquoted commas in the line item (e.g. "Property, Plant & Equipment")
+    or in the notes, so the label is widened until the year fields parse as numbers or blanks.
+    """
+    max_label_width = max(1, len(row_content) - n_years - (n_lead_cols - 1))
+    for label_width in range(1, max_label_width + 1):
+        first_year_col = label_width + n_lead_cols - 1
+        year_fields = row_content[first_year_col:first_year_col + n_years]
+        if all(v.strip() == "" or parse_csv_number(v) is not None for v in year_fields):
+            break
+    else:
+        label_width = 1
+        first_year_col = n_lead_cols
+        year_fields = row_content[first_year_col:first_year_col + n_years]
+    label = ",".join(row_content[:label_width])
+    lead_fields = row_content[label_width:first_year_col]
+    notes = ",".join(row_content[first_year_col + n_years:])
+    year_fields = year_fields + [""] * (n_years - len(year_fields))
+    return label, lead_fields, year_fields, notes
+
+
+def read_model_csv(csv_filename):
+    """
+    Parses one of the model input CSVs into a labelled table.
+    Returns a dict with 'years', a 'values' array (rows x years, NaN for blanks) and a 'rows' list of
+    dicts with the 1-indexed CSV 'row', 'section', 'item', 'unit' and 'notes' for each data row.
+    The CSV 'header' and the 'sections' (1-indexed CSV 'row' and 'label' of each section header row)
+    are kept so the table can be laid out again as a sheet.
+    """
+    with open(csv_filename, 'r', newline='', encoding='utf-8') as f:
+        raw_rows = list(csv.reader(f))
+    if not raw_rows:
+        raise ValueError(f"{csv_filename} is empty")
+
+    header = raw_rows[0]
+    has_unit_col = len(header) > 1 and header[1] == "Unit"
+    n_lead_cols = 2 if has_unit_col else 1
+    years = [h for h in header[n_lead_cols:] if h.startswith("FY")]
+
+    rows, values, sections = [], [], []
+    section = None
+    for r_idx, row_content in enumerate(raw_rows[1:], start=2):
+        if not row_content or all(v == '' for v in row_content):
+            continue
+        label, lead_fields, year_fields, notes = _split_csv_row(row_content, n_lead_cols, len(years))
+        row_values = [parse_csv_number(v) for v in year_fields]
+        if all(v is None for v in row_values) and label not in CSV_HEADER_LABELS:
+            section = label # Section header rows carry no year data
+            sections.append({"row": r_idx, "label": label})
+            continue
+        rows.append({
+            "row": r_idx,
+            "section": section,
+            "item": label,
+            "unit": lead_fields[0] if has_unit_col and lead_fields else None,
+            "notes": notes,
+        })
+        values.append([np.nan if v is None else v for v in row_values])
+
+    return {
+        "file": csv_filename,
+        "header": header,
+        "years": years,
+        "rows": rows,
+        "sections": sections,
+        "values": np.array(values, dtype=float).reshape(len(rows), len(years)),
+    }
+
+
+# --- Parsed-Input Cache ---
+_memory_cache = {} # Absolute CSV path -> ((mtime_ns, size), table), so repeat loads in one process skip the disk
+
+
+def _cache_paths(csv_filename, cache_dir=None):
+    csv_dir, base = os.path.split(os.path.abspath(csv_filename))
+    cache_dir = cache_dir or os.path.join(csv_dir, INPUT_CACHE_DIR)
+    stem = os.path.join(cache_dir, base)
+    return stem + ".json", stem + ".npy"
+
+
+def _write_atomic(path, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+def load_model_csv(csv_filename, cache_dir=None):
+    """
+    Same table as read_model_csv, served from the parsed-input cache when the CSV is unchanged.
+    The cache entry is trusted if the file's mtime and size match; if only the mtime moved, the content
+    hash decides. 'values' is then a read-only memory map of the cached array. Any cache I/O problem
+    falls back to parsing the CSV.
+    """
+    path = os.path.abspath(csv_filename)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    hit = _memory_cache.get(path)
+    if hit and hit[0] == stamp:
+        return hit[1]
+
+    meta_path, values_path = _cache_paths(path, cache_dir)
+    table = None
+    try:
+        with open(meta_path, 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get("version") == INPUT_CACHE_VERSION and meta["size"] == stat.st_size:
+            if meta["mtime_ns"] != stat.st_mtime_ns and meta["sha256"] == file_hash(path):
+                meta["mtime_ns"] = stat.st_mtime_ns # Touched but unchanged: refresh the stamp
+                _write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode('utf-8')))
+            if meta["mtime_ns"] == stat.st_mtime_ns:
+                table = dict(meta["table"], file=csv_filename, values=np.load(values_path, mmap_mode='r'))
+    except (OSError, ValueError, KeyError):
+        table = None
+
+    if table is None:
+        table = read_model_csv(csv_filename)
+        labels = {k: v for k, v in table.items() if k not in ("file", "values")}
+        meta = {"version": INPUT_CACHE_VERSION, "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                "sha256": file_hash(path), "table": labels}
+        try:
+            os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+            _write_atomic(values_path, lambda f: np.save(f, table["values"]))
+            _write_atomic(meta_path, lambda f: f.write(json.dumps(meta).encode('utf-8')))
+        except OSError:
+            pass # Read-only data directory: run uncached
+    _memory_cache[path] = (stamp, table)
+    return table
+
+
+def find_row_index(table, item, section=None):
+    """Returns the position in table['rows'] of the line item (optionally within a section)."""
+    for idx, row in enumerate(table["rows"]):
+        if row["item"] == item and (section is None or row["section"] == section):
+            return idx
+    where = f" in section '{section}'" if section else ""
+    raise KeyError(f"'{item}'{where} not found in {table['file']}")
+
+
+def get_row_values(table, item, section=None):
+    """Returns the year values (1-D array) for a line item."""
+    return table["values"][find_row_index(table, item, section)]
+
+
+def get_row_by_csv_row(table, csv_row):
+    """Returns the year values for a 1-indexed CSV row number (the 'Row Ref' convention in the inputs)."""
+    for idx, row in enumerate(table["rows"]):
+        if row["row"] == csv_row:
+            return table["values"][idx]
+    raise KeyError(f"Row {csv_row} not found in {table['file']}")
+
+
+def load_input_tables(data_dir=".", csv_filenames=None):
+    """Loads the input CSVs from data_dir (through the parsed-input cache) into a dict keyed by file name."""
+    if csv_filenames is None:
+        csv_filenames = sorted(f for f in os.listdir(data_dir) if f.endswith(".csv"))
+    return {fname: load_model_csv(os.path.join(data_dir, fname)) for fname in csv_filenames}
@@ -0,0 +1,230 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from scenario_engine import load_model_inputs, run_scenarios
+
+# --- Configuration & Constants ---
+# Stochastic macro factors: (Factor, Annual Shock Vol, AR(1) Persistence, How it is applied)
+# Shocks are deviations from the base path in assumptions_macro.csv; FX shocks are log deviations.
+MC_FACTORS = [
+    ("uk_cpih", 0.010, 0.6, "add"),          # UK CPIH (Annual %)
+    ("us_cpi", 0.010, 0.6, "add"),           # US CPI (Annual %)
+    ("uk_gilt_yield", 0.006, 0.8, "add"),    # UK 10-yr Gilt Yield, passed through to the cost of new GBP debt
+    ("gbp_usd_fx", 0.080, 0.9, "log"),       # GBP:USD, applied to both the average and year-end rates
+]
+MC_FACTOR_NAMES = [f[0] for f in MC_FACTORS]
+
+# Correlation of the annual shocks, in MC_FACTORS order
+MC_CORRELATION = np.array([
+    [1.00, 0.60, 0.40, -0.20],
+    [0.60, 1.00, 0.25, 0.10],
+    [0.40, 0.25, 1.00, 0.15],
+    [-0.20, 0.10, 0.15, 1.00],
+])
+
+MC_METRICS = ["ffo_net_debt", "net_debt_ebitda", "net_debt", "ffo", "ebitda"] # Group outputs from run_scenarios
+MC_PERCENTILES = [5, 25, 50, 75, 95]
+MC_DEFAULT_CHUNK_SIZE = 20000
+MC_HISTOGRAM_BINS = 4096
+
+
+# --- Path Generation ---
+def draw_macro_paths(rng, n_paths, n_years, correlation=MC_CORRELATION):
+    """Draws correlated AR(1) deviation paths for MC_FACTORS. Returns a dict of (paths x years) arrays."""
+    chol = np.linalg.cholesky(correlation)
+    vols = np.array([f[1] for f in MC_FACTORS])
+    persistence = np.array([f[2] for f in MC_FACTORS])
+    shocks = rng.standard_normal((n_years, n_paths, len(MC_FACTORS))) @ chol.T * vols
+    deviations = np.empty_like(shocks)
+    level = np.zeros((n_paths, len(MC_FACTORS)))
+    for y in range(n_years):
+        level = persistence * level + shocks[y]
+        deviations[y] = level
+    return {name: deviations[:, :, k].T for k, name in enumerate(MC_FACTOR_NAMES)}
+
+
+def macro_overrides(base, paths):
+    """Turns factor deviation paths into run_scenarios overrides on the base macro rows."""
+    fx_factor = np.exp(paths["gbp_usd_fx"])
+    return {
+        "uk_cpih": base["uk_cpih"] + paths["uk_cpih"],
+        "us_cpi": base["us_cpi"] + paths["us_cpi"],
+        "cost_of_debt_gbp": base["cost_of_debt_gbp"] + paths["uk_gilt_yield"], # Constant spread over gilts
+        "fx_avg": base["fx_avg"] * fx_factor,
+        "fx_year_end": base["fx_year_end"] * fx_factor,
+    }
+
+
+def chunk_seeds(seed, n_paths, chunk_size):
+    """Splits the run into fixed-size chunks, each with its own child seed, so results don't depend on worker count."""
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    n_chunks = -(-n_paths // chunk_size)
+    children = np.random.SeedSequence(seed).spawn(n_chunks)
+    sizes = [min(chunk_size, n_paths - i * chunk_size) for i in range(n_chunks)]
+    return list(zip(range(n_chunks), sizes, children))
+
+
+# --- Chunk Simulation ---
+def _simulate_values(n_paths, seed_seq, base):
+    """Runs one chunk of paths through the scenario engine and returns the MC_METRICS arrays (paths x years)."""
+    rng = np.random.default_rng(seed_seq)
+    paths = draw_macro_paths(rng, n_paths, base["uk_cpih"].shape[-1])
+    results = run_scenarios(macro_overrides(base, paths), base=base, n_scenarios=n_paths)
+    return {metric: results["group"][metric] for metric in MC_METRICS}
+
+
+def _histogram_edges(metric_values):
+    """Fixes histogram bin edges per metric and year from the first chunk's range, padded by half the range each side."""
+    edges = {}
+    for metric, values in metric_values.items():
+        lo, hi = values.min(axis=0), values.max(axis=0)
+        pad = np.maximum(hi - lo, 1e-9) * 0.5
+        edges[metric] = np.linspace(lo - pad, hi + pad, MC_HISTOGRAM_BINS + 1).T # (years x bins+1)
+    return edges
+
+
+def _reduce_chunk(chunk_idx, metric_values, bin_edges, percentiles):
+    """Reduces a chunk to percentiles, moments and fixed-bin histograms (with under/overflow bins) per metric and year."""
+    n_paths = next(iter(metric_values.values())).shape[0]
+    summary = {"chunk": chunk_idx, "n_paths": n_paths, "metrics": {}}
+    for metric, values in metric_values.items():
+        edges = bin_edges[metric]
+        counts = np.empty((values.shape[1], MC_HISTOGRAM_BINS + 2), dtype=np.int64)
+        for y in range(values.shape[1]):
+            counts[y] = np.bincount(np.searchsorted(edges[y], values[:, y], side='right'), minlength=MC_HISTOGRAM_BINS + 2)
+        summary["metrics"][metric] = {
+            "percentiles": np.percentile(values, percentiles, axis=0),
+            "sum": values.sum(axis=0),
+            "sum_sq": (values * values).sum(axis=0),
+            "min": values.min(axis=0),
+            "max": values.max(axis=0),
+            "histogram": counts,
+        }
+    return summary
+
+
+def _simulate_chunk(task):
+    """Process pool entry point: simulate and reduce one chunk."""
+    chunk_idx, n_paths, seed_seq, base, bin_edges, percentiles = task
+    return _reduce_chunk(chunk_idx, _simulate_values(n_paths, seed_seq, base), bin_edges, percentiles)
+
+
+def _histogram_percentiles(counts, edges, percentiles):
+    """Reads percentiles off merged histograms, interpolating linearly within each bin."""
+    n_years = counts.shape[0]
+    out = np.empty((len(percentiles), n_years))
+    for y in range(n_years):
+        cum = np.cumsum(counts[y])
+        # Bin boundaries: the underflow and overflow bins collapse onto the outer edges
+        positions = np.concatenate(([edges[y, 0]], edges[y], [edges[y, -1]]))
+        for p_idx, pct in enumerate(percentiles):
+            target = pct / 100.0 * cum[-1]
+            b = min(int(np.searchsorted(cum, target, side='left')), len(cum) - 1)
+            prev = cum[b - 1] if b > 0 else 0
+            frac = (target - prev) / counts[y, b] if counts[y, b] else 0.0
+            out[p_idx, y] = positions[b] + frac * (positions[b + 1] - positions[b])
+    return out
+
+
+# --- Driver ---
+def iter_monte_carlo(n_paths, seed=0, chunk_size=MC_DEFAULT_CHUNK_SIZE, workers=None, base=None, data_dir=".", percentiles=MC_PERCENTILES):
+    """
+    Simulates n_paths correlated macro paths in fixed-size chunks and yields each chunk's summary in chunk order.
+    Only per-chunk reductions are kept, so memory is bounded by chunk_size rather than n_paths. Chunks run on a
+    process pool with `workers` processes (default: all cores; 1 runs in-process). Every summary carries the
+    shared 'bin_edges' of its histograms.
+    """
+    chunks = chunk_seeds(seed, n_paths, chunk_size)
+    if base is None:
+        base = load_model_inputs(data_dir)
+    percentiles = list(percentiles)
+
+    # The first chunk runs in-process and fixes the histogram bins that every later chunk shares
+    first_idx, first_size, first_seed = chunks[0]
+    first_values = _simulate_values(first_size, first_seed, base)
+    bin_edges = _histogram_edges(first_values)
+    summary = _reduce_chunk(first_idx, first_values, bin_edges, percentiles)
+    del first_values
+    summary["bin_edges"] = bin_edges
+    yield summary
+
+    tasks = [(idx, size, seed_seq, base, bin_edges, percentiles) for idx, size, seed_seq in chunks[1:]]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        summaries = map(_simulate_chunk, tasks)
+        for summary in summaries:
+            summary["bin_edges"] = bin_edges
+            yield summary
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Submit at most a few chunks per worker ahead of consumption so finished summaries don't pile up
+        pending, next_task = [], 0
+        while next_task < len(tasks) or pending:
+            while next_task < len(tasks) and len(pending) < 2 * workers:
+                pending.append(pool.submit(_simulate_chunk, tasks[next_task]))
+                next_task += 1
+            summary = pending.pop(0).result()
+            summary["bin_edges"] = bin_edges
+            yield summary
+
+
+def run_monte_carlo(n_paths, seed=0, chunk_size=MC_DEFAULT_CHUNK_SIZE, workers=None, base=None, data_dir=".", percentiles=MC_PERCENTILES, on_chunk=None):
+    """
+    Runs the simulation and merges the streamed chunk summaries into distribution statistics per metric:
+    'percentiles' (percentiles x years, read off the merged histograms) and 'mean', 'std', 'min', 'max' (years,).
+    `on_chunk(summary, paths_done)` is called after each chunk, e.g. for progress reporting.
+    """
+    if n_paths < 1:
+        raise ValueError(f"n_paths must be at least 1, got {n_paths}")
+    percentiles = list(percentiles)
+    merged, paths_done, bin_edges = {}, 0, None
+    for summary in iter_monte_carlo(n_paths, seed, chunk_size, workers, base, data_dir, percentiles):
+        paths_done += summary["n_paths"]
+        bin_edges = summary["bin_edges"]
+        for metric, stats in summary["metrics"].items():
+            if metric not in merged:
+                merged[metric] = {k: np.array(v, copy=True) for k, v in stats.items() if k != "percentiles"}
+                continue
+            acc = merged[metric]
+            acc["sum"] += stats["sum"]
+            acc["sum_sq"] += stats["sum_sq"]
+            acc["min"] = np.minimum(acc["min"], stats["min"])
+            acc["max"] = np.maximum(acc["max"], stats["max"])
+            acc["histogram"] += stats["histogram"]
+        if on_chunk:
+            on_chunk(summary, paths_done)
+
+    results = {"n_paths": paths_done, "seed": seed, "percentile_levels": percentiles, "metrics": {}}
+    for metric, acc in merged.items():
+        mean = acc["sum"] / paths_done
+        results["metrics"][metric] = {
+            "percentiles": _histogram_percentiles(acc["histogram"], bin_edges[metric], percentiles),
+            "mean": mean,
+            "std": np.sqrt(np.maximum(acc["sum_sq"] / paths_done - mean * mean, 0.0)),
+            "min": acc["min"],
+            "max": acc["max"],
+        }
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of FFO/Net Debt and other credit metrics.")
+    parser.add_argument("--paths", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunk-size", type=int, default=MC_DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    mc = run_monte_carlo(args.paths, seed=args.seed, chunk_size=args.chunk_size, workers=args.workers,
+                         on_chunk=lambda summary, done: print(f"  {done:,} / {args.paths:,} paths", end="\r"))
+    print(f"\n{mc['n_paths']:,} paths in {time.perf_counter() - start:.1f}s (seed {mc['seed']})")
+    ffo_nd = mc["metrics"]["ffo_net_debt"]["percentiles"]
+    for p_idx, pct in enumerate(mc["percentile_levels"]):
+        print(f"  FFO / Net Debt P{pct:<3}" + " ".join(f"{v:7.1%}" for v in ffo_nd[p_idx, ::5]))
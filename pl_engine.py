@@ -0,0 +1,97 @@
+import numpy as np
+
+from model_inputs import FORECAST_YEARS_MODEL, HISTORICAL_YEARS_DATA, get_row_values
+
+# --- NGV Business Definitions ---
+# (Business, Section in assumptions_ngv.csv, Revenue Item, Opex Item, Capex Item); all £m, costs entered as negatives
+NGV_CSV = "assumptions_ngv.csv"
+NGV_BUSINESSES = [
+    ("IFA1/2", "INTERCONNECTORS", "IFA1/2 Revenue (£m)", "IFA1/2 Opex (£m)", "IFA1/2 Capex (£m)"),
+    ("BritNed", "INTERCONNECTORS", "BritNed Revenue (£m)", "BritNed Opex (£m)", "BritNed Capex (£m)"),
+    ("Nemo Link", "INTERCONNECTORS", "Nemo Link Revenue (£m)", "Nemo Link Opex (£m)", "Nemo Link Capex (£m)"),
+    ("North Sea Link", "INTERCONNECTORS", "North Sea Link Revenue (£m)", "North Sea Link Opex (£m)", "North Sea Link Capex (£m)"),
+    ("Viking Link", "INTERCONNECTORS", "Viking Link Revenue (£m)", "Viking Link Opex (£m)", "Viking Link Capex (£m)"),
+    ("New Interconnector", "INTERCONNECTORS", "New Interconnector Project (e.g. Nautilus) Revenue (£m)",
+     "New Interconnector Project Opex (£m)", "New Interconnector Project Capex (£m)"),
+    ("Grain LNG", "GRAIN LNG", "Grain LNG Revenue (£m)", "Grain LNG Opex (£m)", "Grain LNG Capex (£m)"),
+    ("Other NGV", "OTHER NGV (e.g. US Transmission, New Ventures)", "Other NGV Revenue (£m)", "Other NGV Opex (£m)", "Other NGV Capex (£m)"),
+]
+NGV_BUSINESS_NAMES = [business[0] for business in NGV_BUSINESSES]
+NGV_HIST_SECTION = "National Grid Ventures (NGV)" # Segment in hist_pl_segment.csv
+
+# Output series per NGV business, (scenarios x businesses x years) £m; costs and capex as positive amounts
+NGV_OUTPUTS = ["revenue", "opex", "ebitda", "capex"]
+
+
+# --- Input Loading ---
+def load_ngv_inputs(tables):
+    """
+    NGV line items from assumptions_ngv.csv as (businesses x years) arrays: 'ngv_revenue', 'ngv_opex' and 'ngv_capex'
+    (costs flipped to positive amounts), plus 'ngv_depreciation' (years,): NGV has no depreciation assumption, so the
+    FY2024 segment D&A from hist_pl_segment.csv is held flat.
+    """
+    n_years = len(FORECAST_YEARS_MODEL)
+    ngv = tables[NGV_CSV]
+    if ngv["years"][:n_years] != FORECAST_YEARS_MODEL:
+        raise ValueError(f"{NGV_CSV} years do not match FORECAST_YEARS_MODEL")
+    inputs = {key: np.zeros((len(NGV_BUSINESSES), n_years)) for key in ("ngv_revenue", "ngv_opex", "ngv_capex")}
+    for b, (_, section, revenue_item, opex_item, capex_item) in enumerate(NGV_BUSINESSES):
+        inputs["ngv_revenue"][b] = get_row_values(ngv, revenue_item, section)[:n_years]
+        inputs["ngv_opex"][b] = -get_row_values(ngv, opex_item, section)[:n_years]
+        inputs["ngv_capex"][b] = -get_row_values(ngv, capex_item, section)[:n_years]
+    for key in inputs:
+        inputs[key] = np.nan_to_num(inputs[key])
+
+    hist_pl = tables["hist_pl_segment.csv"]
+    last_hist_idx = hist_pl["years"].index(HISTORICAL_YEARS_DATA[-1])
+    inputs["ngv_depreciation"] = np.full(n_years, -get_row_values(hist_pl, "Depreciation & Amort.", NGV_HIST_SECTION)[last_hist_idx])
+    inputs["ngv_businesses"] = list(NGV_BUSINESS_NAMES)
+    return inputs
+
+
+# --- Calculation ---
+def regulated_segment_pl(inputs, rav):
+    """
+    Regulated revenue, opex and EBITDA per segment (native currency) using the allowed-return building blocks.
+    `inputs` arrays carry any leading scenario axes; `rav` is the matching roll_forward_rav output.
+    """
+    is_uk = inputs["is_uk"][:, None]
+    opening = rav["Opening RAV"]
+    depreciation = -rav["Regulatory Depreciation"]
+
+    # UK: RAV x allowed WACC + outperformance, with efficient opex and regulatory depreciation recovered through revenue
+    uk_opex = inputs["opex_base"] * (1.0 - inputs["opex_efficiency"])
+    uk_return = opening * inputs["allowed_wacc"] + inputs["outperformance"]
+    # US: return on rate base at ROE on the equity share and cost of debt on the remainder; opex grows with US CPI
+    us_allowed = inputs["equity_ratio"] * inputs["allowed_roe"] + (1.0 - inputs["equity_ratio"]) * inputs["cost_of_debt_usd"][..., None, :]
+    us_opex = inputs["opex_last_hist"][..., None] * np.cumprod((1.0 + inputs["opex_growth"]) * (1.0 + inputs["us_cpi"][..., None, :]), axis=-1)
+    us_return = opening * us_allowed
+
+    opex = np.where(is_uk, uk_opex, us_opex)
+    ebitda = np.where(is_uk, uk_return, us_return) + depreciation
+    return ebitda + opex, opex, ebitda
+
+
+def ngv_pl(inputs):
+    """
+    NGV P&L per business: revenue and opex as forecast in assumptions_ngv.csv, EBITDA = revenue - opex.
+    Returns a dict keyed by NGV_OUTPUTS of (..., businesses x years) arrays in £m, plus the segment 'depreciation'.
+    """
+    revenue = inputs["ngv_revenue"]
+    opex = inputs["ngv_opex"]
+    return {
+        "revenue": revenue,
+        "opex": opex,
+        "ebitda": revenue - opex,
+        "capex": inputs["ngv_capex"],
+        "depreciation": inputs["ngv_depreciation"],
+    }
+
+
+if __name__ == "__main__":
+    from model_inputs import load_input_tables
+    ngv_inputs = load_ngv_inputs(load_input_tables(".", [NGV_CSV, "hist_pl_segment.csv"]))
+    ngv = ngv_pl(ngv_inputs)
+    print(f"NGV EBITDA (£m), {FORECAST_YEARS_MODEL[0]} -> {FORECAST_YEARS_MODEL[-1]}:")
+    for b, name in enumerate(NGV_BUSINESS_NAMES):
+        print(f"  {name}: {ngv['ebitda'][b, 0]:,.0f} -> {ngv['ebitda'][b, -1]:,.0f} (capex {ngv['capex'][b].sum():,.0f})")
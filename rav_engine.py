@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+
+from model_inputs import FORECAST_YEARS_MODEL, HISTORICAL_YEARS_DATA, get_row_by_csv_row, get_row_values, load_model_csv
+
+# --- RAV / Rate Base Segment Definitions ---
+# (Segment, Currency, Assumptions CSV, Assumptions Section, Capex Item, Depn Rate Item, Inflation Row Ref Item,
+#  Hist Section in hist_rav_ratebase.csv, Hist Closing Item)
+RAV_SEGMENTS = [
+    ("NGET", "£m", "assumptions_uk_reg.csv", "NGET (RIIO-T2/T3)",
+     "RAV: Capex Additions (£m)", "RAV: Regulatory Depn Rate (% Opening RAV)", "RAV: Inflation Link (CPIH Ref:Row in Assumptions_Macro)",
+     "UK Electricity Transmission (NGET) - RAV", "Closing RAV"),
+    ("NGED", "£m", "assumptions_uk_reg.csv", "NGED (RIIO-ED2/ED3)",
+     "RAV: Capex Additions (£m)", "RAV: Regulatory Depn Rate (% Opening RAV)", "RAV: Inflation Link (CPIH Ref:Row in Assumptions_Macro)",
+     "UK Electricity Distribution (NGED) - RAV", "Closing RAV"),
+    ("NY", "$m", "assumptions_us_reg.csv", "New York (NY)",
+     "Rate Base: Capex Additions ($m)", "Rate Base: Book Depn Rate (% Opening RB)", None, # US rate base is not indexed
+     "US Regulated - Rate Base (NY)", "Closing Rate Base (NY)"),
+    ("MA", "$m", "assumptions_us_reg.csv", "Massachusetts (MA)",
+     "Rate Base: Capex Additions ($m)", "Rate Base: Book Depn Rate (% Opening RB)", None,
+     "US Regulated - Rate Base (MA)", "Closing Rate Base (MA)"),
+]
+RAV_SEGMENT_NAMES = [seg[0] for seg in RAV_SEGMENTS]
+
+MACRO_CSV = "assumptions_macro.csv"
+HIST_RAV_CSV = "hist_rav_ratebase.csv"
+
+# Line items of the roll-forward, matching frav_row_definitions in generate_full_national_grid_model.py
+RAV_LINE_ITEMS = ["Opening RAV", "Capex Additions (Allowed)", "Regulatory Depreciation", "Inflation Adjustment", "Other Movements", "Closing RAV"]
+
+
+# --- Input Loading ---
+def load_rav_inputs(data_dir=".", tables=None):
+    """
+    Builds the roll-forward input arrays from the assumption and history CSVs.
+    Returns a dict of 'opening' (segments,) and 'capex', 'depn_rate', 'inflation' (segments x years) arrays.
+    `tables` can pass already parsed CSV tables keyed by file name to avoid re-reading them.
+    """
+    tables = dict(tables or {})
+    def table(fname):
+        if fname not in tables:
+            tables[fname] = load_model_csv(os.path.join(data_dir, fname))
+        return tables[fname]
+
+    macro = table(MACRO_CSV)
+    hist = table(HIST_RAV_CSV)
+    last_hist_year_idx = hist["years"].index(HISTORICAL_YEARS_DATA[-1])
+
+    n_seg, n_years = len(RAV_SEGMENTS), len(FORECAST_YEARS_MODEL)
+    opening = np.zeros(n_seg)
+    capex = np.zeros((n_seg, n_years))
+    depn_rate = np.zeros((n_seg, n_years))
+    inflation = np.zeros((n_seg, n_years))
+
+    for s, (_, _, assum_csv, section, capex_item, depn_item, infl_ref_item, hist_section, hist_closing_item) in enumerate(RAV_SEGMENTS):
+        assum = table(assum_csv)
+        if assum["years"][:n_years] != FORECAST_YEARS_MODEL:
+            raise ValueError(f"{assum_csv} years do not match FORECAST_YEARS_MODEL")
+        opening[s] = get_row_values(hist, hist_closing_item, hist_section)[last_hist_year_idx]
+        capex[s] = get_row_values(assum, capex_item, section)[:n_years]
+        depn_rate[s] = get_row_values(assum, depn_item, section)[:n_years]
+        if infl_ref_item:
+            # The inflation link row holds, per year, the CSV row number of the index in assumptions_macro.csv
+            row_refs = get_row_values(assum, infl_ref_item, section)[:n_years]
+            for y, row_ref in enumerate(row_refs):
+                inflation[s, y] = get_row_by_csv_row(macro, int(row_ref))[y]
+
+    return {
+        "segments": list(RAV_SEGMENT_NAMES),
+        "currencies": [seg[1] for seg in RAV_SEGMENTS],
+        "years": list(FORECAST_YEARS_MODEL),
+        "opening": np.nan_to_num(opening),
+        "capex": np.nan_to_num(capex),
+        "depn_rate": np.nan_to_num(depn_rate),
+        "inflation": np.nan_to_num(inflation),
+    }
+
+
+# --- Calculation ---
+def roll_forward_rav(opening, capex, depn_rate, inflation, other=0.0):
+    """
+    Runs Opening -> Capex -> Regulatory Depreciation -> Inflation -> Other -> Closing for every year.
+    `opening` is (..., segments); the other inputs broadcast to (..., segments, years), so any leading
+    axes (e.g. scenarios) are carried through in the same pass. Returns a dict keyed by RAV_LINE_ITEMS.
+    """
+    opening = np.asarray(opening, dtype=float)
+    shape = np.broadcast_shapes(opening.shape + (1,), np.shape(capex), np.shape(depn_rate), np.shape(inflation), np.shape(other))
+    capex = np.broadcast_to(capex, shape)
+    depn_rate = np.broadcast_to(depn_rate, shape)
+    inflation = np.broadcast_to(inflation, shape)
+    other = np.broadcast_to(other, shape)
+
+    # The recursion runs year by year, so iterate over contiguous year-major slices
+    growth = np.ascontiguousarray(np.moveaxis(1.0 - depn_rate + inflation, -1, 0))
+    additions = np.ascontiguousarray(np.moveaxis(capex + other, -1, 0))
+    opening_by_year = np.empty_like(growth)
+    balance = np.broadcast_to(opening, shape[:-1]).astype(float)
+    for y in range(shape[-1]):
+        opening_by_year[y] = balance
+        # Closing = Opening * (1 - depn rate + inflation) + capex + other
+        balance = balance * growth[y] + additions[y]
+    opening_arr = np.moveaxis(opening_by_year, 0, -1)
+
+    depreciation = -opening_arr * depn_rate
+    inflation_adj = opening_arr * inflation
+    closing = opening_arr + capex + depreciation + inflation_adj + other
+    return {
+        "Opening RAV": opening_arr,
+        "Capex Additions (Allowed)": np.array(capex),
+        "Regulatory Depreciation": depreciation,
+        "Inflation Adjustment": inflation_adj,
+        "Other Movements": np.array(other),
+        "Closing RAV": closing,
+    }
+
+
+def forecast_rav(data_dir=".", inputs=None):
+    """Loads the CSV inputs (unless given) and returns the RAV/Rate Base roll-forward by segment and year."""
+    if inputs is None:
+        inputs = load_rav_inputs(data_dir)
+    return roll_forward_rav(inputs["opening"], inputs["capex"], inputs["depn_rate"], inputs["inflation"])
+
+
+if __name__ == "__main__":
+    rav_inputs = load_rav_inputs()
+    results = forecast_rav(inputs=rav_inputs)
+    print("Closing RAV / Rate Base:", ", ".join(rav_inputs["years"][i] for i in (0, -1)))
+    for s, seg in enumerate(rav_inputs["segments"]):
+        print(f"  {seg} ({rav_inputs['currencies'][s]}): {results['Closing RAV'][s, 0]:,.0f} -> {results['Closing RAV'][s, -1]:,.0f}")
@@ -0,0 +1,240 @@
+import ipaddress
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from model_api import MODEL_OUTPUTS, Model
+from model_inputs import load_input_tables
+from pl_engine import NGV_BUSINESS_NAMES
+from rav_engine import RAV_SEGMENT_NAMES
+from results_store import inputs_hash
+from scenario_engine import SCENARIO_INPUT_CSVS
+
+# --- Configuration & Constants ---
+DEFAULT_HOST = "127.0.0.1" # Loopback only: the service has no authentication
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 256   # Responses kept in the LRU cache
+DEFAULT_SERVICE_OUTPUTS = ["group"]
+DELTA_KINDS = ("add", "mult", "set")
+MAX_REQUEST_BYTES = 1 << 20
+
+
+# --- Deltas ---
+def apply_deltas(base, deltas):
+    """
+    Turns assumption deltas into single-scenario run_scenarios overrides. Each delta is a dict:
+      {"input": "allowed_wacc", "change": 0.005, "kind": "add", "segments": ["NGET"], "years": ["FY2030", ...]}
+    'kind' is 'add' (default), 'mult' (relative change, e.g. 0.1 = +10%) or 'set'; 'segments' (per-segment inputs
+    only; NGV business names for the ngv_* inputs) and 'years' default to all. 'change' may also be a list with one value per selected year;
+    NaN or infinite changes are rejected. Deltas on the same input apply in order.
+    """
+    overrides = {}
+    for delta in deltas:
+        key, kind = delta.get("input"), delta.get("kind", "add")
+        if key not in base or not isinstance(base[key], np.ndarray) or base[key].dtype.kind != 'f':
+            raise ValueError(f"Unknown numeric input '{key}'")
+        if kind not in DELTA_KINDS:
+            raise ValueError(f"Delta on '{key}' has unknown kind '{kind}'; use one of {DELTA_KINDS}")
+        values = overrides[key][0] if key in overrides else np.array(base[key], dtype=float)
+        index = []
+        if values.ndim == 2:
+            segments = delta.get("segments")
+            names = NGV_BUSINESS_NAMES if key.startswith("ngv_") else RAV_SEGMENT_NAMES
+            index.append(slice(None) if segments is None else [names.index(seg) for seg in segments])
+        elif delta.get("segments") is not None:
+            raise ValueError(f"'{key}' is not a per-segment input")
+        if values.ndim >= 1 and values.shape[-1] == len(base["years"]):
+            years = delta.get("years")
+            index.append(slice(None) if years is None else [base["years"].index(year) for year in years])
+        elif delta.get("years") is not None:
+            raise ValueError(f"'{key}' has no year axis")
+        rows = tuple(np.ix_(*[np.arange(values.shape[axis])[sel] for axis, sel in enumerate(index)])) if index else ()
+        change = np.asarray(delta["change"], dtype=float)
+        if not np.isfinite(change).all():
+            raise ValueError(f"Delta on '{key}' has a non-finite change")
+        if kind == "add":
+            values[rows] += change
+        elif kind == "mult":
+            values[rows] *= 1.0 + change
+        else:
+            values[rows] = change
+        overrides[key] = values[np.newaxis]
+    return overrides
+
+
+def _jsonable(value):
+    """Engine outputs -> JSON-ready lists (NaN -> null), single-scenario axes dropped."""
+    if isinstance(value, dict):
+        return {str(k): _jsonable(v) for k, v in value.items()}
+    if isinstance(value, np.ndarray):
+        values = value.astype(float) if value.dtype.kind in "iuf" else value
+        if values.dtype.kind == "f":
+            return np.where(np.isfinite(values), values, None).tolist()
+        return values.tolist()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+# --- Service ---
+class RecalcService:
+    """
+    Keeps one data directory's parsed inputs and base-case Model in memory and answers what-if recalculations.
+    Responses are memoised in an LRU cache keyed on the hash of the base inputs and the override arrays the deltas
+    produce, plus the requested outputs. The input CSVs are re-checked (by mtime and size) on every request; an edit
+    reloads them and clears the cache.
+    """
+
+    def __init__(self, data_dir=".", time_axis=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.data_dir = os.fspath(data_dir)
+        self.time_axis = time_axis
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+        self._tables = None
+        self.refresh()
+
+    def refresh(self):
+        """Reloads the inputs if any CSV changed. Returns True if they did."""
+        tables = load_input_tables(self.data_dir, SCENARIO_INPUT_CSVS) # Memoised per file stamp
+        with self._lock:
+            if self._tables is not None and all(tables[f] is self._tables[f] for f in SCENARIO_INPUT_CSVS):
+                return False
+            model = Model(tables, time_axis=self.time_axis)
+            model["base_inputs"] # Warm the shared, override-independent outputs
+            model["rav"]
+            self._tables, self.model = tables, model
+            self.base_hash = inputs_hash(self.data_dir)
+            self._cache.clear()
+            return True
+
+    def recalc(self, deltas=(), outputs=DEFAULT_SERVICE_OUTPUTS):
+        """
+        Applies the deltas (see apply_deltas) to the base case and returns {'cache_key', 'cached', 'years',
+        'segment_names', 'ngv_businesses', 'outputs': {name: values}, 'seconds'}. Segment and NGV outputs are
+        (segments x years) lists. 'cache_key' identifies the base inputs plus the deltas' override arrays; it is
+        not a results_store input hash, which is taken over the override arrays of a whole batch.
+        """
+        start = time.perf_counter()
+        unknown = [name for name in outputs if name not in MODEL_OUTPUTS or name == "tables"]
+        if unknown:
+            raise ValueError(f"Unknown outputs {unknown}; available: {sorted(set(MODEL_OUTPUTS) - {'tables'})}")
+        self.refresh()
+        model = self.model
+        base = model["base_inputs"]
+        overrides = apply_deltas(base, deltas)
+        key = inputs_hash(overrides=overrides, base_hash=self.base_hash) + "|" + ",".join(outputs)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return dict(self._cache[key], cached=True, seconds=time.perf_counter() - start)
+            self.misses += 1
+
+        scenario_model = model.with_overrides(overrides or None, n_scenarios=1)
+        values = {}
+        for name in outputs:
+            value = scenario_model[name]
+            values[name] = value[0] if name.startswith(("segments.", "ngv.", "group.")) else value
+        for name in ("segments", "ngv", "group"):
+            if name in values:
+                values[name] = {k: v[0] for k, v in values[name].items()}
+        response = {
+            "cache_key": key.split("|")[0],
+            "years": list(base["years"]),
+            "segment_names": list(base["segments"]),
+            "ngv_businesses": list(base["ngv_businesses"]),
+            "outputs": _jsonable(values),
+        }
+        with self._lock:
+            self._cache[key] = response
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(response, cached=False, seconds=time.perf_counter() - start)
+
+    def status(self):
+        return {"data_dir": os.path.abspath(self.data_dir), "base_hash": self.base_hash, "cache_entries": len(self._cache),
+                "cache_size": self.cache_size, "hits": self.hits, "misses": self.misses,
+                "time_axis": repr(self.time_axis) if self.time_axis else None}
+
+
+# --- HTTP ---
+class RecalcRequestHandler(BaseHTTPRequestHandler):
+    """GET /status, GET /outputs, POST /recalc with {"deltas": [...], "outputs": [...]}; JSON in and out."""
+    service = None # Set by make_server
+
+    def _send(self, code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/status":
+            self._send(200, self.service.status())
+        elif self.path == "/outputs":
+            self._send(200, {"outputs": sorted(set(MODEL_OUTPUTS) - {"tables"}), "segments": RAV_SEGMENT_NAMES, "ngv_businesses": NGV_BUSINESS_NAMES,
+                             "inputs": sorted(k for k, v in self.service.model["base_inputs"].items()
+                                              if isinstance(v, np.ndarray) and v.dtype.kind == 'f')})
+        else:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+
+    def do_POST(self):
+        if self.path != "/recalc":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        length = int(self.headers.get("Content-Length") or 0)
+        if length > MAX_REQUEST_BYTES:
+            self._send(413, {"error": "Request too large"})
+            return
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+            self._send(200, self.service.recalc(request.get("deltas", []), request.get("outputs", DEFAULT_SERVICE_OUTPUTS)))
+        except (ValueError, KeyError, TypeError, IndexError) as e:
+            self._send(400, {"error": str(e)})
+        except Exception as e: # Keep the connection answered; the service stays up for the next request
+            self._send(500, {"error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, format, *args):
+        pass # Quiet: dashboards poll
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """HTTP server for the service, bound to a loopback address only (port 0 picks a free port)."""
+    if not ipaddress.ip_address(host).is_loopback:
+        raise ValueError(f"The recalculation service only binds to loopback addresses, not {host}")
+    handler = type("BoundRecalcRequestHandler", (RecalcRequestHandler,), {"service": service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    import argparse
+    from time_axis import DEFAULT_LAST_YEAR, TimeAxis
+
+    parser = argparse.ArgumentParser(description="Serve what-if recalculations of the model on localhost.")
+    parser.add_argument("--data-dir", default=".")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    parser.add_argument("--last-year", type=int, default=None)
+    parser.add_argument("--frequency", default="annual")
+    args = parser.parse_args()
+
+    axis = TimeAxis(args.last_year or DEFAULT_LAST_YEAR, args.frequency) if args.last_year or args.frequency != "annual" else None
+    start = time.perf_counter()
+    recalc_service = RecalcService(args.data_dir, time_axis=axis, cache_size=args.cache_size)
+    server = make_server(recalc_service, port=args.port)
+    print(f"Inputs loaded in {(time.perf_counter() - start) * 1000:.0f} ms; serving on http://{DEFAULT_HOST}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
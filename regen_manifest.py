@@ -0,0 +1,155 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 2
+# Modules the generators import to lay out and write sheets, and the engines whose results are written as values; a
+# change to any of them changes the output like a change to the generator script itself, so they are hashed into the
+# manifest's "generator" entry (when the manifest is built, not when a generator is imported)
+GENERATOR_SOURCES = ["regen_manifest.py", "formula_templates.py", "model_inputs.py", "time_axis.py", "input_validation.py",
+                     "streaming_workbook.py", "formula_engine.py", "xlsx_cached_values.py", "xlsx_reader.py",
+                     "sensitivity_engine.py", "scenario_engine.py", "pl_engine.py", "fx_translation.py", "rav_engine.py", "debt_engine.py",
+                     "credit_engine.py", "goal_seek.py"]
+GENERATOR_SOURCE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# --- Hashing ---
+def file_hash(path):
+    """SHA-256 of a file's bytes, or None if it doesn't exist."""
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def definition_hash(definition):
+    """SHA-256 of a row-definition table (dicts/lists/tuples of plain values), via its repr."""
+    return hashlib.sha256(repr(definition).encode('utf-8')).hexdigest()
+
+
+def manifest_path(output_filename):
+    return output_filename + ".manifest.json"
+
+
+def load_manifest(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return manifest if manifest.get("version") == MANIFEST_VERSION else None
+
+
+def save_manifest(path, manifest):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+# --- Change Detection ---
+def build_manifest(sheet_specs, sheet_order, generator_path, data_dir="."):
+    """
+    Captures the current state of every input: the generator source (the script plus GENERATOR_SOURCES), each
+    sheet's input CSVs and row-definition table. `sheet_specs` is a list of (SheetName, Input CSVs, Upstream Sheets,
+    Definition).
+    """
+    input_files = sorted({fname for _, csvs, _, _ in sheet_specs for fname in csvs})
+    return {
+        "version": MANIFEST_VERSION,
+        "generator": [file_hash(generator_path)]
+                     + [file_hash(os.path.join(GENERATOR_SOURCE_DIR, src)) for src in GENERATOR_SOURCES],
+        "sheet_order": list(sheet_order),
+        "inputs": {fname: file_hash(os.path.join(data_dir, fname)) for fname in input_files},
+        "sheets": {
+            name: {"inputs": list(csvs), "upstream": list(upstream), "definition": definition_hash(definition)}
+            for name, csvs, upstream, definition in sheet_specs
+        },
+    }
+
+
+def sheets_to_rebuild(old, new):
+    """
+    Compares manifests and returns the sheets to rewrite, in build order: sheets whose input CSVs or
+    row definitions changed, plus everything downstream of them. Returns None when a full rebuild is
+    needed (no previous manifest, generator code changed or the sheet layout changed).
+    """
+    if old is None or old.get("generator") != new["generator"] or old.get("sheet_order") != new["sheet_order"]:
+        return None
+    if set(old.get("sheets", {})) != set(new["sheets"]):
+        return None
+
+    changed_inputs = {fname for fname, digest in new["inputs"].items() if old["inputs"].get(fname) != digest}
+    dirty = set()
+    for name, spec in new["sheets"].items():
+        if spec["definition"] != old["sheets"][name]["definition"] or changed_inputs.intersection(spec["inputs"]):
+            dirty.add(name)
+
+    # Propagate to downstream dependents until nothing new is marked
+    grew = True
+    while grew:
+        grew = False
+        for name, spec in new["sheets"].items():
+            if name not in dirty and dirty.intersection(spec["upstream"]):
+                dirty.add(name)
+                grew = True
+    return [name for name in new["sheets"] if name in dirty]
+
+
+# --- Driver ---
+def regenerate(output_filename, sheet_specs, sheet_order, build_sheet, generator_path, data_dir=".", force=False, streaming=False,
+               cache_values=False):
+    """
+    Writes output_filename, rebuilding only the sheets whose inputs changed since the last run.
+    `build_sheet(wb, sheet_name, data_dir)` must create and populate one sheet. Returns the list of sheets
+    that were (re)built; an empty list means the workbook was already up to date.
+    With `streaming`, sheets are written through StreamingWorkbook; write-only workbooks can't be
+    edited in place, so any change rebuilds every sheet. With `cache_values`, every formula's result is written into
+    the saved file as its cached value (xlsx_cached_values.py), recalculated on each save.
+    """
+    import openpyxl
+    from xlsx_cached_values import write_cached_values
+
+    manifest_file = manifest_path(output_filename)
+    new = build_manifest(sheet_specs, sheet_order, generator_path, data_dir)
+    old = None if force or not os.path.exists(output_filename) else load_manifest(manifest_file)
+    dirty = sheets_to_rebuild(old, new)
+
+    if dirty == []:
+        return []
+    if streaming:
+        from streaming_workbook import StreamingWorkbook
+
+        wb = StreamingWorkbook()
+        dirty = [name for name, _, _, _ in sheet_specs]
+        for name in dirty:
+            build_sheet(wb, name, data_dir)
+        wb.order_sheets(sheet_order)
+        wb.save(output_filename)
+        if cache_values:
+            write_cached_values(output_filename)
+        save_manifest(manifest_file, new)
+        return dirty
+    if dirty is None:
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active) # Remove default sheet
+        dirty = [name for name, _, _, _ in sheet_specs]
+    else:
+        wb = openpyxl.load_workbook(output_filename)
+        for name in dirty:
+            del wb[name]
+
+    for name in dirty:
+        build_sheet(wb, name, data_dir)
+    for target_idx, name in enumerate(sheet_order): # Restore the saved sheet order
+        ws = wb[name]
+        wb.move_sheet(ws, offset=target_idx - wb.index(ws))
+
+    wb.save(output_filename)
+    if cache_values:
+        write_cached_values(output_filename)
+    save_manifest(manifest_file, new)
+    return dirty
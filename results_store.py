@@ -0,0 +1,198 @@
+import hashlib
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+
+from regen_manifest import file_hash
+from scenario_engine import SCENARIO_INPUT_CSVS
+
+# --- Configuration & Constants ---
+# Store layout: <store>/catalog.json lists the runs; each run is a directory holding one .npy file per series plus
+# scenario_id.npy. Series are stored year-major, (years x [segments x] scenarios), so "one metric, one year, every
+# scenario" is a single contiguous read of a memory-mapped file.
+CATALOG_FILE = "catalog.json"
+STORE_VERSION = 1
+SCENARIO_ID_FILE = "scenario_id.npy"
+
+
+# --- Helper Functions ---
+def inputs_hash(data_dir=".", overrides=None, base_hash=None):
+    """
+    SHA-256 over the input CSVs' contents and any scenario override arrays, identifying what a run was computed from.
+    `base_hash` (inputs_hash(data_dir) computed earlier) stands in for the CSVs, so they are not re-read.
+    """
+    digest = hashlib.sha256()
+    if base_hash is not None:
+        digest.update(f"base:{base_hash}\n".encode('utf-8'))
+    else:
+        for fname in SCENARIO_INPUT_CSVS:
+            digest.update(f"{fname}:{file_hash(os.path.join(data_dir, fname))}\n".encode('utf-8'))
+    for key in sorted(overrides or {}):
+        values = np.ascontiguousarray(overrides[key], dtype=float)
+        digest.update(f"{key}:{values.shape}\n".encode('utf-8'))
+        digest.update(values.tobytes())
+    return digest.hexdigest()
+
+
+def flatten_results(results):
+    """run_scenarios output -> {series name: (scenarios x [segments x] years) array}, named as in model_api (e.g. 'group.ffo_net_debt')."""
+    series = {}
+    for group in ("segments", "ngv", "group"):
+        for key, values in results.get(group, {}).items():
+            series[f"{group}.{key}"] = values
+    return series
+
+
+def _write_atomic(path, write, mode='w'):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, mode) as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+# --- Store ---
+class ResultsStore:
+    """
+    Columnar store of scenario outputs under one directory. Runs are written once and never modified; queries
+    memory-map only the series they touch, so no workbook is reopened to read results.
+    """
+
+    def __init__(self, path):
+        self.path = os.fspath(path)
+        self._catalog = None
+
+    # --- Catalog ---
+    def catalog(self):
+        if self._catalog is None:
+            try:
+                with open(os.path.join(self.path, CATALOG_FILE), 'r', encoding='utf-8') as f:
+                    self._catalog = json.load(f)
+            except FileNotFoundError:
+                self._catalog = {"version": STORE_VERSION, "runs": {}}
+        return self._catalog
+
+    def runs(self, input_hash=None):
+        """Run metadata dicts (oldest first), optionally only those computed from input_hash."""
+        return [dict(meta, run_id=run_id) for run_id, meta in self.catalog()["runs"].items()
+                if input_hash is None or meta["input_hash"] == input_hash]
+
+    def latest_run(self, input_hash=None):
+        runs = self.runs(input_hash)
+        if not runs:
+            raise KeyError("No runs in the store" + (f" for inputs {input_hash[:12]}" if input_hash else ""))
+        return runs[-1]["run_id"]
+
+    # --- Writing ---
+    def save_run(self, results, input_hash, scenario_ids=None, label=None, extra_series=None, dtype="float64"):
+        """
+        Stores one run_scenarios output (plus any extra_series {name: (scenarios x ... x years)}) and returns its run id.
+        `scenario_ids` (default 0..N-1) label the scenarios for later lookups; dtype="float32" halves the file sizes.
+        One writer at a time: the catalog is rewritten whole on every save.
+        """
+        catalog = self.catalog()
+        series = flatten_results(results)
+        series.update(extra_series or {})
+        n_scenarios = results["n_scenarios"]
+        scenario_ids = np.arange(n_scenarios, dtype=np.int64) if scenario_ids is None else np.asarray(scenario_ids, dtype=np.int64)
+        if scenario_ids.shape != (n_scenarios,):
+            raise ValueError(f"Expected {n_scenarios} scenario ids, got {scenario_ids.shape}")
+        if len(np.unique(scenario_ids)) != n_scenarios:
+            raise ValueError("Scenario ids must be unique")
+
+        run_number = len(catalog["runs"]) + 1
+        while f"run-{run_number:06d}" in catalog["runs"] or os.path.exists(os.path.join(self.path, f"run-{run_number:06d}")):
+            run_number += 1
+        run_id = f"run-{run_number:06d}"
+        run_dir = os.path.join(self.path, run_id)
+        tmp_dir = run_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        metrics = {}
+        # Sorted by scenario id, so id lookups are a binary search
+        order = np.argsort(scenario_ids, kind="stable")
+        np.save(os.path.join(tmp_dir, SCENARIO_ID_FILE), scenario_ids[order])
+        for name, values in series.items():
+            values = np.asarray(values, dtype=dtype)
+            if values.shape[0] != n_scenarios:
+                raise ValueError(f"Series '{name}' has {values.shape[0]} scenarios, expected {n_scenarios}")
+            fname = name.replace("/", "_") + ".npy"
+            np.save(os.path.join(tmp_dir, fname), np.ascontiguousarray(values[order].T)) # Axes reversed: years first
+            metrics[name] = {"file": fname, "shape": list(values.shape), "dtype": str(values.dtype)}
+        os.replace(tmp_dir, run_dir)
+
+        catalog["runs"][run_id] = {
+            "input_hash": input_hash,
+            "label": label,
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "n_scenarios": n_scenarios,
+            "years": list(results["years"]),
+            "segment_names": list(results.get("segment_names", [])),
+            "metrics": metrics,
+        }
+        os.makedirs(self.path, exist_ok=True)
+        _write_atomic(os.path.join(self.path, CATALOG_FILE), lambda f: json.dump(catalog, f, indent=1))
+        return run_id
+
+    # --- Queries ---
+    def _series(self, run_id, metric):
+        meta = self.catalog()["runs"][run_id]
+        if metric not in meta["metrics"]:
+            raise KeyError(f"Run {run_id} has no series '{metric}'; available: {sorted(meta['metrics'])}")
+        return meta, np.load(os.path.join(self.path, run_id, meta["metrics"][metric]["file"]), mmap_mode='r')
+
+    def scenario_ids(self, run_id=None):
+        run_id = run_id or self.latest_run()
+        return np.load(os.path.join(self.path, run_id, SCENARIO_ID_FILE), mmap_mode='r')
+
+    def query(self, metric, year=None, run_id=None, scenarios=None, segment=None):
+        """
+        Values of one series from a run (the latest if run_id is None), e.g. query('group.ffo_net_debt', 'FY2030').
+        Returns (scenarios,) for one year or (scenarios x years) for all; segment series also take `segment`
+        (a name, or None for every segment as the second axis). Scenarios come back in ascending id order, or in the
+        order of `scenarios` when a list of ids is given.
+        """
+        run_id = run_id or self.latest_run()
+        meta, stored = self._series(run_id, metric) # (years x [segments x] scenarios)
+        if year is not None:
+            stored = stored[meta["years"].index(year)]
+        if segment is not None:
+            if len(meta["metrics"][metric]["shape"]) != 3:
+                raise ValueError(f"'{metric}' is not a per-segment series")
+            seg_axis = 0 if year is not None else 1
+            stored = np.take(stored, meta["segment_names"].index(segment), axis=seg_axis)
+        if scenarios is not None:
+            ids = self.scenario_ids(run_id)
+            wanted = np.asarray(scenarios, dtype=np.int64)
+            positions = np.searchsorted(ids, wanted)
+            if np.any(positions >= len(ids)) or np.any(ids[np.minimum(positions, len(ids) - 1)] != wanted):
+                raise KeyError(f"Scenario ids not in run {run_id}")
+            stored = stored[..., positions]
+        return np.asarray(stored).T # Back to the (scenarios, ...) orientation the engines use
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Query a results store, e.g. 'results_store.py store query group.ffo_net_debt FY2030'.")
+    parser.add_argument("store")
+    parser.add_argument("command", choices=["runs", "query"])
+    parser.add_argument("metric", nargs="?")
+    parser.add_argument("year", nargs="?")
+    parser.add_argument("--run")
+    parser.add_argument("--segment")
+    args = parser.parse_args()
+
+    results_store = ResultsStore(args.store)
+    if args.command == "runs":
+        for run in results_store.runs():
+            print(f"{run['run_id']}  {run['created']}  inputs {run['input_hash'][:12]}  {run['n_scenarios']:,} scenarios  {run['label'] or ''}")
+    else:
+        start = time.perf_counter()
+        values = results_store.query(args.metric, args.year, run_id=args.run, segment=args.segment)
+        elapsed = time.perf_counter() - start
+        print(f"{args.metric} {args.year or 'all years'}: {values.shape[0]:,} scenarios in {elapsed * 1000:.1f} ms")
+        print("  p5 / p50 / p95:", np.percentile(values, [5, 50, 95], axis=0).round(4).tolist())
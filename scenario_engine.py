@@ -0,0 +1,226 @@
+import os
+
+import numpy as np
+
+from debt_engine import solve_debt_schedule
+from fx_translation import load_fx_inputs, translate, translation_difference
+from model_inputs import FORECAST_YEARS_MODEL, HISTORICAL_YEARS_DATA, get_row_values, load_model_csv
+from pl_engine import NGV_OUTPUTS, load_ngv_inputs, ngv_pl, regulated_segment_pl
+from rav_engine import MACRO_CSV, RAV_SEGMENTS, load_rav_inputs, roll_forward_rav
+
+# --- Configuration & Constants ---
+# Same inputs (and order) as csv_files_info in generate_full_national_grid_model.py
+SCENARIO_INPUT_CSVS = [
+    "assumptions_macro.csv", "assumptions_uk_reg.csv", "assumptions_us_reg.csv", "assumptions_ngv.csv",
+    "hist_pl_segment.csv", "hist_bs_consol.csv", "hist_cf_consol.csv", "hist_rav_ratebase.csv",
+]
+
+# Macro rows used by the engine: (Input Key, Line Item in assumptions_macro.csv)
+MACRO_INPUT_ROWS = [
+    ("uk_cpih", "UK CPIH (Annual %)"),
+    ("us_cpi", "US CPI (Annual %)"),
+    ("cost_of_debt_gbp", "Cost of New Debt (GBP %)"),
+    ("cost_of_debt_usd", "Cost of New Debt (USD %)"),
+    ("uk_tax_rate", "UK Corporation Tax Rate (%)"),
+    ("us_federal_tax_rate", "US Federal Corp Tax Rate (%)"),
+    ("us_state_tax_rate", "US Blended State Tax (Net of Fed Benefit, %)"),
+    ("payout_ratio", "Dividend Payout Ratio (% of Net Profit to Equity Holders)"),
+    ("min_cash", "Target Minimum Cash Balance (£m)"),
+]
+
+# Per-segment P&L rows: (Input Key, UK Item in assumptions_uk_reg.csv, US Item in assumptions_us_reg.csv)
+SEGMENT_INPUT_ROWS = [
+    ("allowed_wacc", "Revenue: Allowed WACC (Nominal %)", None),
+    ("outperformance", "Revenue: Outperformance/Underperformance (£m)", None),
+    ("opex_base", "Opex: Base before efficiency (£m)", None),
+    ("opex_efficiency", "Opex: Efficiency Target (% reduction on base)", None),
+    ("allowed_roe", None, "Revenue: Allowed ROE (%)"),
+    ("equity_ratio", None, "Revenue: Equity Ratio in Cap Structure (%)"),
+    ("opex_growth", None, "Opex: Growth (before US CPI inflation) (%)"),
+]
+
+# Output series returned per scenario
+SEGMENT_OUTPUTS = ["closing_rav", "revenue", "opex", "ebitda"] # (scenarios x segments x years), native currency
+NGV_SEGMENT_OUTPUTS = NGV_OUTPUTS # (scenarios x NGV businesses x years), £m
+GROUP_OUTPUTS = ["revenue", "ebitda", "depreciation", "interest", "tax", "ffo", "dividends", "capex", "net_debt", "ffo_net_debt", "net_debt_ebitda",
+                 "closing_rav", "rav_fx_translation"] # (scenarios x years), £m; RAV / rate base at closing rates
+
+
+# --- Input Loading ---
+def load_model_inputs(data_dir=".", tables=None):
+    """
+    Builds the base (single scenario) input arrays from the CSVs listed in SCENARIO_INPUT_CSVS.
+    Segment arrays are (segments x years) in each segment's own currency; macro arrays are (years,).
+    """
+    if tables is None:
+        tables = {fname: load_model_csv(os.path.join(data_dir, fname)) for fname in SCENARIO_INPUT_CSVS}
+    n_years = len(FORECAST_YEARS_MODEL)
+    last_hist_idx = tables["hist_pl_segment.csv"]["years"].index(HISTORICAL_YEARS_DATA[-1])
+
+    base = load_rav_inputs(data_dir, tables=tables)
+    base["opening_rav"] = base.pop("opening")
+    base.pop("inflation") # Re-derived from uk_cpih at run time so CPIH overrides flow into the RAV
+    base["is_uk"] = np.array([seg[1] == "£m" for seg in RAV_SEGMENTS])
+    base["is_indexed"] = np.array([seg[6] is not None for seg in RAV_SEGMENTS])
+
+    macro = tables[MACRO_CSV]
+    for key, item in MACRO_INPUT_ROWS:
+        base[key] = get_row_values(macro, item)[:n_years].copy()
+    base.update(load_fx_inputs(tables)) # fx_avg / fx_year_end through the US "Row Ref" links
+
+    n_seg = len(RAV_SEGMENTS)
+    for key, _, _ in SEGMENT_INPUT_ROWS:
+        base[key] = np.zeros((n_seg, n_years))
+    for s, (_, _, assum_csv, section, *_rest) in enumerate(RAV_SEGMENTS):
+        col = 1 if base["is_uk"][s] else 2
+        for row_def in SEGMENT_INPUT_ROWS:
+            if row_def[col]:
+                base[row_def[0]][s] = get_row_values(tables[assum_csv], row_def[col], section)[:n_years]
+
+    # US opex has no base in the assumptions: split the FY2024 US Regulated operating costs (£m)
+    # across NY/MA by closing rate base and translate at the first forecast year's average rate.
+    hist_pl = tables["hist_pl_segment.csv"]
+    us_opex_gbp = -get_row_values(hist_pl, "Operating Costs", "US Regulated")[last_hist_idx]
+    us_share = np.where(base["is_uk"], 0.0, base["opening_rav"])
+    base["opex_last_hist"] = us_opex_gbp * base["fx_avg"][0] * us_share / us_share.sum()
+
+    # Opening group debt and its embedded cost, from the FY2024 balance sheet and P&L
+    hist_bs = tables["hist_bs_consol.csv"]
+    gross_debt = sum(get_row_values(hist_bs, item)[last_hist_idx] for item in ("Borrowings (Long-term)", "Borrowings (Short-term)"))
+    cash = get_row_values(hist_bs, "Cash & Cash Equivalents")[last_hist_idx]
+    base["opening_net_debt"] = np.array(gross_debt - cash)
+    base["embedded_cost_of_debt"] = np.array(-get_row_values(hist_pl, "Interest Expense")[last_hist_idx] / gross_debt)
+
+    base.update(load_ngv_inputs(tables))
+    return base
+
+
+def stack_scenarios(base, overrides=None, n_scenarios=None):
+    """
+    Broadcasts the base inputs and a dict of overrides onto a leading scenario axis.
+    Each override's first axis is the scenario axis and its remaining axes align with the
+    trailing axes of the base array, e.g. 'uk_cpih' (N, years), 'allowed_wacc' (N,) or (N, years),
+    'capex' (N, segments, years). Returns (inputs, n_scenarios).
+    """
+    overrides = overrides or {}
+    unknown = set(overrides) - set(base)
+    if unknown:
+        raise KeyError(f"Unknown scenario inputs: {sorted(unknown)}")
+    if n_scenarios is None:
+        n_scenarios = max([len(np.asarray(v)) for v in overrides.values()] or [1])
+
+    inputs = {}
+    for key, base_val in base.items():
+        if not isinstance(base_val, np.ndarray) or base_val.dtype == bool:
+            inputs[key] = base_val
+            continue
+        if key in overrides:
+            val = np.asarray(overrides[key], dtype=float)
+            if val.shape[0] != n_scenarios:
+                raise ValueError(f"Override '{key}' has {val.shape[0]} scenarios, expected {n_scenarios}")
+            pad = base_val.ndim - (val.ndim - 1)
+            if pad < 0:
+                raise ValueError(f"Override '{key}' has more axes than the base input {base_val.shape}")
+            val = val.reshape(val.shape[:1] + (1,) * pad + val.shape[1:])
+        else:
+            val = base_val[np.newaxis]
+        inputs[key] = np.broadcast_to(val, (n_scenarios,) + base_val.shape)
+    return inputs, n_scenarios
+
+
+# --- Calculation ---
+def _group_credit(inputs, segment_ebitda, depreciation, capex, ngv):
+    """
+    Rolls group net debt forward and derives FFO and credit ratios (interest charged on average net debt).
+    The regulated segments are translated at average rates (fx_translation); NGV (£m, UK tax) is added to every group line.
+    """
+    is_uk = inputs["is_uk"][:, None]
+    units = inputs["currencies"]
+    ngv_ebitda = ngv["ebitda"].sum(axis=-2)
+    ngv_ebit = ngv_ebitda - ngv["depreciation"]
+    ebitda_gbp = translate(segment_ebitda, units, inputs, "average")
+    ebit_gbp = translate(segment_ebitda - depreciation, units, inputs, "average")
+    ebitda = ebitda_gbp.sum(axis=-2) + ngv_ebitda
+    ebit = ebit_gbp.sum(axis=-2) + ngv_ebit
+    capex_gbp = translate(capex, units, inputs, "average").sum(axis=-2) + ngv["capex"].sum(axis=-2)
+    us_tax_rate = inputs["us_federal_tax_rate"] + inputs["us_state_tax_rate"]
+    seg_tax_rate = np.where(is_uk, inputs["uk_tax_rate"][..., None, :], us_tax_rate[..., None, :])
+    tax_before_interest = (ebit_gbp * seg_tax_rate).sum(axis=-2) + ngv_ebit * inputs["uk_tax_rate"]
+
+    # Interest is charged on average net debt, so the debt engine solves the interest/cash circularity year by year
+    opening_nd = inputs["opening_net_debt"]
+    debt = solve_debt_schedule(
+        opening_nd, cfo=ebitda - tax_before_interest, capex=capex_gbp, new_debt_rate=inputs["cost_of_debt_gbp"],
+        payout_ratio=inputs["payout_ratio"], profit_before_interest=ebit - tax_before_interest, tax_rate=inputs["uk_tax_rate"],
+        existing_debt=opening_nd, existing_rate=inputs["embedded_cost_of_debt"], # Existing debt at its embedded cost
+    )
+    interest = debt["Interest"]
+    tax = tax_before_interest - debt["Tax Shield on Interest"]
+    ffo = ebitda - interest - tax
+    dividends = debt["Dividends"]
+    net_debt = debt["Closing Net Debt"]
+
+    # Ratios are on an annual basis: sub-annual flows (see time_axis.py) are annualised at the period's run rate
+    per_year = inputs.get("periods_per_year", 1)
+    return {
+        "ebitda": ebitda,
+        "depreciation": ebitda - ebit,
+        "interest": interest,
+        "tax": tax,
+        "ffo": ffo,
+        "dividends": dividends,
+        "capex": capex_gbp,
+        "net_debt": net_debt,
+        "ffo_net_debt": ffo * per_year / net_debt,
+        "net_debt_ebitda": net_debt / (ebitda * per_year),
+    }
+
+
+def run_scenarios(overrides=None, base=None, data_dir=".", n_scenarios=None):
+    """
+    Evaluates every scenario in one vectorised pass.
+    Returns a dict with 'segments' (segments x years per scenario, native currency), 'ngv' (NGV businesses x years
+    per scenario, £m) and 'group' (years per scenario, £m, including NGV) output arrays, keyed by SEGMENT_OUTPUTS,
+    NGV_SEGMENT_OUTPUTS and GROUP_OUTPUTS.
+    """
+    if base is None:
+        base = load_model_inputs(data_dir)
+    inputs, n_scenarios = stack_scenarios(base, overrides, n_scenarios)
+
+    inflation = np.where(inputs["is_indexed"][:, None], inputs["uk_cpih"][..., None, :], 0.0)
+    rav = roll_forward_rav(inputs["opening_rav"], inputs["capex"], inputs["depn_rate"], inflation)
+    revenue, opex, ebitda = regulated_segment_pl(inputs, rav)
+    ngv = ngv_pl(inputs)
+    group = _group_credit(inputs, ebitda, -rav["Regulatory Depreciation"], inputs["capex"], ngv)
+
+    units = inputs["currencies"]
+    group["revenue"] = translate(revenue, units, inputs, "average").sum(axis=-2) + ngv["revenue"].sum(axis=-2)
+    group["closing_rav"] = translate(rav["Closing RAV"], units, inputs, "closing").sum(axis=-2)
+    group["rav_fx_translation"] = translation_difference(rav["Opening RAV"], rav["Closing RAV"], units, inputs).sum(axis=-2)
+    return {
+        "n_scenarios": n_scenarios,
+        "segment_names": [seg[0] for seg in RAV_SEGMENTS],
+        "currencies": [seg[1] for seg in RAV_SEGMENTS],
+        "years": list(inputs["years"]),
+        "segments": {"closing_rav": rav["Closing RAV"], "revenue": revenue, "opex": opex, "ebitda": ebitda},
+        "ngv_businesses": list(inputs["ngv_businesses"]),
+        "ngv": {key: ngv[key] for key in NGV_SEGMENT_OUTPUTS},
+        "group": {key: group[key] for key in GROUP_OUTPUTS},
+    }
+
+
+if __name__ == "__main__":
+    import time
+    model_base = load_model_inputs()
+    n = 10000
+    rng = np.random.default_rng(0)
+    scenario_overrides = {
+        "uk_cpih": model_base["uk_cpih"] + rng.normal(0.0, 0.01, (n, 1)),
+        "allowed_wacc": model_base["allowed_wacc"] + rng.normal(0.0, 0.005, (n, 1, 1)),
+        "capex": model_base["capex"] * rng.uniform(0.8, 1.2, (n, 1, 1)),
+    }
+    start = time.perf_counter()
+    out = run_scenarios(scenario_overrides, base=model_base)
+    elapsed = time.perf_counter() - start
+    print(f"{n:,} scenarios in {elapsed * 1000:.1f} ms")
+    print("FFO / Net Debt FY2030 (p5 / p50 / p95):", np.percentile(out["group"]["ffo_net_debt"][:, 5], [5, 50, 95]).round(3))
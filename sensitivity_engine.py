@@ -0,0 +1,111 @@
+import numpy as np
+
+from rav_engine import RAV_SEGMENT_NAMES
+from scenario_engine import load_model_inputs, run_scenarios
+
+# --- Configuration & Constants ---
+# Drivers bumped down and up around the base case:
+# (Driver, Input Keys, Segments (None = all), Bump, Kind: 'add' = absolute change, 'mult' = relative change)
+SENSITIVITY_BUMPS = [
+    ("UK Allowed WACC", ["allowed_wacc"], ["NGET", "NGED"], 0.005, "add"),       # ±50bp
+    ("NGET Regulatory Depn Rate", ["depn_rate"], ["NGET"], 0.005, "add"),
+    ("NGED Regulatory Depn Rate", ["depn_rate"], ["NGED"], 0.005, "add"),
+    ("US Allowed ROE", ["allowed_roe"], ["NY", "MA"], 0.005, "add"),
+    ("US Equity Ratio", ["equity_ratio"], ["NY", "MA"], 0.02, "add"),
+    ("Capex Additions", ["capex"], None, 0.10, "mult"),                        # ±10% in every segment
+    ("UK CPIH", ["uk_cpih"], None, 0.01, "add"),
+    ("GBP:USD Exchange Rate", ["fx_avg", "fx_year_end"], None, 0.10, "mult"),  # Average and year-end rates move together
+    ("Cost of New Debt (GBP)", ["cost_of_debt_gbp"], None, 0.01, "add"),
+    ("UK Corporation Tax Rate", ["uk_tax_rate"], None, 0.01, "add"),
+    ("Dividend Payout Ratio", ["payout_ratio"], None, 0.05, "add"),
+]
+
+# Outputs reported per bump: (Label, Output Key, Unit), all run_scenarios group outputs ('closing_rav' is the group
+# total in £m at year-end rates).
+SENSITIVITY_METRICS = [
+    ("Closing RAV / Rate Base", "closing_rav", "£m"),
+    ("EBITDA", "ebitda", "£m"),
+    ("Net Debt / EBITDA", "net_debt_ebitda", "x"),
+    ("FFO / Net Debt", "ffo_net_debt", "%"),
+]
+
+
+# --- Scenario Construction ---
+def bump_overrides(base, bumps=SENSITIVITY_BUMPS, scale=1.0):
+    """
+    Builds run_scenarios overrides holding the base case (scenario 0) followed by a down and an up scenario per bump
+    (scenarios 2b+1 and 2b+2). `scale` multiplies every bump size.
+    """
+    n_scenarios = 1 + 2 * len(bumps)
+    keys = sorted({key for bump in bumps for key in bump[1]})
+    overrides = {key: np.repeat(np.asarray(base[key], dtype=float)[np.newaxis], n_scenarios, axis=0) for key in keys}
+    for b, (driver, input_keys, segments, size, kind) in enumerate(bumps):
+        if kind not in ("add", "mult"):
+            raise ValueError(f"Bump '{driver}' has unknown kind '{kind}'")
+        for direction, scenario in ((-1.0, 2 * b + 1), (1.0, 2 * b + 2)):
+            change = direction * size * scale
+            for key in input_keys:
+                values = overrides[key][scenario]
+                if segments is None:
+                    rows = slice(None)
+                elif values.ndim == 2: # (segments x years)
+                    rows = [RAV_SEGMENT_NAMES.index(seg) for seg in segments]
+                else:
+                    raise ValueError(f"Bump '{driver}' selects segments but '{key}' is not a per-segment input")
+                if kind == "add":
+                    values[rows] += change
+                else:
+                    values[rows] *= 1.0 + change
+    return overrides, n_scenarios
+
+
+# --- Calculation ---
+def run_sensitivities(base=None, data_dir=".", bumps=SENSITIVITY_BUMPS, scale=1.0):
+    """
+    Evaluates the base case and every down/up bump in one batched run_scenarios call.
+    Returns a dict with 'drivers', 'bumps' (applied sizes), 'kinds', 'years', 'base' ({metric: (years,)}) and
+    'down'/'up' ({metric: (bumps x years)} changes against the base case), keyed by SENSITIVITY_METRICS output keys.
+    """
+    if base is None:
+        base = load_model_inputs(data_dir)
+    overrides, n_scenarios = bump_overrides(base, bumps, scale)
+    results = run_scenarios(overrides, base=base, n_scenarios=n_scenarios)
+
+    values = results["group"]
+
+    out = {
+        "drivers": [bump[0] for bump in bumps],
+        "bumps": [bump[3] * scale for bump in bumps],
+        "kinds": [bump[4] for bump in bumps],
+        "years": results["years"],
+        "base": {}, "down": {}, "up": {},
+    }
+    for _, key, _ in SENSITIVITY_METRICS:
+        metric = values[key]
+        out["base"][key] = metric[0]
+        out["down"][key] = metric[1::2] - metric[0]
+        out["up"][key] = metric[2::2] - metric[0]
+    return out
+
+
+def tornado_order(sensitivities, metric, year):
+    """Bump indices sorted by the width of their down/up swing in `metric` for `year`, widest first."""
+    y = sensitivities["years"].index(year)
+    swing = np.abs(sensitivities["up"][metric][:, y] - sensitivities["down"][metric][:, y])
+    return [int(b) for b in np.argsort(-swing, kind="stable")]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    report_year = sys.argv[1] if len(sys.argv) > 1 else "FY2030"
+    model_base = load_model_inputs()
+    start = time.perf_counter()
+    sens = run_sensitivities(base=model_base)
+    elapsed = time.perf_counter() - start
+    print(f"{len(sens['drivers'])} drivers ({2 * len(sens['drivers']) + 1} scenarios) in {elapsed * 1000:.1f} ms")
+    y_idx = sens["years"].index(report_year)
+    for label, key, unit in SENSITIVITY_METRICS:
+        print(f"\n{label} ({unit}), {report_year}: base {sens['base'][key][y_idx]:,.3f}")
+        for b in tornado_order(sens, key, report_year):
+            print(f"  {sens['drivers'][b]:<28} down {sens['down'][key][b, y_idx]:+12,.3f}   up {sens['up'][key][b, y_idx]:+12,.3f}")
@@ -0,0 +1,180 @@
+import numpy as np
+
+from model_inputs import HISTORICAL_YEARS_DATA, get_row_values
+
+# --- Configuration & Constants ---
+BALANCE_TOL = 1e-3 # £m; largest accepted |Assets - (Liabilities + Equity)| and cash roll difference
+OPENING_BS_CSV = "hist_bs_consol.csv"
+
+# Statement line items, each (scenarios x years) in £m. Cash flow outflows are negative.
+PL_LINE_ITEMS = ["Revenue", "EBITDA", "Depreciation & Amortisation", "EBIT", "Interest", "Profit Before Tax", "Tax", "Net Profit"]
+CF_LINE_ITEMS = ["EBITDA", "Taxes Paid", "Net CFO", "Capex", "Interest Paid", "Dividends Paid", "Net Borrowing",
+                 "Net Change in Cash", "Cash at Beginning of Year", "Cash at End of Year"]
+
+# Balance sheet lines: (Line Item, Side, Opening Balance Terms as (Sign, Item in hist_bs_consol.csv)).
+# Opening balances are the last historical year's; lines with no terms open at zero.
+BS_LINES = [
+    ("Non-Current Assets", "assets", [(1, "Total Non-Current Assets")]),
+    ("Other Current Assets", "assets", [(1, "Total Current Assets"), (-1, "Cash & Cash Equivalents")]),
+    ("Cash & Cash Equivalents", "assets", [(1, "Cash & Cash Equivalents")]),
+    ("Borrowings", "liabilities", [(1, "Borrowings (Long-term)"), (1, "Borrowings (Short-term)")]),
+    ("Other Liabilities", "liabilities", [(1, "Total Liabilities"), (-1, "Borrowings (Long-term)"), (-1, "Borrowings (Short-term)")]),
+    ("Share Capital", "equity", [(1, "Share Capital")]),
+    ("Retained Earnings & Reserves", "equity", [(1, "Share Premium / Reserves")]),
+    ("FX Translation Reserve", "equity", []),
+    ("Non-Controlling Interests", "equity", [(1, "Non-Controlling Interests")]),
+]
+BS_SIDES = ("assets", "liabilities", "equity")
+BS_LINE_ITEMS = [line[0] for line in BS_LINES] + ["Total Assets", "Total Liabilities", "Total Equity", "Balance Check"]
+OPENING_BALANCE_LINE = "Retained Earnings & Reserves" # Absorbs the opening Assets - (Liabilities + Equity) difference
+
+# Integrity checks, each a difference that must be within BALANCE_TOL: (Check, Description)
+INTEGRITY_CHECKS = [
+    ("Balance Check", "Total Assets - (Total Liabilities + Total Equity)"),
+    ("Cash Roll", "CF Cash at End of Year - BS Cash & Cash Equivalents"),
+]
+
+
+# --- Input Loading ---
+def load_opening_balance_sheet(tables):
+    """Opening balances per BS_LINES from the last historical year of hist_bs_consol.csv, as {line: £m}."""
+    hist_bs = tables[OPENING_BS_CSV]
+    last_hist_idx = hist_bs["years"].index(HISTORICAL_YEARS_DATA[-1])
+    return {item: float(sum(sign * get_row_values(hist_bs, csv_item)[last_hist_idx] for sign, csv_item in terms))
+            for item, _, terms in BS_LINES}
+
+
+# --- Calculation ---
+def build_statements(results, inputs, opening, balance_opening=True):
+    """
+    Integrated P&L, cash flow and balance sheet from run_scenarios results, linked through retained earnings
+    (net profit less dividends), cash (held at the minimum cash target, 'min_cash') and debt (borrowings = the debt
+    engine's net debt + cash, so net borrowing funds the cash flow). `inputs` are the run's base (or stacked) inputs
+    and `opening` the load_opening_balance_sheet balances.
+
+    Non-current assets roll forward with capex less D&A plus the RAV / rate base FX translation difference, which
+    also builds the FX translation reserve; working capital and other liabilities are held at their opening balances.
+    The historical balance sheet need not balance: with `balance_opening` the opening difference is taken to
+    OPENING_BALANCE_LINE and reported as 'opening_adjustment', otherwise it carries into every year's Balance Check.
+
+    Returns {'pl', 'cf', 'bs': {line: (scenarios x years)}, 'checks': {check: (scenarios x years)}, 'opening_adjustment'}.
+    """
+    group = results["group"]
+    shape = group["ebitda"].shape
+    opening = dict(opening)
+    opening_adjustment = (sum(opening[item] for item, side, _ in BS_LINES if side == "assets")
+                          - sum(opening[item] for item, side, _ in BS_LINES if side != "assets"))
+    if balance_opening:
+        opening[OPENING_BALANCE_LINE] += opening_adjustment
+
+    pl = {"Revenue": group["revenue"], "EBITDA": group["ebitda"], "Depreciation & Amortisation": group["depreciation"]}
+    pl["EBIT"] = pl["EBITDA"] - pl["Depreciation & Amortisation"]
+    pl["Interest"] = group["interest"]
+    pl["Profit Before Tax"] = pl["EBIT"] - pl["Interest"]
+    pl["Tax"] = group["tax"]
+    pl["Net Profit"] = pl["Profit Before Tax"] - pl["Tax"]
+
+    # Cash is held at the minimum cash target; borrowings are whatever the net debt position then requires
+    cash = np.broadcast_to(inputs["min_cash"], shape)
+    borrowings = group["net_debt"] + cash
+    opening_borrowings = opening["Borrowings"]
+    opening_cash = opening["Cash & Cash Equivalents"]
+
+    cf = {"EBITDA": group["ebitda"], "Taxes Paid": -group["tax"]}
+    cf["Net CFO"] = cf["EBITDA"] + cf["Taxes Paid"]
+    cf["Capex"] = -group["capex"]
+    cf["Interest Paid"] = -group["interest"]
+    cf["Dividends Paid"] = -group["dividends"]
+    cf["Net Borrowing"] = np.diff(borrowings, axis=-1, prepend=np.broadcast_to(opening_borrowings, shape[:-1] + (1,)))
+    cf["Net Change in Cash"] = cf["Net CFO"] + cf["Capex"] + cf["Interest Paid"] + cf["Dividends Paid"] + cf["Net Borrowing"]
+    cf["Cash at End of Year"] = opening_cash + np.cumsum(cf["Net Change in Cash"], axis=-1)
+    cf["Cash at Beginning of Year"] = cf["Cash at End of Year"] - cf["Net Change in Cash"]
+
+    fx = group["rav_fx_translation"]
+    bs = {
+        "Non-Current Assets": opening["Non-Current Assets"] + np.cumsum(group["capex"] - group["depreciation"] + fx, axis=-1),
+        "Other Current Assets": np.full(shape, opening["Other Current Assets"]),
+        "Cash & Cash Equivalents": cash,
+        "Borrowings": borrowings,
+        "Other Liabilities": np.full(shape, opening["Other Liabilities"]),
+        "Share Capital": np.full(shape, opening["Share Capital"]),
+        "Retained Earnings & Reserves": opening["Retained Earnings & Reserves"] + np.cumsum(pl["Net Profit"] - group["dividends"], axis=-1),
+        "FX Translation Reserve": opening["FX Translation Reserve"] + np.cumsum(fx, axis=-1),
+        "Non-Controlling Interests": np.full(shape, opening["Non-Controlling Interests"]),
+    }
+    totals = {side: sum(bs[item] for item, line_side, _ in BS_LINES if line_side == side) for side in BS_SIDES}
+    bs["Total Assets"], bs["Total Liabilities"], bs["Total Equity"] = totals["assets"], totals["liabilities"], totals["equity"]
+    bs["Balance Check"] = bs["Total Assets"] - (bs["Total Liabilities"] + bs["Total Equity"])
+
+    return {
+        "pl": pl,
+        "cf": cf,
+        "bs": bs,
+        "checks": {"Balance Check": bs["Balance Check"], "Cash Roll": cf["Cash at End of Year"] - bs["Cash & Cash Equivalents"]},
+        "opening_adjustment": opening_adjustment,
+    }
+
+
+def check_statements(statements, tol=BALANCE_TOL):
+    """
+    Screens every scenario and year in one reduction over a stacked (items x scenarios x years) failure mask: any
+    non-finite statement line, or an INTEGRITY_CHECKS difference above `tol`, fails. Returns {'items' (statement
+    lines as 'bs: Borrowings', then the checks), 'balanced' (scenarios,), 'first_fail_year' and 'first_fail_item'
+    (scenarios,) indices into the year axis and 'items' (-1 where balanced), 'max_abs_difference' (scenarios,)}.
+    """
+    lines = [(f"{statement}: {item}", values) for statement in ("pl", "cf", "bs") for item, values in statements[statement].items()]
+    differences = np.stack([statements["checks"][check] for check, _ in INTEGRITY_CHECKS])
+    failing = np.concatenate([~np.isfinite(np.stack([values for _, values in lines])), ~(np.abs(differences) <= tol)])
+
+    failing_years = failing.any(axis=0)
+    balanced = ~failing_years.any(axis=-1)
+    first_year = failing_years.argmax(axis=-1)
+    first_item = np.take_along_axis(failing, first_year[None, :, None], axis=-1)[..., 0].argmax(axis=0)
+    return {
+        "items": [name for name, _ in lines] + [check for check, _ in INTEGRITY_CHECKS],
+        "balanced": balanced,
+        "first_fail_year": np.where(balanced, -1, first_year),
+        "first_fail_item": np.where(balanced, -1, first_item),
+        "max_abs_difference": np.nanmax(np.abs(differences), axis=(0, -1)),
+    }
+
+
+def format_check(report, years, limit=10):
+    """Readable summary lines, e.g. 'scenario 17: FY2031 Balance Check (max difference 12.4)'."""
+    failed = np.flatnonzero(~report["balanced"])
+    if not failed.size:
+        return f"Statements: all {len(report['balanced']):,} scenarios balance"
+    lines = [f"Statements: {failed.size:,} of {len(report['balanced']):,} scenarios fail"]
+    for s in failed[:limit]:
+        item = report["items"][report["first_fail_item"][s]]
+        lines.append(f"  scenario {s}: {years[report['first_fail_year'][s]]} {item} (max difference {report['max_abs_difference'][s]:,.3g})")
+    if failed.size > limit:
+        lines.append(f"  ... {failed.size - limit} more")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from model_inputs import load_input_tables
+    from scenario_engine import SCENARIO_INPUT_CSVS, load_model_inputs, run_scenarios
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    tables = load_input_tables(".", SCENARIO_INPUT_CSVS)
+    model_base = load_model_inputs(tables=tables)
+    opening_bs = load_opening_balance_sheet(tables)
+    rng = np.random.default_rng(0)
+    scenario_overrides = {
+        "uk_cpih": model_base["uk_cpih"] + rng.normal(0.0, 0.01, (n, 1)),
+        "fx_avg": model_base["fx_avg"] * rng.uniform(0.85, 1.15, (n, 1)),
+        "fx_year_end": model_base["fx_year_end"] * rng.uniform(0.85, 1.15, (n, 1)),
+        "capex": model_base["capex"] * rng.uniform(0.8, 1.2, (n, 1, 1)),
+    }
+    out = run_scenarios(scenario_overrides, base=model_base)
+    start = time.perf_counter()
+    scenario_statements = build_statements(out, model_base, opening_bs)
+    check = check_statements(scenario_statements)
+    elapsed = time.perf_counter() - start
+    print(f"Opening balance sheet difference taken to reserves: {scenario_statements['opening_adjustment']:,.1f}")
+    print(format_check(check, out["years"]))
+    print(f"{n:,} scenarios built and checked in {elapsed * 1000:.1f} ms")
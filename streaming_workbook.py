@@ -0,0 +1,152 @@
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import NamedStyle
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.cell_range import CellRange
+
+STYLE_NAME_PREFIX = "NG Style"
+
+
+# --- Style Interning ---
+class StyleTable:
+    """
+    Interns each distinct (font, fill, border, alignment, number format) combination once as a workbook named style.
+    The generators reuse a handful of FONT_*/FILL_*/BORDER_*/ALIGN_* constants, so the table stays small however
+    many cells are written.
+    """
+
+    def __init__(self, wb):
+        self.wb = wb
+        self.names = {} # Style key -> named style name
+
+    def name_for(self, key):
+        name = self.names.get(key)
+        if name is None:
+            font, fill, border, alignment, number_format = key
+            name = f"{STYLE_NAME_PREFIX} {len(self.names) + 1}"
+            style = NamedStyle(name=name, number_format=number_format or "General")
+            for attr, value in (("font", font), ("fill", fill), ("border", border), ("alignment", alignment)):
+                if value is not None:
+                    setattr(style, attr, value)
+            self.wb.add_named_style(style)
+            self.names[key] = name
+        return name
+
+
+# --- Buffered Sheet ---
+class StreamingCell:
+    """Lightweight stand-in for an openpyxl Cell: just the value and the style attributes the generators set."""
+    __slots__ = ("value", "font", "fill", "border", "alignment", "number_format")
+
+    def __init__(self, value=None):
+        self.value = value
+        self.font = self.fill = self.border = self.alignment = self.number_format = None
+
+    def style_key(self):
+        return (self.font, self.fill, self.border, self.alignment, self.number_format)
+
+
+class _ColumnWidth:
+    __slots__ = ("width",)
+
+    def __init__(self):
+        self.width = None
+
+
+class _ColumnWidths(dict):
+    def __missing__(self, col_letter):
+        self[col_letter] = dim = _ColumnWidth()
+        return dim
+
+
+class StreamingSheet:
+    """
+    Accepts the same random-access calls the sheet builders make (cell(), merge_cells(), column_dimensions[...]) but
+    keeps only slotted StreamingCells; the rows are streamed out in order when the sheet is closed.
+    """
+
+    def __init__(self, title):
+        self.title = title
+        self.column_dimensions = _ColumnWidths()
+        self._rows = {} # Row -> {column: StreamingCell}
+        self._merged = []
+
+    def cell(self, row, column, value=None):
+        row_cells = self._rows.get(row)
+        if row_cells is None:
+            row_cells = self._rows[row] = {}
+        cell = row_cells.get(column)
+        if cell is None:
+            cell = row_cells[column] = StreamingCell()
+        if value is not None:
+            cell.value = value
+        return cell
+
+    def merge_cells(self, range_string=None, start_row=None, start_column=None, end_row=None, end_column=None):
+        if range_string is None:
+            range_string = f"{get_column_letter(start_column)}{start_row}:{get_column_letter(end_column)}{end_row}"
+        self._merged.append(range_string)
+
+    def write_to(self, ws, styles):
+        """Streams the buffered rows into a write-only worksheet, one styled prototype cell per interned style."""
+        for col_letter, dim in self.column_dimensions.items():
+            if dim.width is not None:
+                ws.column_dimensions[col_letter].width = dim.width # Must precede the first row in write-only mode
+        prototypes = {}
+        def prototype(cell):
+            key = cell.style_key()
+            proto = prototypes.get(key)
+            if proto is None:
+                proto = prototypes[key] = WriteOnlyCell(ws)
+                if key != (None, None, None, None, None):
+                    proto.style = styles.name_for(key)
+            proto.value = cell.value
+            return proto
+        def row_cells(cells):
+            # A generator, so each prototype is serialised before it is reused for the next cell
+            for col in range(1, max(cells) + 1):
+                cell = cells.get(col)
+                yield None if cell is None else prototype(cell)
+        for row in range(1, max(self._rows, default=0) + 1):
+            cells = self._rows.pop(row, None)
+            ws.append(row_cells(cells) if cells else [])
+        for range_string in self._merged:
+            ws.merged_cells.add(CellRange(range_string))
+
+
+# --- Workbook ---
+class StreamingWorkbook:
+    """
+    Write-only workbook exposing the subset of the openpyxl Workbook API the generators use. Sheets are built one at a
+    time: creating the next sheet streams the previous one to disk, so peak memory is one sheet's cell values.
+    """
+
+    def __init__(self):
+        self.wb = Workbook(write_only=True)
+        self.styles = StyleTable(self.wb)
+        self._open_sheet = None
+        self._ws_by_name = {}
+
+    @property
+    def sheetnames(self):
+        return [ws.title for ws in self.wb.worksheets]
+
+    def create_sheet(self, title):
+        self._close_open_sheet()
+        self._ws_by_name[title] = self.wb.create_sheet(title)
+        self._open_sheet = StreamingSheet(title)
+        return self._open_sheet
+
+    def _close_open_sheet(self):
+        if self._open_sheet is not None:
+            self._open_sheet.write_to(self._ws_by_name[self._open_sheet.title], self.styles)
+            self._open_sheet = None
+
+    def order_sheets(self, sheet_order):
+        """Puts the sheets in sheet_order (write-only workbooks have no move_sheet)."""
+        position = {name: idx for idx, name in enumerate(sheet_order)}
+        self.wb._sheets.sort(key=lambda ws: position.get(ws.title, len(position)))
+
+    def save(self, filename):
+        self._close_open_sheet()
+        self.wb.save(filename)
@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+
+from debt_engine import solve_debt_schedule
+from model_inputs import load_input_tables
+from scenario_engine import SCENARIO_INPUT_CSVS, load_model_inputs, run_scenarios
+from statements_engine import BALANCE_TOL, build_statements, check_statements, load_opening_balance_sheet
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def test_debt_schedule_resolves_interest_circularity_around_nan_scenario():
+    rng = np.random.default_rng(0)
+    cfo = rng.uniform(800.0, 1200.0, (50, 16))
+    cfo[7, 5] = np.nan
+    rate, tax_rate = 0.05, 0.25
+    out = solve_debt_schedule(np.full(50, 40000.0), cfo, 1500.0, rate, dividends=300.0, payout_ratio=0.5,
+                              profit_before_interest=2500.0, tax_rate=tax_rate)
+
+    closing, opening, interest = out["Closing Net Debt"], out["Opening Net Debt"], out["Interest"]
+    implied_interest = rate * 0.5 * (opening + closing)
+    implied_closing = opening + 1500.0 + out["Dividends"] - cfo + interest * (1.0 - tax_rate)
+    finite = np.ones(closing.shape, dtype=bool)
+    finite[7, 5:] = False
+    assert np.isnan(closing[~finite]).all()
+    assert np.isfinite(closing[finite]).all()
+    assert np.abs(interest - implied_interest)[finite].max() < 1e-6
+    assert np.abs(closing - implied_closing)[finite].max() < 1e-6
+    assert out["max_residual"] < 1e-6
+
+
+def test_statements_balance_in_every_scenario():
+    tables = load_input_tables(DATA_DIR, SCENARIO_INPUT_CSVS)
+    base = load_model_inputs(DATA_DIR, tables=tables)
+    rng = np.random.default_rng(0)
+    n = 200
+    overrides = {
+        "uk_cpih": base["uk_cpih"] + rng.normal(0.0, 0.01, (n, 1)),
+        "fx_avg": base["fx_avg"] * rng.uniform(0.85, 1.15, (n, 1)),
+        "fx_year_end": base["fx_year_end"] * rng.uniform(0.85, 1.15, (n, 1)),
+        "capex": base["capex"] * rng.uniform(0.8, 1.2, (n, 1, 1)),
+    }
+    statements = build_statements(run_scenarios(overrides, base=base), base, load_opening_balance_sheet(tables))
+
+    bs = statements["bs"]
+    difference = np.abs(bs["Total Assets"] - (bs["Total Liabilities"] + bs["Total Equity"]))
+    assert difference.max(axis=-1).max() < BALANCE_TOL
+    assert check_statements(statements)["balanced"].all()
@@ -0,0 +1,134 @@
+import numpy as np
+
+# --- Configuration & Constants ---
+FIRST_FORECAST_YEAR = 2025
+DEFAULT_LAST_YEAR = 2040 # Last year of the assumption CSVs
+MAX_HORIZON_YEAR = 2070
+
+# Frequency -> (Periods per Year, Period Label); periods are numbered within the fiscal year
+PERIOD_FREQUENCIES = {
+    "annual": (1, "FY{year}"),
+    "quarterly": (4, "FY{year} Q{period}"),
+    "monthly": (12, "FY{year} M{period:02d}"),
+}
+
+# How each annual model input becomes a per-period input: (Input Key, Has Year Axis, How)
+#   "flow"   - £m/$m amounts for the year, spread over its periods (evenly, or by a phasing profile)
+#   "simple" - annual rates accrued on an opening balance (returns, depreciation, interest): rate / periods
+#   "growth" - annual growth rates (inflation): compounded, (1 + rate) ^ (1 / periods) - 1
+#   "level"  - ratios and rates applied as they are (tax, payout, equity ratio, year-end FX)
+#   "interp" - levels interpolated linearly between mid-year values (average FX)
+# Years beyond the last assumption year hold the last year's value. Opening balances are not phased.
+INPUT_PHASING = [
+    ("capex", True, "flow"),
+    ("depn_rate", True, "simple"),
+    ("inflation", True, "growth"),        # rav_engine inputs only; the scenario engine re-derives it from uk_cpih
+    ("uk_cpih", True, "growth"),
+    ("us_cpi", True, "growth"),
+    ("fx_avg", True, "interp"),
+    ("fx_year_end", True, "level"),
+    ("cost_of_debt_gbp", True, "simple"),
+    ("cost_of_debt_usd", True, "simple"),
+    ("uk_tax_rate", True, "level"),
+    ("us_federal_tax_rate", True, "level"),
+    ("us_state_tax_rate", True, "level"),
+    ("payout_ratio", True, "level"),
+    ("min_cash", True, "level"),
+    ("allowed_wacc", True, "simple"),
+    ("outperformance", True, "flow"),
+    ("opex_base", True, "flow"),
+    ("opex_efficiency", True, "level"),
+    ("allowed_roe", True, "simple"),
+    ("equity_ratio", True, "level"),
+    ("opex_growth", True, "growth"),
+    ("opex_last_hist", False, "flow"),    # FY2024 US opex, grown forward per period
+    ("embedded_cost_of_debt", False, "simple"),
+    ("ngv_revenue", True, "flow"),
+    ("ngv_opex", True, "flow"),
+    ("ngv_capex", True, "flow"),
+    ("ngv_depreciation", True, "flow"),
+]
+
+
+# --- Time Axis ---
+class TimeAxis:
+    """
+    The forecast periods: fiscal years first_year..last_year, each split into annual, quarterly or monthly periods.
+    `labels` name every period; `year_index` gives each period's fiscal year (0 = first_year).
+    """
+
+    def __init__(self, last_year=DEFAULT_LAST_YEAR, frequency="annual", first_year=FIRST_FORECAST_YEAR):
+        if frequency not in PERIOD_FREQUENCIES:
+            raise ValueError(f"Unknown frequency '{frequency}'; available: {sorted(PERIOD_FREQUENCIES)}")
+        if not first_year <= last_year <= MAX_HORIZON_YEAR:
+            raise ValueError(f"Horizon must run from {first_year} to at most {MAX_HORIZON_YEAR}, got {last_year}")
+        self.first_year, self.last_year, self.frequency = first_year, last_year, frequency
+        self.periods_per_year, label_format = PERIOD_FREQUENCIES[frequency]
+        self.years = [f"FY{year}" for year in range(first_year, last_year + 1)]
+        self.labels = [label_format.format(year=year, period=period)
+                       for year in range(first_year, last_year + 1) for period in range(1, self.periods_per_year + 1)]
+        self.n_periods = len(self.labels)
+        self.year_index = np.repeat(np.arange(len(self.years)), self.periods_per_year)
+
+    def __repr__(self):
+        return f"TimeAxis(last_year={self.last_year}, frequency={self.frequency!r}, first_year={self.first_year})"
+
+    def data_year_index(self, n_data_years):
+        """Each period's column in annual data covering n_data_years from first_year (later years hold the last)."""
+        return np.minimum(self.year_index, n_data_years - 1)
+
+    def assumption_years(self, data_years):
+        """Each period's annual data year label, e.g. the assumption column a FY2045 Q3 formula looks up."""
+        return [data_years[i] for i in self.data_year_index(len(data_years))]
+
+
+# --- Phasing ---
+def phase_annual(values, axis, how, has_year_axis=True, flow_profile=None):
+    """
+    Turns annual values (..., data years), or per-year constants when has_year_axis is False, into per-period
+    values (..., periods) on `axis` (see INPUT_PHASING for `how`). `flow_profile` weights the periods of each year
+    for "flow" values (defaults to an even split). One gather and one elementwise pass, so cost is linear in periods.
+    """
+    values = np.asarray(values, dtype=float)
+    p = axis.periods_per_year
+    if has_year_axis:
+        n_data = values.shape[-1]
+        if how == "interp":
+            # Annual values sit at mid-year; period mid-points between them are interpolated, the ends held flat
+            position = np.clip((np.arange(axis.n_periods) + 0.5) / p - 0.5, 0.0, n_data - 1)
+            lower = np.floor(position).astype(int)
+            upper = np.minimum(lower + 1, n_data - 1)
+            weight = position - lower
+            return values[..., lower] * (1.0 - weight) + values[..., upper] * weight
+        values = values[..., axis.data_year_index(n_data)]
+    if p == 1 or how in ("level", "interp"):
+        return values
+    if how == "flow":
+        if flow_profile is None:
+            return values / p
+        profile = np.asarray(flow_profile, dtype=float)
+        if profile.shape != (p,) or not np.isclose(profile.sum(), 1.0):
+            raise ValueError(f"flow_profile must have {p} weights summing to 1")
+        return values * (np.tile(profile, len(axis.years)) if has_year_axis else profile.mean())
+    if how == "simple":
+        return values / p
+    if how == "growth":
+        return (1.0 + values) ** (1.0 / p) - 1.0
+    raise ValueError(f"Unknown phasing '{how}'")
+
+
+def phase_model_inputs(inputs, axis, flow_profile=None):
+    """
+    Phases annual engine inputs (from scenario_engine.load_model_inputs or rav_engine.load_rav_inputs) onto `axis`.
+    Keys in INPUT_PHASING are converted, 'years' becomes the period labels and 'periods_per_year' is added so credit
+    ratios can be annualised. The axis must start in the inputs' first year.
+    """
+    if inputs["years"][0] != axis.years[0]:
+        raise ValueError(f"Time axis starts in {axis.years[0]} but the inputs start in {inputs['years'][0]}")
+    phased = dict(inputs)
+    for key, has_year_axis, how in INPUT_PHASING:
+        if key in inputs:
+            phased[key] = phase_annual(inputs[key], axis, how, has_year_axis, flow_profile)
+    phased["years"] = list(axis.labels)
+    phased["periods_per_year"] = axis.periods_per_year
+    return phased
@@ -0,0 +1,100 @@
+import math
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from formula_engine import ERROR_NAME, ExcelError, FormulaModel, parse_cell_ref
+from xlsx_reader import iter_sheet_cells, read_shared_strings, workbook_sheet_paths
+
+# --- Configuration & Constants ---
+# Formula cells as openpyxl writes them: <c r="B3" s="29"><f>...</f><v /></c> (the value is empty or absent)
+FORMULA_CELL_RE = re.compile(r'<c\b([^>]*)>(<f\b[^>/]*>[^<]*</f>)(?:<v>[^<]*</v>|<v\s*/>)?</c>')
+CELL_REF_ATTR_RE = re.compile(r'\br="([A-Z]+[0-9]+)"')
+CELL_TYPE_ATTR_RE = re.compile(r'\s+t="[^"]*"')
+# openpyxl marks workbooks for a full recalculation on open; with cached values written that flag is dropped and the
+# calculation id set to a current Excel engine's, so Excel shows the cached values without recalculating on load
+CALC_PR_RE = re.compile(r'<calcPr\b[^>]*/>')
+CACHED_CALC_PR = '<calcPr calcId="191029" />'
+
+
+# --- Values ---
+def _cached_value(value):
+    """Evaluated formula value -> (cell type attribute or None, <v> text), as Excel stores them."""
+    if isinstance(value, ExcelError):
+        return "e", value.code
+    if isinstance(value, bool):
+        return "b", "1" if value else "0"
+    if isinstance(value, str):
+        return "str", escape(value)
+    if value is None: # A formula reading an empty cell shows 0
+        return None, "0"
+    value = float(value)
+    if not math.isfinite(value):
+        return "e", "#NUM!"
+    return None, repr(value)
+
+
+def _read_cells(zf, sheet_paths):
+    """Every non-empty cell of the package, formulas as '=...' text: {(sheet, row, col): value}."""
+    shared_strings = read_shared_strings(zf)
+    cells = {}
+    for name, member in sheet_paths.items():
+        for r, c, value in iter_sheet_cells(zf, member, shared_strings, formulas=True):
+            cells[(name, r, c)] = value
+    return cells
+
+
+# --- Writer ---
+def write_cached_values(path, model=None):
+    """
+    Evaluates every formula of a saved xlsx with formula_engine and writes the results into the file as the formula
+    cells' cached values, so Excel opens it without recalculating and readers without a calculation engine (pandas,
+    xlsx_reader, BI tools) see numbers. Formulas that do not parse get #NAME?, as in FormulaModel. `model` is an
+    already built FormulaModel of the same workbook. The file is replaced atomically.
+    Returns {'formulas': cells written, 'errors': cells holding an Excel error}.
+    """
+    path = os.fspath(path)
+    with zipfile.ZipFile(path) as zf:
+        sheet_paths = workbook_sheet_paths(zf)
+        if model is None:
+            model = FormulaModel(_read_cells(zf, sheet_paths))
+        results = model.evaluate()
+        results.update({key: ERROR_NAME for key in model.parse_errors})
+        sheet_by_member = {member: name for name, member in sheet_paths.items()}
+        counts = {"formulas": 0, "errors": 0}
+
+        def with_value(sheet, match):
+            attrs, formula = match.group(1), match.group(2)
+            ref = CELL_REF_ATTR_RE.search(attrs)
+            key = (sheet,) + parse_cell_ref(ref.group(1)) if ref else None
+            if key not in results:
+                return match.group(0)
+            kind, text = _cached_value(results[key])
+            counts["formulas"] += 1
+            counts["errors"] += kind == "e"
+            attrs = CELL_TYPE_ATTR_RE.sub("", attrs) + (f' t="{kind}"' if kind else "")
+            return f"<c{attrs}>{formula}<v>{text}</v></c>"
+
+        tmp_path = path + ".tmp"
+        with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED) as out:
+            for item in zf.infolist():
+                data = zf.read(item)
+                if item.filename in sheet_by_member:
+                    sheet = sheet_by_member[item.filename]
+                    data = FORMULA_CELL_RE.sub(lambda m: with_value(sheet, m), data.decode("utf-8")).encode("utf-8")
+                elif item.filename == "xl/workbook.xml":
+                    data = CALC_PR_RE.sub(CACHED_CALC_PR, data.decode("utf-8"), count=1).encode("utf-8")
+                out.writestr(item, data)
+    os.replace(tmp_path, path)
+    return counts
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    for workbook_path in sys.argv[1:] or ["NationalGrid_Full_Model_Generated.xlsx"]:
+        start = time.perf_counter()
+        written = write_cached_values(workbook_path)
+        print(f"{workbook_path}: {written['formulas']} formula values cached ({written['errors']} errors) "
+              f"in {(time.perf_counter() - start) * 1000:.0f} ms")
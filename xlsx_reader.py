@@ -0,0 +1,190 @@
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+from model_inputs import CSV_HEADER_LABELS, parse_csv_number
+
+# --- Configuration & Constants ---
+# Sheets laid out by load_csv_to_sheet (CSV row N on sheet row N): header row, section rows, Unit column, FY columns
+INPUT_SHEET_PREFIXES = ("Assumptions_", "Hist_")
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_DOC_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+CELL_COLUMN_RE = re.compile(r"[A-Z]+")
+
+
+# --- Zip Package ---
+def workbook_sheet_paths(zf):
+    """Sheet name -> zip member path of its worksheet XML, in workbook order."""
+    rels = {}
+    for rel in ET.fromstring(zf.read("xl/_rels/workbook.xml.rels")).iter(f"{NS_PKG_REL}Relationship"):
+        target = rel.get("Target")
+        rels[rel.get("Id")] = target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+    return {sheet.get("name"): rels[sheet.get(f"{NS_DOC_REL}id")] for sheet in workbook.iter(f"{NS_MAIN}sheet")}
+
+
+def read_shared_strings(zf):
+    if "xl/sharedStrings.xml" not in zf.namelist():
+        return []
+    strings = []
+    with zf.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f):
+            if elem.tag == f"{NS_MAIN}si":
+                strings.append("".join(t.text or "" for t in elem.iter(f"{NS_MAIN}t")))
+                elem.clear()
+    return strings
+
+
+def _column_index(ref):
+    letters = CELL_COLUMN_RE.match(ref).group()
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + ord(ch) - 64
+    return idx
+
+
+def iter_sheet_cells(zf, member, shared_strings, formulas=False):
+    """
+    Streams (row, column, value) for every non-empty cell of one worksheet XML. Numbers come back as floats, text
+    as str, booleans as bool; formula cells give their cached value (None if the file was never calculated), or
+    with `formulas` their formula as '=...' text.
+    """
+    row_idx = col_idx = 0
+    with zf.open(member) as f:
+        for event, elem in ET.iterparse(f, events=("start", "end")):
+            tag = elem.tag
+            if tag == f"{NS_MAIN}row":
+                if event == "start":
+                    row_idx, col_idx = int(elem.get("r", row_idx + 1)), 0
+                else:
+                    elem.clear() # Cells were already yielded; drop the row subtree
+                continue
+            if event != "end" or tag != f"{NS_MAIN}c":
+                continue
+            ref = elem.get("r")
+            col_idx = _column_index(ref) if ref is not None else col_idx + 1 # Positional cells are rare but legal
+            kind = elem.get("t", "n")
+            f = elem.find(f"{NS_MAIN}f") if formulas else None
+            if f is not None and f.text:
+                yield row_idx, col_idx, "=" + f.text
+                continue
+            v = elem.find(f"{NS_MAIN}v")
+            text = v.text if v is not None else None
+            if kind == "s":
+                value = shared_strings[int(text)] if text is not None else None
+            elif kind == "inlineStr":
+                value = "".join(t.text or "" for t in elem.iter(f"{NS_MAIN}t"))
+            elif kind == "str":
+                value = text
+            elif kind == "b":
+                value = text == "1" if text is not None else None
+            elif kind == "e":
+                value = None
+            else:
+                value = float(text) if text is not None else None
+            if value is not None and value != "":
+                yield row_idx, col_idx, value
+
+
+# --- Tables ---
+def _number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, float):
+        return value
+    return parse_csv_number(value)
+
+
+def sheet_to_table(cells, source):
+    """
+    Rebuilds the read_model_csv table ('header', 'years', 'rows', 'sections', 'values') from one input sheet's
+    {row: {column: value}} cells, using the layout load_csv_to_sheet writes.
+    """
+    if 1 not in cells:
+        raise ValueError(f"{source} has no header row")
+    header_cells = cells[1]
+    header = [str(header_cells.get(c, "")) for c in range(1, max(header_cells) + 1)]
+    has_unit_col = len(header) > 1 and header[1] == "Unit"
+    year_cols = [c for c in range(1, len(header) + 1) if header[c - 1].startswith("FY")]
+    years = [header[c - 1] for c in year_cols]
+    notes_col = year_cols[-1] + 1 if year_cols else len(header) + 1
+
+    rows, values, sections = [], [], []
+    section = None
+    for r in sorted(cells):
+        if r == 1:
+            continue
+        row_cells = cells[r]
+        label = row_cells.get(1)
+        label = "" if label is None else (str(label) if not isinstance(label, float) else f"{label:g}")
+        row_values = [_number(row_cells.get(c)) for c in year_cols]
+        if all(v is None for v in row_values) and label not in CSV_HEADER_LABELS:
+            if label:
+                section = label
+                sections.append({"row": r, "label": label})
+            continue
+        unit = row_cells.get(2) if has_unit_col else None
+        notes = row_cells.get(notes_col)
+        rows.append({
+            "row": r,
+            "section": section,
+            "item": label,
+            "unit": None if unit is None else str(unit),
+            "notes": "" if notes is None else str(notes),
+        })
+        values.append([np.nan if v is None else v for v in row_values])
+
+    return {
+        "file": source,
+        "header": header,
+        "years": years,
+        "rows": rows,
+        "sections": sections,
+        "values": np.array(values, dtype=float).reshape(len(rows), len(years)),
+    }
+
+
+def read_workbook_tables(path, sheet_names=None, prefixes=INPUT_SHEET_PREFIXES):
+    """
+    Reads input sheets (all sheets named with `prefixes`, or exactly `sheet_names`) straight from the xlsx zip with
+    a streaming XML parse. Returns {sheet name: table} in read_model_csv's format; other sheets are never parsed.
+    """
+    with zipfile.ZipFile(path) as zf:
+        sheet_paths = workbook_sheet_paths(zf)
+        if sheet_names is None:
+            sheet_names = [name for name in sheet_paths if name.startswith(prefixes)]
+        missing = [name for name in sheet_names if name not in sheet_paths]
+        if missing:
+            raise KeyError(f"{path} has no sheets {missing}")
+        shared_strings = read_shared_strings(zf)
+        tables = {}
+        for name in sheet_names:
+            cells = {}
+            for r, c, value in iter_sheet_cells(zf, sheet_paths[name], shared_strings):
+                cells.setdefault(r, {})[c] = value
+            tables[name] = sheet_to_table(cells, f"{path}!{name}")
+    return tables
+
+
+def read_workbook_inputs(path):
+    """Input sheets keyed by the CSV they were generated from ('Assumptions_UK_Reg' -> 'assumptions_uk_reg.csv'),
+    ready for scenario_engine.load_model_inputs(tables=...) or model_api.Model(inputs=...)."""
+    return {f"{name.lower()}.csv": table for name, table in read_workbook_tables(path).items()}
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    paths = sys.argv[1:] or ["NationalGrid_Full_Model_Generated.xlsx"]
+    start = time.perf_counter()
+    for workbook_path in paths:
+        workbook_tables = read_workbook_tables(workbook_path)
+        for sheet, table in workbook_tables.items():
+            print(f"{workbook_path}!{sheet}: {len(table['rows'])} rows x {len(table['years'])} years, {len(table['sections'])} sections")
+    elapsed = time.perf_counter() - start
+    print(f"{len(paths)} workbook(s) in {elapsed * 1000:.0f} ms")